@@ -1,11 +1,35 @@
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
+from fastapi import HTTPException, Request
+from starlette.requests import HTTPConnection
+from bson import ObjectId
+from app.db.db import get_database
+from app.services.interview_cache import interview_cache
+from app.services.token_cache import VerifiedTokenCache
+import asyncio
+import hmac
+import time
 import os
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 
 
-pwd_hash = PasswordHash.recommended()
+# Argon2 cost parameters. Changing them is safe: existing hashes still verify and are
+# re-hashed with the new parameters on the user's next successful login.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
+# Each hash is deliberately CPU- and memory-heavy, so they run on a small dedicated pool instead
+# of the event loop (or the shared threadpool): a login burst queues here rather than stalling
+# live interviews, and at most this many hashes hold their memory at once.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+pwd_hash = PasswordHash((Argon2Hasher(time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST, parallelism=ARGON2_PARALLELISM),))
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+hash_stats = {"hashes": 0, "verifies": 0, "rehashed": 0, "hash_seconds": 0.0, "queue_seconds": 0.0}
 
 def hash_password(password: str) -> str:
     return pwd_hash.hash(password)
@@ -13,6 +37,40 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_hash.verify(plain_password, hashed_password)
 
+async def _offload(fn, *args):
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        hash_stats["queue_seconds"] += started - submitted
+        try:
+            return fn(*args)
+        finally:
+            hash_stats["hash_seconds"] += time.perf_counter() - started
+
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, timed)
+
+async def hash_password_async(password: str) -> str:
+    hash_stats["hashes"] += 1
+    return await _offload(pwd_hash.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """`(valid, new_hash)`; `new_hash` is set when the stored hash uses outdated parameters and should be replaced."""
+    hash_stats["verifies"] += 1
+    valid, new_hash = await _offload(pwd_hash.verify_and_update, plain_password, hashed_password)
+    if new_hash:
+        hash_stats["rehashed"] += 1
+    return valid, new_hash
+
+def password_hash_snapshot() -> dict:
+    calls = hash_stats["hashes"] + hash_stats["verifies"]
+    return {
+        **{key: value for key, value in hash_stats.items() if not key.endswith("_seconds")},
+        "workers": PASSWORD_HASH_WORKERS,
+        "avg_hash_ms": round(1000 * hash_stats["hash_seconds"] / calls, 1) if calls else None,
+        "avg_queue_ms": round(1000 * hash_stats["queue_seconds"] / calls, 1) if calls else None,
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> Tuple[str, int]:
     to_encode = data.copy()
 
@@ -36,7 +94,129 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def decode_access_token(token: str):
     try:
-        payload = jwt.decode(token, os.getenv("SECRET_KEY"), algorithm=os.getenv("ALGORITHM"))
+        payload = jwt.decode(token, os.getenv("SECRET_KEY"), algorithms=[os.getenv("ALGORITHM")])
         return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 4096))
+AUTH_USER_TTL = float(os.getenv("AUTH_USER_TTL", 300))
+# EventSource and WebSocket URLs carry a short-lived stream token instead of the access token,
+# so the long-lived credential never lands in access logs.
+STREAM_TOKEN_EXPIRE_SECONDS = int(os.getenv("STREAM_TOKEN_EXPIRE_SECONDS", 60))
+STREAM_TOKEN_PURPOSE = "stream"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+token_cache = VerifiedTokenCache(maxsize=AUTH_TOKEN_CACHE_SIZE, user_ttl=AUTH_USER_TTL)
+auth_stats = {"requests": 0, "rejected": 0, "forbidden": 0, "overhead_seconds": 0.0}
+
+def create_stream_token(user: dict, scope: str) -> Tuple[str, int]:
+    """Token accepted only as `?stream_token=` on the stream of the interview or job `scope`."""
+    return create_access_token(
+        {"sub": user["id"], "purpose": STREAM_TOKEN_PURPOSE, "scope": scope},
+        timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS)
+    )
+
+async def authenticate(token: str, scope: Optional[str] = None) -> Optional[dict]:
+    """
+    The user (`{id, email, name}`) a valid access token belongs to, or None.
+    With `scope`, only a stream token issued for that interview/job id is accepted; without it,
+    stream tokens are rejected.
+    """
+    cached = token_cache.get(token)
+    claims = cached["claims"] if cached is not None else decode_access_token(token)
+    if not claims:
+        return None
+    if scope is None and claims.get("purpose") is not None:
+        return None
+    if scope is not None and (claims.get("purpose") != STREAM_TOKEN_PURPOSE or claims.get("scope") != scope):
+        return None
+    if cached is not None:
+        return cached["user"]
+
+    if claims.get("sub") and ObjectId.is_valid(claims["sub"]):
+        query = {"_id": ObjectId(claims["sub"])}
+    elif claims.get("email"):
+        query = {"email": claims["email"]}
+    else:
+        return None
+    db_user = await get_database().users.find_one(query, {"name": 1, "email": 1, "deletion_requested_at": 1})
+    if not db_user or db_user.get("deletion_requested_at"):
+        # Accounts being deleted are locked out, including tokens issued before the request.
+        return None
+
+    user = {"id": str(db_user["_id"]), "email": db_user.get("email"), "name": db_user.get("name")}
+    token_cache.put(token, claims, user)
+    return user
+
+def request_token(request: HTTPConnection) -> Optional[str]:
+    """Bearer token from the Authorization header."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token.strip()
+    return None
+
+async def connection_user(request: HTTPConnection) -> Optional[dict]:
+    """
+    The user behind a request or WebSocket: a Bearer access token, or a `stream_token` query
+    parameter scoped to the `interview_id`/`job_id` path parameter (EventSource, WebSocket).
+    """
+    token = request_token(request)
+    if token:
+        return await authenticate(token)
+    stream_token = request.query_params.get("stream_token")
+    scope = request.path_params.get("interview_id") or request.path_params.get("job_id")
+    if stream_token and scope:
+        return await authenticate(stream_token, scope=scope)
+    return None
+
+async def metrics_access(request: Request) -> None:
+    """Router dependency for /metrics: a Bearer token equal to METRICS_TOKEN; without it configured, metrics are off."""
+    token = request_token(request)
+    if not METRICS_TOKEN or not token or not hmac.compare_digest(token, METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Not authenticated.", headers={"WWW-Authenticate": "Bearer"})
+
+def ensure_user(user: dict, user_id) -> None:
+    if str(user_id) != user["id"]:
+        auth_stats["forbidden"] += 1
+        raise HTTPException(status_code=403, detail="Not allowed to access this user's data.")
+
+async def ensure_interview_owner(db, user: dict, interview_id: str) -> None:
+    # Invalid or unknown ids are left to the route to report as 400/404.
+    if not interview_id or not ObjectId.is_valid(interview_id):
+        return
+    interview = await interview_cache.get(db, interview_id)
+    if interview and str(interview.get("user_id")) != user["id"]:
+        auth_stats["forbidden"] += 1
+        raise HTTPException(status_code=403, detail="Not allowed to access this interview.")
+
+async def current_user(request: Request) -> dict:
+    """
+    Router dependency: the authenticated user, also set as `request.state.user`. Routes scoped by a
+    `user_id` or `interview_id` path parameter are checked against it; body-scoped routes call
+    `ensure_user` / `ensure_interview_owner` themselves.
+    """
+    started = time.perf_counter()
+    auth_stats["requests"] += 1
+    try:
+        user = await connection_user(request)
+        if user is None:
+            auth_stats["rejected"] += 1
+            raise HTTPException(status_code=401, detail="Not authenticated.", headers={"WWW-Authenticate": "Bearer"})
+
+        if "user_id" in request.path_params:
+            ensure_user(user, request.path_params["user_id"])
+        if "interview_id" in request.path_params:
+            await ensure_interview_owner(get_database(), user, request.path_params["interview_id"])
+
+        request.state.user = user
+        return user
+    finally:
+        auth_stats["overhead_seconds"] += time.perf_counter() - started
+
+def auth_snapshot() -> dict:
+    return {
+        **{key: value for key, value in auth_stats.items() if key != "overhead_seconds"},
+        "avg_overhead_us": round(1e6 * auth_stats["overhead_seconds"] / auth_stats["requests"], 1) if auth_stats["requests"] else None,
+        "token_cache": token_cache.stats(),
+    }
@@ -0,0 +1,214 @@
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from pymongo import UpdateOne
+from bson import Binary
+from typing import Any, AsyncIterator, Optional, Sequence
+from datetime import datetime
+from app.db.db import get_database
+import random
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Async LangGraph checkpointer backed by Mongo.
+
+    Checkpoints (without their channel values), channel value blobs and pending writes live in
+    `interview_checkpoints`, `interview_checkpoint_blobs` and `interview_checkpoint_writes`.
+    A channel value is stored once per version, so checkpoints that don't change a channel
+    don't copy it again. Only the async API is implemented.
+
+    Unless `keep_history` is set, writing a checkpoint prunes the thread's older checkpoints, their
+    pending writes and every blob the new checkpoint no longer references, so storage per interview
+    stays at one checkpoint instead of growing by one per turn.
+    """
+
+    checkpoints_collection = "interview_checkpoints"
+    blobs_collection = "interview_checkpoint_blobs"
+    writes_collection = "interview_checkpoint_writes"
+
+    def __init__(self, *, serde=None, keep_history: bool = False):
+        super().__init__(serde=serde)
+        self.keep_history = keep_history
+
+    def _dump(self, value: Any) -> dict:
+        type_, data = self.serde.dumps_typed(value)
+        return {"type": type_, "value": Binary(data)}
+
+    def _load(self, doc: dict) -> Any:
+        return self.serde.loads_typed((doc["type"], bytes(doc["value"])))
+
+    async def _load_blobs(self, db, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> dict:
+        if not versions:
+            return {}
+        cursor = db[self.blobs_collection].find({
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "$or": [{"channel": channel, "version": version} for channel, version in versions.items()],
+        })
+        return {
+            doc["channel"]: self._load(doc)
+            async for doc in cursor
+            if doc["type"] != "empty"
+        }
+
+    async def _load_writes(self, db, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list:
+        cursor = db[self.writes_collection].find(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}
+        ).sort([("task_id", 1), ("idx", 1)])
+        return [(doc["task_id"], doc["channel"], self._load(doc)) async for doc in cursor]
+
+    async def _to_tuple(self, db, doc: dict) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id = doc["thread_id"], doc["checkpoint_ns"], doc["checkpoint_id"]
+        checkpoint = self.serde.loads_typed((doc["checkpoint_type"], bytes(doc["checkpoint"])))
+        checkpoint["channel_values"] = await self._load_blobs(db, thread_id, checkpoint_ns, checkpoint["channel_versions"])
+        parent_id = doc.get("parent_checkpoint_id")
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=checkpoint,
+            metadata=self.serde.loads_typed((doc["metadata_type"], bytes(doc["metadata"]))),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=await self._load_writes(db, thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        db = get_database()
+        query = {
+            "thread_id": config["configurable"]["thread_id"],
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+        }
+        if checkpoint_id := get_checkpoint_id(config):
+            query["checkpoint_id"] = checkpoint_id
+        doc = await db[self.checkpoints_collection].find_one(query, sort=[("checkpoint_id", -1)])
+        return await self._to_tuple(db, doc) if doc else None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        db = get_database()
+        query = {}
+        if config:
+            query["thread_id"] = config["configurable"]["thread_id"]
+            if "checkpoint_ns" in config["configurable"]:
+                query["checkpoint_ns"] = config["configurable"]["checkpoint_ns"]
+            if checkpoint_id := get_checkpoint_id(config):
+                query["checkpoint_id"] = checkpoint_id
+        if before and (before_id := get_checkpoint_id(before)):
+            query["checkpoint_id"] = {"$lt": before_id}
+
+        async for doc in db[self.checkpoints_collection].find(query).sort("checkpoint_id", -1):
+            if limit is not None and limit <= 0:
+                break
+            checkpoint_tuple = await self._to_tuple(db, doc)
+            if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        db = get_database()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        checkpoint = checkpoint.copy()
+        values = checkpoint.pop("channel_values")
+        blobs = [
+            UpdateOne(
+                {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "channel": channel, "version": version},
+                {"$set": self._dump(values[channel]) if channel in values else {"type": "empty", "value": Binary(b"")}},
+                upsert=True,
+            )
+            for channel, version in new_versions.items()
+        ]
+        if blobs:
+            await db[self.blobs_collection].bulk_write(blobs, ordered=False)
+
+        checkpoint_type, checkpoint_data = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        await db[self.checkpoints_collection].update_one(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]},
+            {"$set": {
+                "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                "checkpoint_type": checkpoint_type,
+                "checkpoint": Binary(checkpoint_data),
+                "metadata_type": metadata_type,
+                "metadata": Binary(metadata_data),
+                "created_at": datetime.now(),
+            }},
+            upsert=True,
+        )
+        if not self.keep_history:
+            await self._prune(db, thread_id, checkpoint_ns, checkpoint["id"], checkpoint["channel_versions"])
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    async def _prune(self, db, thread_id: str, checkpoint_ns: str, checkpoint_id: str, versions: ChannelVersions):
+        thread = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}
+        await db[self.checkpoints_collection].delete_many({**thread, "checkpoint_id": {"$lt": checkpoint_id}})
+        await db[self.writes_collection].delete_many({**thread, "checkpoint_id": {"$lt": checkpoint_id}})
+        live = [{"channel": channel, "version": version} for channel, version in versions.items()]
+        await db[self.blobs_collection].delete_many({**thread, "$nor": live} if live else thread)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        db = get_database()
+        key = {
+            "thread_id": config["configurable"]["thread_id"],
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+            "checkpoint_id": config["configurable"]["checkpoint_id"],
+            "task_id": task_id,
+        }
+        operations = []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            document = {"channel": channel, "task_path": task_path, **self._dump(value)}
+            # Regular writes are idempotent per (task, idx); special channels (errors, interrupts) overwrite.
+            update = {"$setOnInsert": document} if idx >= 0 else {"$set": document}
+            operations.append(UpdateOne({**key, "idx": idx}, update, upsert=True))
+        if operations:
+            await db[self.writes_collection].bulk_write(operations, ordered=False)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        db = get_database()
+        for collection in (self.checkpoints_collection, self.blobs_collection, self.writes_collection):
+            await db[collection].delete_many({"thread_id": thread_id})
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # Same zero-padded "<n>.<random>" scheme as the in-memory saver so versions sort as strings.
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+checkpointer = MongoCheckpointSaver()
@@ -1,4 +1,5 @@
 import motor.motor_asyncio
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
 import os
 load_dotenv()
@@ -11,6 +12,30 @@ async def connect_to_mongo():
     client = motor.motor_asyncio.AsyncIOMotorClient(os.getenv("MONGODB_URI"))
     db = client[os.getenv("DATABASE_NAME")]
 
+async def ensure_indexes():
+    """
+    Create the indexes the services rely on; safe to run on every startup.
+    """
+    try:
+        await db.users.create_index("email", unique=True)
+    except OperationFailure as e:
+        # Existing duplicate emails block the unique index; keep logins indexed until they're cleaned up.
+        print(f"⚠️ Unique index on users.email not created: {str(e)}")
+        await db.users.create_index("email", name="email_lookup")
+    await db.question_bank.create_index([("key_id", 1), ("question", 1)], unique=True)
+    await db.interview_memory.create_index("interview_id", unique=True)
+    await db.interview_checkpoints.create_index([("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", -1)], unique=True)
+    await db.interview_checkpoint_blobs.create_index([("thread_id", 1), ("checkpoint_ns", 1), ("channel", 1), ("version", 1)], unique=True)
+    await db.interview_checkpoint_writes.create_index([("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", 1), ("task_id", 1), ("idx", 1)], unique=True)
+    await db.jobs.create_index([("status", 1), ("run_after", 1)])
+    await db.jobs.create_index([("kind", 1), ("interview_id", 1)])
+    await db.interview_archives.create_index("interview_id", unique=True)
+    await db.interview_conversations.create_index([("interview_id", 1), ("sender", 1)])
+    await db.interview_conversations.create_index(
+        [("interview_id", 1), ("turn", 1)], unique=True, partialFilterExpression={"turn": {"$exists": True}}
+    )
+    await db.users.create_index("deletion_requested_at", sparse=True)
+
 async def close_mongo_connection():
     global client
     if client:
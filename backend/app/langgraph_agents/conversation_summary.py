@@ -0,0 +1,74 @@
+from typing_extensions import TypedDict, List, Dict
+from langchain_core.messages import SystemMessage, HumanMessage
+from app.langgraph_agents.models import get_llm
+from langgraph.graph import StateGraph
+from langchain_core.exceptions import LangChainException
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+class AgentState(TypedDict):
+    summary: str
+    question_answer_arr: List[Dict]
+    updated_summary: str
+
+
+SUMMARY_MAX_WORDS = int(os.getenv("CONVERSATION_SUMMARY_MAX_WORDS", 250))
+
+llm = get_llm("summary")
+
+def call_llm(state: AgentState) -> AgentState:
+    """
+    Fold a batch of older Question & Answer pairs into the running interview summary.
+
+    The summary replaces those pairs in later prompts, so it keeps what the report needs:
+    topics covered, how well each was answered, notable strengths and gaps, and pacing where measured.
+    """
+
+    system_message = SystemMessage(content=(
+        "You maintain a running summary of a job interview so that later analysis does not need the full transcript. "
+        "You receive the current summary (possibly empty) and the next Question & Answer pairs, in order. "
+        "Return an updated summary that:\n"
+        "1. Keeps everything important from the current summary.\n"
+        "2. Adds, for each new pair, the topic asked, the quality and correctness of the answer, and any concrete examples the candidate gave.\n"
+        "3. Notes measured pacing (words per minute, pauses) when a pair includes a `pacing` entry.\n"
+        "4. Records recurring strengths and weaknesses rather than repeating them per question.\n"
+        f"5. Stays under {SUMMARY_MAX_WORDS} words, compressing older details first.\n\n"
+        "Return only the summary text, with no headings or extra commentary."
+    ))
+
+    human_message = HumanMessage(content=(
+        f"Current summary:\n{state['summary'] or 'None'}\n\n"
+        f"New Question & Answer pairs:\n{state['question_answer_arr']}"
+    ))
+
+    try:
+        state['updated_summary'] = llm.invoke([system_message, human_message])
+        return {"updated_summary": state['updated_summary']}
+    except LangChainException as e:
+        raise RuntimeError(f"LLM call failed: {str(e)}")
+    except Exception as e:
+        raise e
+
+
+graph = StateGraph(AgentState)
+graph.add_node("llm", call_llm)
+graph.set_entry_point("llm")
+graph.set_finish_point("llm")
+
+app = graph.compile()
+
+async def summarize_conversation(summary: str, question_answer_arr: list) -> str:
+    """Fold `question_answer_arr` into `summary` using the LangGraph agent."""
+    try:
+        result = await app.ainvoke({"summary": summary, "question_answer_arr": question_answer_arr, "updated_summary": ""})
+        if isinstance(result, dict) and 'updated_summary' in result:
+            ai_message = result['updated_summary']
+            if hasattr(ai_message, 'content'):
+                return ai_message.content
+            return ai_message
+        return summary
+
+    except Exception as e:
+        raise e
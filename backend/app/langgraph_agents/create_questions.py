@@ -1,9 +1,15 @@
 from typing_extensions import TypedDict, Dict, List
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
+from app.langgraph_agents.models import get_llm
 from langgraph.graph import StateGraph
 from langchain_core.exceptions import LangChainException
+from collections import deque
+from functools import lru_cache
 from dotenv import load_dotenv
+from app.services.question_similarity import topic_summary
+from app.services.resilience import resilient_call
+import tiktoken
+import os
 
 load_dotenv()
 
@@ -14,83 +20,132 @@ class AgentState(TypedDict):
 
 
 
-llm = ChatOpenAI(model="gpt-5-mini", temperature='0.6')
+llm = get_llm("question")
 
-def make_question_agent(state: AgentState) -> AgentState:
-    """
-    Generate the next interview question for the candidate based on interview details,
-    while maintaining a smooth conversational tone.
+HISTORY_TOKEN_BUDGET = int(os.getenv("QUESTION_HISTORY_TOKEN_BUDGET", 1500))
 
-    This agent:
-    - Analyzes `interview_info` (domain, experience, interview_type, difficulty) to frame 
-      the next meaningful question.
-    - Reads `all_questions_asked` to ensure the new question is unique and not repetitive.
-    - If there was a previous question, acknowledges it before asking the next one with a friendly tone.
-    - If no previous questions exist, it directly generates the first relevant question.
-
-    Behavior:
-    - The acknowledgment line is neutral and does not assume the content of the user's answer.
-    - The new question should be relevant to the interview’s domain, type, and difficulty.
-    - Avoid rephrasing or repeating previously asked questions.
-    - The response must contain only one clear and specific question.
-    """
+# Kept byte-identical across calls so the provider's prompt cache can reuse it;
+# everything that varies per interview or per turn goes into the human messages after it.
+QUESTION_SYSTEM_PROMPT = """
+You are a professional and friendly AI interviewer conducting a job interview.
 
-    last_question = state['all_questions_asked'][-1] if state['all_questions_asked'] else None
+Each request gives you, after these instructions:
+- `domain`: the technical or functional area of the interview (e.g., MERN Stack Developer, Data Analyst)
+- `experience`: candidate’s total experience in years
+- `interview_type`: specifies whether the interview is Technical, Managerial, HR, etc.
+- `difficulty`: how challenging the questions should be (Easy, Medium, Hard)
+- `topics_covered`: one line per question you have already asked, oldest first, listing its key terms (older ones may be noted as omitted)
+- `last_question`: the most recent question, or None if this is the first question
 
-    if last_question:
-        acknowledgment_instruction = (
-            "Start your response with a short, neutral, and friendly acknowledgment referring to the previous question. "
-            f"For example, if the previous question was '{last_question}', you might start with: "
-            "'Thanks for answering the previous question! Now let's move on to the next one.'"
-        )
-    else:
-        acknowledgment_instruction = (
-            "Since there are no previous questions, do not add an acknowledgment. "
-            "Simply generate the first relevant question based on the interview info."
-        )
+If `last_question` is not None, start your response with a short, neutral, and friendly acknowledgment referring to the previous question,
+for example: 'Thanks for answering the previous question! Now let's move on to the next one.'
+The acknowledgment must not assume the content of the user's answer.
+If `last_question` is None, do not add an acknowledgment; simply generate the first relevant question based on the interview info.
+
+After the acknowledgment (if any), generate ONE new, unique, and relevant question.
+- The question must NOT revisit or rephrase any topic listed in `topics_covered`.
+- Keep it professional, specific, and consistent with the interview flow.
+- Do not ask multiple questions in a single response.
+- Use simple, clear, and natural English suitable for the interview context.
+
+Example:
+- Input:
+domain = 'MERN Stack Developer'
+experience = '3 years'
+interview_type = 'Technical'
+difficulty = 'Medium'
+topics_covered = "1. concept virtual dom react\n2. useeffect work"
+last_question = "How does useEffect work?"
+
+- Output:
+'Thanks for answering the previous question! Now let's move ahead — can you explain how you would optimize API performance in a Node.js and MongoDB-based MERN application?'
+
+Remember: Only output a natural one-line acknowledgment (if applicable) followed by one new interview question.
+"""
+
+prompt_token_stats = {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "uncached_tokens": 0, "recent": deque(maxlen=50)}
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        return tiktoken.encoding_for_model("gpt-5-mini")
+    except Exception:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return None
 
-    all_questions_text = "\n".join(state['all_questions_asked']) if state['all_questions_asked'] else "None"
 
-    system_message = SystemMessage(content=f"""
-        You are a professional and friendly AI interviewer conducting a job interview.
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        # Offline fallback when the BPE files can't be loaded: ~4 characters per token.
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
 
-        You have access to the following data:
-        - `domain`: the technical or functional area of the interview (e.g., MERN Stack Developer, Data Analyst)
-        - `experience`: candidate’s total experience in years
-        - `interview_type`: specifies whether the interview is Technical, Managerial, HR, etc.
-        - `difficulty`: how challenging the questions should be (Easy, Medium, Hard)
-        - `all_questions_asked`: a list of all previous questions you have already asked
-        {all_questions_text}
 
-        {acknowledgment_instruction}
+def budget_question_history(lines: List[str], budget: int = HISTORY_TOKEN_BUDGET) -> str:
+    """
+    Keep the most recent history lines whose combined size fits `budget` tokens and
+    note how many older ones were left out.
+    """
+    kept, used = [], 0
+    for line in reversed(lines):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+
+    kept.reverse()
+    omitted = len(lines) - len(kept)
+    lines = [f"({omitted} earlier questions omitted)"] if omitted else []
+    return "\n".join(lines + kept) if (lines or kept) else "None"
+
+
+def _record_prompt_usage(message):
+    usage = getattr(message, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0)
+    cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+
+    prompt_token_stats["calls"] += 1
+    prompt_token_stats["input_tokens"] += input_tokens
+    prompt_token_stats["cached_tokens"] += cached_tokens
+    prompt_token_stats["uncached_tokens"] += input_tokens - cached_tokens
+    prompt_token_stats["recent"].append({"input_tokens": input_tokens, "cached_tokens": cached_tokens})
+
 
-        After the acknowledgment (if any), generate ONE new, unique, and relevant question.
-        - The question must NOT be similar to or rephrased from any question in `all_questions_asked`.
-        - Keep it professional, specific, and consistent with the interview flow.
-        - Do not ask multiple questions in a single response.
-        - Use simple, clear, and natural English suitable for the interview context.
+async def make_question_agent(state: AgentState) -> AgentState:
+    """
+    Generate the next interview question for the candidate based on interview details,
+    while maintaining a smooth conversational tone.
 
-        Example:
-        - Input:
-        domain = 'MERN Stack Developer'
-        experience = '3 years'
-        interview_type = 'Technical'
-        difficulty = 'Medium'
-        all_questions_asked = "Explain the concept of Virtual DOM in React.\nHow does useEffect work?"
+    The system prompt is static. Interview details follow as one message (stable for the whole
+    interview), then the token-budgeted topic summary and last question as the final message,
+    so consecutive calls share the longest possible prompt prefix.
+    """
 
-        - Output:
-        'Thanks for answering the previous question! Now let's move ahead — can you explain how you would optimize API performance in a Node.js and MongoDB-based MERN application?'
+    questions = state['all_questions_asked']
+    last_question = questions[-1] if questions else None
 
-        Remember: Only output a natural one-line acknowledgment (if applicable) followed by one new interview question.
-    """)
+    interview_message = HumanMessage(content=(
+        f"domain = {state['interview_info']['domain']!r}\n"
+        f"experience = {state['interview_info']['experience']!r}\n"
+        f"interview_type = {state['interview_info']['interview_type']!r}\n"
+        f"difficulty = {state['interview_info']['difficulty']!r}"
+    ))
 
-    domain = state['interview_info']['domain']
-    experience = state['interview_info']['experience']
-    interview_type = state['interview_info']['interview_type']
-    difficulty = state['interview_info']['difficulty']
+    # Uniqueness is enforced locally by the duplicate guard, so only compact topic lines are sent.
+    history_lines = topic_summary(questions).splitlines() if questions else []
+    history_message = HumanMessage(content=(
+        f"topics_covered:\n{budget_question_history(history_lines)}\n\n"
+        f"last_question = {last_question!r}"
+    ))
 
     try:
-        state['new_question'] = llm.invoke([system_message, domain, experience, interview_type, difficulty])
+        state['new_question'] = await llm.ainvoke([SystemMessage(content=QUESTION_SYSTEM_PROMPT), interview_message, history_message])
+        _record_prompt_usage(state['new_question'])
         return {"new_question": state['new_question']}
     except LangChainException as e:
         raise e
@@ -107,10 +162,17 @@ graph.set_finish_point("make_question")
 
 app = graph.compile()
 
-async def generate_ai_response(interview_info: Dict, all_questions: list) -> str:
-    """Generate title using the LangGraph agent."""
+async def generate_ai_response(interview_info: Dict, all_questions: list, hedge: bool = True) -> str:
+    """
+    Generate the next question using the LangGraph agent. Interactive turns hedge slow requests;
+    raises when OpenAI is down so the caller can fall back to banked questions.
+    """
     try:
-        result = app.invoke({"interview_info": interview_info, "all_questions_asked": all_questions})
+        result = await resilient_call(
+            "question",
+            lambda: app.ainvoke({"interview_info": interview_info, "all_questions_asked": all_questions}),
+            provider="openai", hedge=hedge
+        )
         if isinstance(result, dict) and 'new_question' in result:
             ai_message = result['new_question']
             if hasattr(ai_message, 'content'):
@@ -1,6 +1,6 @@
 from typing_extensions import TypedDict, Dict, List
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
+from app.langgraph_agents.models import get_llm
 from langgraph.graph import StateGraph
 from langchain_core.exceptions import LangChainException
 from dotenv import load_dotenv
@@ -14,7 +14,7 @@ class AgentState(TypedDict):
     detailed_breakdown: str
 
 
-llm = ChatOpenAI(model="gpt-5-mini", temperature='0.4')
+llm = get_llm("breakdown")
 
 def call_llm(state: AgentState) -> AgentState:
     """
@@ -53,6 +53,10 @@ def call_llm(state: AgentState) -> AgentState:
       ...
     ]
     
+    Some question-answer pairs include a `pacing` object measured from the candidate's audio (wpm = words per minute,
+    speech_s = seconds spent speaking, pause_ratio, longest_pause_s). When present, use these numbers when commenting on
+    delivery and pacing rather than guessing from the transcript.
+
     Make sure all fields are included for each question, and provide thoughtful, actionable insights.
     """)
 
@@ -87,7 +91,7 @@ async def generate_detailed_breakdown(interview: dict, report: str, question_ans
     Async wrapper that calls the LangGraph agent (call_llm) to generate the final PDF-ready text.
     """
     try:
-        result = app.invoke({"interview": interview, "full_report_text": report, "question_answer_arr": question_answer_arr})
+        result = await app.ainvoke({"interview": interview, "full_report_text": report, "question_answer_arr": question_answer_arr})
         if isinstance(result, dict) and 'detailed_breakdown' in result:
             ai_message = result['detailed_breakdown']
             if hasattr(ai_message, 'content'):
@@ -1,9 +1,10 @@
 from typing_extensions import TypedDict
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
+from app.langgraph_agents.models import get_llm
 from langgraph.graph import StateGraph
 from langchain_core.exceptions import LangChainException
 import re
+from app.services.resilience import resilient_call
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,9 +16,9 @@ class AgentState(TypedDict):
     interview_type: str
 
 
-llm = ChatOpenAI(model="gpt-5-mini", temperature='0.5')
+llm = get_llm("greeting")
 
-def call_llm(state: AgentState) -> AgentState:
+async def call_llm(state: AgentState) -> AgentState:
     """
     Generate a short, friendly, and personalized opening message for the interview.
 
@@ -47,7 +48,7 @@ def call_llm(state: AgentState) -> AgentState:
     interview_type = HumanMessage(content=state['interview_type'])
 
     try:
-        state["first_text"] = llm.invoke([system_message, user_name, domain, interview_type])
+        state["first_text"] = await llm.ainvoke([system_message, user_name, domain, interview_type])
         return {"first_text": state["first_text"]}
 
     except LangChainException as e:
@@ -63,10 +64,21 @@ graph.set_finish_point("llm")
 
 app = graph.compile()
 
+def default_first_text(user_name: str) -> str:
+    return f"Hello {user_name}, and welcome to your interview. We'll start with a few questions about your experience. Are you ready?"
+
+
 async def generate_first_text(user_name: str, domain: str, interview_type:str) -> str:
-    """Generate title using the LangGraph agent."""
+    """Generate title using the LangGraph agent; falls back to a fixed greeting when OpenAI is slow or down."""
+    async def fallback():
+        return {"first_text": default_first_text(user_name)}
+
     try:
-        result = app.invoke({"user_name": user_name, "domain": domain, "interview_type": interview_type, "first_text": ""})
+        result = await resilient_call(
+            "greeting",
+            lambda: app.ainvoke({"user_name": user_name, "domain": domain, "interview_type": interview_type, "first_text": ""}),
+            provider="openai", hedge=True, fallback=fallback
+        )
         if isinstance(result, dict) and 'first_text' in result:
             ai_message = result['first_text']
             if hasattr(ai_message, 'content'):
@@ -1,6 +1,6 @@
 from typing_extensions import TypedDict, Dict, List
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
+from app.langgraph_agents.models import get_llm
 from langgraph.graph import StateGraph
 from langchain_core.exceptions import LangChainException
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
@@ -18,7 +18,7 @@ class AgentState(TypedDict):
     full_report_text: str
     report: dict
 
-llm = ChatOpenAI(model="gpt-5-mini", temperature='0.3')
+llm = get_llm("narrative")
 
 def call_llm(state: AgentState) -> AgentState:
     """
@@ -68,7 +68,7 @@ async def get_full_report(report: dict) -> str:
     Async wrapper that calls the LangGraph agent (call_llm) to generate the final PDF-ready text.
     """
     try:
-        result = app.invoke({"report": report})
+        result = await app.ainvoke({"report": report})
         if isinstance(result, dict) and 'full_report_text' in result:
             ai_message = result['full_report_text']
             if hasattr(ai_message, 'content'):
@@ -0,0 +1,171 @@
+from typing_extensions import TypedDict, Dict, List, Optional
+from typing import Any, AsyncIterator, Tuple
+from langgraph.graph import StateGraph, START, END
+from app.db.checkpointer import checkpointer
+from app.langgraph_agents.first_ai_text import generate_first_text
+from app.langgraph_agents.last_ai_text import interview_finished_message
+from app.langgraph_agents.interview_report import generate_interview_report
+from app.services.interview_turns import question_limit, next_ai_text, load_interview_info, load_asked_questions
+import asyncio
+
+
+class InterviewState(TypedDict, total=False):
+    step: str
+    interview_info: Dict
+    user_name: str
+    questions: List[str]
+    question_count: int
+    finished: bool
+    ai_text: str
+    ai_audio: Optional[Dict]
+    report_interview: Dict
+    question_answer_arr: List[Dict]
+    earlier_ai_likelihood: List[Dict]
+    pacing_metrics: Optional[Dict]
+    conversation_summary: str
+    report: Dict
+
+
+def route_turn(state: InterviewState) -> str:
+    """Pick the node for this turn: `greet` and `report` are explicit steps, `next` advances the question loop."""
+    step = state.get("step")
+    if step == "greet":
+        return "greeting"
+    if step == "report":
+        return "report"
+    if state.get("question_count", 0) >= question_limit(state["interview_info"]):
+        return "farewell"
+    return "question"
+
+
+async def greeting_node(state: InterviewState) -> InterviewState:
+    info = state["interview_info"]
+    text = await generate_first_text(state.get("user_name", ""), info.get("domain"), info.get("interview_type"))
+    return {"ai_text": text, "ai_audio": None}
+
+
+async def question_node(state: InterviewState) -> InterviewState:
+    questions = list(state.get("questions", []))
+    text, finished, audio = await next_ai_text(state["interview_info"], questions, state.get("question_count", 0))
+    if finished:
+        return {"ai_text": text, "ai_audio": None, "finished": True}
+    return {"ai_text": text, "ai_audio": audio, "questions": questions + [text], "question_count": len(questions) + 1}
+
+
+async def farewell_node(state: InterviewState) -> InterviewState:
+    text = await interview_finished_message()
+    return {"ai_text": text, "ai_audio": None, "finished": True}
+
+
+async def report_node(state: InterviewState) -> InterviewState:
+    report = await generate_interview_report(
+        state["report_interview"], state["question_answer_arr"], state.get("pacing_metrics"), state.get("conversation_summary", ""),
+        state.get("earlier_ai_likelihood")
+    )
+    return {"report": report}
+
+
+graph = StateGraph(InterviewState)
+graph.add_node("greeting", greeting_node)
+graph.add_node("question", question_node)
+graph.add_node("farewell", farewell_node)
+graph.add_node("report", report_node)
+graph.add_conditional_edges(START, route_turn, ["greeting", "question", "farewell", "report"])
+for node in ("greeting", "question", "farewell", "report"):
+    graph.add_edge(node, END)
+
+# Turns run on the uncheckpointed graph; `commit_turn` writes the result to the checkpoint only
+# once the caller has saved the turn, so the checkpoint never gets ahead of the conversation.
+turn_graph = graph.compile()
+interview_graph = graph.compile(checkpointer=checkpointer)
+
+# The graph's own progress. Interview info and completion always come from the interview document
+# (the timer route can end an interview), and audio and report data are per-turn only.
+CHECKPOINTED_FIELDS = ("user_name", "questions", "question_count")
+STATE_FIELDS = ("interview_info", "finished") + CHECKPOINTED_FIELDS
+
+
+def _config(interview_id: str) -> dict:
+    return {"configurable": {"thread_id": interview_id}}
+
+
+def _is_finished(interview_info: dict, question_count: int) -> bool:
+    return question_count > question_limit(interview_info) or interview_info.get("completion") == "completed"
+
+
+async def load_interview_state(db, interview_id: str) -> Optional[dict]:
+    """
+    State of an interview: the interview info (and so its completion) from the cached interview
+    document, the question progress from the latest checkpoint. Interviews without a checkpoint yet
+    (e.g. started before the graph existed) are seeded once from Mongo; the seed is persisted by the
+    next commit.
+    """
+    interview_info, snapshot = await asyncio.gather(
+        load_interview_info(db, interview_id),
+        interview_graph.aget_state(_config(interview_id))
+    )
+    if not interview_info:
+        return None
+
+    if "question_count" in snapshot.values:
+        state = {key: snapshot.values[key] for key in CHECKPOINTED_FIELDS if key in snapshot.values}
+    else:
+        questions = await load_asked_questions(db, interview_id)
+        state = {"questions": questions, "question_count": len(questions), "_seeded": True}
+    return {**state, "interview_info": interview_info, "finished": _is_finished(interview_info, state["question_count"])}
+
+
+async def advance_interview(db, interview_id: str, step: str = "next", state: Optional[dict] = None, **inputs) -> Optional[dict]:
+    """
+    Run one turn of the interview graph for `interview_id` from its checkpointed state, without
+    saving it. Returns the new state (`ai_text`, `ai_audio`, `finished`, `question_count`, ...), or
+    None if the interview doesn't exist. Call `commit_turn` once the turn is stored in the conversation.
+    """
+    if state is None:
+        state = await load_interview_state(db, interview_id)
+        if state is None:
+            return None
+    turn = await turn_graph.ainvoke(_turn_values(state, step, inputs))
+    return {**turn, "_previous": state}
+
+
+async def commit_turn(interview_id: str, turn: dict):
+    """
+    Checkpoint the progress made by a turn from `advance_interview`: the fields of CHECKPOINTED_FIELDS
+    that differ from the state it started from (`_previous`), or all of them for a seeded interview.
+    The saver keeps only the newest checkpoint of each interview.
+    """
+    previous = turn.get("_previous") or {}
+    update = {
+        key: turn[key] for key in CHECKPOINTED_FIELDS
+        if key in turn and (previous.get("_seeded") or turn[key] != previous.get(key))
+    }
+    if not update:
+        return
+    node = "greeting" if turn.get("step") == "greet" else "farewell" if turn.get("finished") else "question"
+    await interview_graph.aupdate_state(_config(interview_id), update, as_node=node)
+
+
+async def stream_interview(db, interview_id: str, step: str = "next", state: Optional[dict] = None, **inputs) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Same turn as `advance_interview`, streamed: yields `("token", text)` for every token an agent
+    emits while generating (currently the report), then `("state", new_state)` once it is done.
+    """
+    if state is None:
+        state = await load_interview_state(db, interview_id)
+        if state is None:
+            return
+
+    final = None
+    async for namespace, mode, item in turn_graph.astream(_turn_values(state, step, inputs), stream_mode=["custom", "values"], subgraphs=True):
+        if mode == "custom" and "report_token" in item:
+            yield "token", item["report_token"]
+        elif mode == "values" and not namespace:
+            final = item
+    yield "state", final
+
+
+def _turn_values(state: dict, step: str, inputs: dict) -> dict:
+    values = {key: state[key] for key in STATE_FIELDS if key in state}
+    values.update({"step": step, **inputs})
+    return values
@@ -1,31 +1,43 @@
-from typing_extensions import TypedDict, Dict, List
+from typing_extensions import TypedDict, Dict, List, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
+from app.langgraph_agents.models import get_llm
 from langgraph.graph import StateGraph
+from langgraph.config import get_stream_writer
 from langchain_core.exceptions import LangChainException
+from app.services.partial_json import parse_json_array
 from dotenv import load_dotenv
+import json
 
 load_dotenv()
 
 class AgentState(TypedDict):
     interview: Dict
     question_answer_arr: List
+    earlier_ai_likelihood: List
+    pacing_metrics: Optional[Dict]
+    conversation_summary: str
     report: str
     ai_likelihood: str
 
-llm = ChatOpenAI(model="gpt-5-mini", temperature='0.2')
+llm = get_llm("report")
+likelihood_llm = get_llm("likelihood")
 
-def call_llm(state: AgentState)-> AgentState:
+async def call_llm(state: AgentState)-> AgentState:
     """
     Calls the LLM to generate an interview report based on the provided interview details
     and Question & Answer pairs, incorporating AI-likelihood data.
+
+    The report is streamed; each token is also emitted as a `{"report_token": ...}` custom
+    stream event so callers streaming the graph can render sections as they complete.
     """
-    ai_likelihood_response = is_answer_ai_generated(state)
+    ai_likelihood_response = await is_answer_ai_generated(state)
 
     system_message = SystemMessage(content=(
         "You are an expert interview analyst and interviewer. Your task is to evaluate the provided interview details "
         "and the list of AI-question / user-answer pairs (supplied at runtime) and return a structured JSON object "
-        "summarizing the interview analysis. DO NOT return HTML or CSS. The frontend already has a fixed design.\n\n"
+        "summarizing the interview analysis. For long interviews the earlier pairs arrive as a running summary and only "
+        "the most recent pairs are given verbatim; weigh both when scoring. "
+        "DO NOT return HTML or CSS. The frontend already has a fixed design.\n\n"
 
         "You must analyze the user's answers honestly and critically, determining how suitable each answer was "
         "for the AI's question. Then generate an overview summary of the entire interview — not question-by-question.\n\n"
@@ -50,7 +62,9 @@ def call_llm(state: AgentState)-> AgentState:
 
         "Scoring rules:\n"
         "- Clarity Score → measures how clear, focused, and unambiguous the answers were.\n"
-        "- Pacing Score → measures answer structure, conciseness, and flow.\n"
+        "- Pacing Score → measures answer structure, conciseness, and flow. When measured pacing metrics are supplied "
+        "(words per minute, pause ratio, longest pause), base the Pacing Score on those numbers — roughly 120–160 wpm "
+        "with few long pauses is ideal — instead of inferring pacing from the transcript.\n"
         "- Overall Score → weighted average: 40% clarity, 40% relevance/technical correctness, 20% pacing.\n\n"
 
         "Guidelines:\n"
@@ -69,14 +83,21 @@ def call_llm(state: AgentState)-> AgentState:
 
     human_message = HumanMessage(content=(
         f"Interview Metadata:\n{state['interview']}\n\n"
+        f"Summary of earlier Question & Answer pairs:\n{state.get('conversation_summary') or 'None (all pairs are listed below)'}\n\n"
         f"Ordered Question & Answer Pairs:\n{state['question_answer_arr']}\n\n"
         f"AI-likelihood analysis for each answer:\n{ai_likelihood_response}\n\n"
+        f"Measured pacing metrics:\n{state.get('pacing_metrics') or 'Not available (text answers)'}\n\n"
         "Produce the final interview report JSON now, incorporating the AI-likelihood data as described."
     ))
 
 
     try:
-        state['report'] = llm.invoke([system_message, human_message])
+        writer = get_stream_writer()
+        tokens = []
+        async for chunk in llm.astream([system_message, human_message]):
+            tokens.append(chunk.content)
+            writer({"report_token": chunk.content})
+        state['report'] = "".join(tokens)
         return {"report": state['report']}
     
     except LangChainException as e:
@@ -85,8 +106,19 @@ def call_llm(state: AgentState)-> AgentState:
         raise e
     
 
-def is_answer_ai_generated(state) -> str:
-    """Placeholder function to determine if user's answer is AI-generated or AI-Likelihood."""
+async def is_answer_ai_generated(state) -> str:
+    """
+    AI-likelihood of every answer: the scores stored when the earlier answers were folded into the
+    summary, then a fresh score of the verbatim pairs. The prompt never grows past the verbatim part.
+    """
+    scores = await score_ai_likelihood(state['question_answer_arr'])
+    return json.dumps((state.get('earlier_ai_likelihood') or []) + scores)
+
+
+async def score_ai_likelihood(question_answer_arr: list) -> list:
+    """One `{assessment, percentage}` per pair, in order; unparseable or missing entries are 'Unknown'."""
+    if not question_answer_arr:
+        return []
 
     system_message = SystemMessage(content=(
         "You are an expert at detecting AI-generated text. Given a user's answer, determine how likely it was generated "
@@ -104,15 +136,16 @@ def is_answer_ai_generated(state) -> str:
     ))
 
     human_message = HumanMessage(content=(
-        f"Ordered Question & Answer Pairs:\n{state['question_answer_arr']}\n\n"
+        f"Ordered Question & Answer Pairs:\n{question_answer_arr}\n\n"
         "For each answer, assess the likelihood it was AI-generated. Provide JSON output as specified above."
     ))
 
 
     try:
 
-        response = llm.invoke([system_message, human_message])
-        return response.content
+        response = await likelihood_llm.ainvoke([system_message, human_message])
+        scores = [score for score in parse_json_array(response.content) if isinstance(score, dict)][:len(question_answer_arr)]
+        return scores + [{"assessment": "Unknown", "percentage": None}] * (len(question_answer_arr) - len(scores))
     
     except LangChainException as e:
         raise RuntimeError(f"LLM call failed: {str(e)}")
@@ -127,10 +160,10 @@ graph.set_finish_point("llm")
 
 app = graph.compile()
 
-async def generate_interview_report(interview: dict, question_answer_arr: list) -> str:
-    """Generate interview report using the LangGraph agent."""
+async def generate_interview_report(interview: dict, question_answer_arr: list, pacing_metrics: Optional[dict] = None, conversation_summary: str = "", earlier_ai_likelihood: Optional[list] = None) -> str:
+    """Generate interview report using the LangGraph agent. `question_answer_arr` is the verbatim part; `earlier_ai_likelihood` the stored scores of the summarised answers."""
     try:
-        result = app.invoke({"interview": interview, "question_answer_arr": question_answer_arr, "report": ""})
+        result = await app.ainvoke({"interview": interview, "question_answer_arr": question_answer_arr, "earlier_ai_likelihood": earlier_ai_likelihood or [], "pacing_metrics": pacing_metrics, "conversation_summary": conversation_summary, "report": ""})
         if isinstance(result, dict) and 'report' in result:
             ai_message = result['report']
             if hasattr(ai_message, 'content'):
@@ -1,9 +1,10 @@
 from typing_extensions import TypedDict
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
+from app.langgraph_agents.models import get_llm
 from langgraph.graph import StateGraph
 from langchain_core.exceptions import LangChainException
 import re
+from app.services.resilience import resilient_call
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,9 +13,9 @@ class AgentState(TypedDict):
     last_text: str
 
 
-llm = ChatOpenAI(model="gpt-5-mini", temperature='0.7')
+llm = get_llm("farewell")
 
-def call_llm(state: AgentState) -> AgentState:
+async def call_llm(state: AgentState) -> AgentState:
     """
     Generate a short, friendly, and engaging farewell message after the interview.
 
@@ -40,7 +41,7 @@ def call_llm(state: AgentState) -> AgentState:
     ))
 
     try:
-        state["last_text"] = llm.invoke([system_message])
+        state["last_text"] = await llm.ainvoke([system_message])
         return {"last_text": state["last_text"]}
     except LangChainException as e:
         raise e
@@ -56,10 +57,19 @@ graph.set_finish_point("llm")
 
 app = graph.compile()
 
+DEFAULT_LAST_TEXT = (
+    "Thank you for taking part in the interview! We wish you all the best for your future opportunities. "
+    "You can check out a summary of this interview by clicking the button below."
+)
+
+
 async def interview_finished_message() -> str:
-    """Generate last text at the end of interview using the LangGraph agent."""
+    """Generate last text at the end of interview using the LangGraph agent; falls back to a fixed farewell."""
+    async def fallback():
+        return {"last_text": DEFAULT_LAST_TEXT}
+
     try:
-        result = app.invoke({"last_text": ""})
+        result = await resilient_call("farewell", lambda: app.ainvoke({"last_text": ""}), provider="openai", hedge=True, fallback=fallback)
         if isinstance(result, dict) and 'last_text' in result:
             ai_message = result['last_text']
             if hasattr(ai_message, 'content'):
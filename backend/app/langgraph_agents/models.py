@@ -0,0 +1,116 @@
+from langchain_openai import ChatOpenAI
+from langchain_core.callbacks import BaseCallbackHandler
+from collections import deque
+from functools import lru_cache
+from dotenv import load_dotenv
+import time
+import os
+
+load_dotenv()
+
+
+# Latency tiers. "fast" serves interactive interview turns, "heavy" the offline report agents.
+MODEL_TIERS = {
+    "fast": {
+        "model": os.getenv("LLM_FAST_MODEL", "gpt-5-mini"),
+        "timeout": float(os.getenv("LLM_FAST_TIMEOUT", 20)),
+        "max_retries": int(os.getenv("LLM_FAST_MAX_RETRIES", 1)),
+    },
+    "heavy": {
+        "model": os.getenv("LLM_HEAVY_MODEL", "gpt-5-mini"),
+        "timeout": float(os.getenv("LLM_HEAVY_TIMEOUT", 120)),
+        "max_retries": int(os.getenv("LLM_HEAVY_MAX_RETRIES", 2)),
+    },
+}
+
+# agent task -> (default tier, temperature). `LLM_TIER_<TASK>` moves a task to another tier and
+# `LLM_MODEL_<TASK>` pins it to a specific model, e.g. LLM_MODEL_REPORT=gpt-5.
+AGENT_ROUTES = {
+    "greeting": ("fast", 0.5),
+    "question": ("fast", 0.6),
+    "farewell": ("fast", 0.7),
+    "summary": ("heavy", 0.2),
+    "likelihood": ("heavy", 0.2),
+    "report": ("heavy", 0.2),
+    "breakdown": ("heavy", 0.4),
+    "narrative": ("heavy", 0.3),
+}
+
+LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", 200))
+
+route_stats = {}
+
+
+def _percentile(samples, fraction: float):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+
+def route_config(task: str) -> dict:
+    """Resolved model, timeout and retry policy for an agent task."""
+    if task not in AGENT_ROUTES:
+        raise ValueError(f"Unknown agent task: {task}")
+    default_tier, temperature = AGENT_ROUTES[task]
+    tier = os.getenv(f"LLM_TIER_{task.upper()}", default_tier)
+    if tier not in MODEL_TIERS:
+        raise ValueError(f"Unknown model tier for {task}: {tier}")
+    return {
+        **MODEL_TIERS[tier],
+        "model": os.getenv(f"LLM_MODEL_{task.upper()}", MODEL_TIERS[tier]["model"]),
+        "tier": tier,
+        "temperature": temperature,
+    }
+
+
+class _LatencyRecorder(BaseCallbackHandler):
+    """Records wall-clock latency and failures of every call made through one route."""
+
+    def __init__(self, task: str, config: dict):
+        self.task = task
+        self.started = {}
+        self.stats = route_stats.setdefault(task, {
+            "tier": config["tier"],
+            "model": config["model"],
+            "calls": 0,
+            "errors": 0,
+            "latency_ms": deque(maxlen=LATENCY_WINDOW),
+        })
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self.started.pop(run_id, None)
+        self.stats["calls"] += 1
+        if started is not None:
+            self.stats["latency_ms"].append((time.perf_counter() - started) * 1000)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self.started.pop(run_id, None)
+        self.stats["errors"] += 1
+
+
+@lru_cache(maxsize=None)
+def get_llm(task: str) -> ChatOpenAI:
+    """Chat model for an agent task, routed through AGENT_ROUTES with latency recording attached."""
+    config = route_config(task)
+    return ChatOpenAI(
+        model=config["model"],
+        temperature=config["temperature"],
+        timeout=config["timeout"],
+        max_retries=config["max_retries"],
+        callbacks=[_LatencyRecorder(task, config)],
+    )
+
+
+def route_latency_stats() -> dict:
+    return {
+        task: {
+            **{k: v for k, v in stats.items() if k != "latency_ms"},
+            "p50_ms": _percentile(stats["latency_ms"], 0.5),
+            "p95_ms": _percentile(stats["latency_ms"], 0.95),
+        }
+        for task, stats in route_stats.items()
+    }
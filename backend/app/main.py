@@ -1,12 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.db import connect_to_mongo, close_mongo_connection
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.services.audio_ingest import MAX_AUDIO_UPLOAD_BYTES
+from app.services.audio_preprocess import FFMPEG_BINARY
+from app.services.timer_buffer import timer_buffer
+from app.services.job_queue import job_queue
+from app.db.db import connect_to_mongo, close_mongo_connection, ensure_indexes
 from app.routes.auth_routes import router as auth_router
 from app.routes.interview_routes import router as interview_router
+from app.routes.interview_ws_routes import router as interview_ws_router
 from app.routes.interview_report_routes import router as interview_report_router
 from app.routes.history_report_routes import router as history_router
 from app.routes.profile_routes import router as profile_router
 from app.routes.dashboard_routes import router as dashboard_router
+from app.routes.metrics_routes import router as metrics_router
+from app.routes.job_routes import router as job_router
+import os
 
 app = FastAPI(title="IntervIQ Backend")
 
@@ -18,19 +28,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024)),
+    gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    zstd_level=int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3)),
+)
+
+# The largest legitimate body is an audio answer; leave room for the multipart framing around it.
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=int(os.getenv("MAX_REQUEST_BODY_BYTES", MAX_AUDIO_UPLOAD_BYTES + 64 * 1024)),
+)
+
 app.include_router(auth_router)
 app.include_router(interview_router)
+app.include_router(interview_ws_router)
 app.include_router(interview_report_router)
 app.include_router(history_router)
 app.include_router(profile_router)
 app.include_router(dashboard_router)
+app.include_router(metrics_router)
+app.include_router(job_router)
 
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
+    await ensure_indexes()
+    if FFMPEG_BINARY is None:
+        print("⚠️ ffmpeg not found; compressed voice answers are transcribed without preprocessing or pacing metrics")
+    timer_buffer.start()
+    job_queue.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await job_queue.stop()
+    await timer_buffer.stop()
     await close_mongo_connection()
 
 @app.get("/")
@@ -0,0 +1,204 @@
+import gzip
+import zlib
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+SUPPORTED_ENCODINGS = ("zstd", "gzip")
+
+ALREADY_COMPRESSED_TYPES = (
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/zstd",
+    "application/x-7z-compressed",
+    "application/octet-stream",
+    "audio/",
+    "video/",
+    "image/",
+    "font/woff",
+)
+# Server-sent events must reach the client one event at a time.
+STREAMING_TYPES = ("text/event-stream",)
+
+
+def negotiate_encoding(accept_encoding: str):
+    """
+    Pick the best supported content-coding from an `Accept-Encoding` header.
+    zstd wins over gzip when the client ranks them equally; q=0 disables a coding.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        pieces = [p.strip() for p in part.split(";")]
+        coding = pieces[0].lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in pieces[1:]:
+            if param.lower().startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _is_already_compressed(content_type: str) -> bool:
+    content_type = (content_type or "").lower()
+    return any(content_type.startswith(t) for t in ALREADY_COMPRESSED_TYPES)
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        # wbits=31 emits a gzip header/trailer instead of a raw zlib stream
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self, finish: bool) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH)
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self, finish: bool) -> bytes:
+        if finish:
+            return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 6, zstd_level: int = 3) -> bytes:
+    """One-shot compression for responses that arrive in a single body message."""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=zstd_level, write_content_size=True).compress(body)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses responses with zstd or gzip, negotiated from
+    the request's `Accept-Encoding` header.
+
+    - Bodies smaller than `minimum_size` are sent untouched.
+    - Streaming (chunked) responses are compressed incrementally, flushing each chunk.
+    - Responses that already carry a `Content-Encoding`, or whose media type is already
+      compressed (PDF, audio, images, archives), are passed through.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size, self.gzip_level, self.zstd_level)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int, gzip_level: int, zstd_level: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+        self.send = None
+        self.start_message = None
+        self.started = False
+        self.passthrough = False
+        self.stream = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    def _new_stream(self):
+        if self.encoding == "zstd":
+            return _ZstdStream(self.zstd_level)
+        return _GzipStream(self.gzip_level)
+
+    async def send_wrapper(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or _is_already_compressed(headers.get("content-type", ""))
+                or headers.get("content-type", "").lower().startswith(STREAMING_TYPES)
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.start_message["headers"])
+
+            if not more_body:
+                if len(body) < self.minimum_size:
+                    await self.send(self.start_message)
+                    await self.send(message)
+                    return
+
+                body = compress_body(body, self.encoding, self.gzip_level, self.zstd_level)
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+            self.stream = self._new_stream()
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(self.start_message)
+
+        if self.stream is None:
+            await self.send(message)
+            return
+
+        chunk = self.stream.compress(body) + self.stream.flush(finish=not more_body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from fastapi.responses import JSONResponse
 from app.db.db import users_collection, get_database
-from app.schemas.schema import RegisterUser, LoginUser
-from app.auth_handler import hash_password, create_access_token, verify_password
+from app.schemas.schema import RegisterUser, LoginUser, StreamTokenSchema
+from app.auth_handler import hash_password_async, create_access_token, verify_password_async, create_stream_token, current_user
+from pymongo.errors import DuplicateKeyError
+from bson import ObjectId
 from datetime import datetime
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -16,7 +18,7 @@ async def register_user(user: RegisterUser, db=Depends(get_database)):
             content={"status": False, "message": "Email already registered"}
         )
 
-    hashed_pwd = hash_password(user.password)
+    hashed_pwd = await hash_password_async(user.password)
     new_user = {
         "name": user.name,
         "email": user.email,
@@ -24,7 +26,14 @@ async def register_user(user: RegisterUser, db=Depends(get_database)):
         "created_at": datetime.utcnow()
     }
 
-    result = await db.users.insert_one(new_user)
+    try:
+        result = await db.users.insert_one(new_user)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration for the same email (unique index on users.email).
+        return JSONResponse(
+            status_code=200,
+            content={"status": False, "message": "Email already registered"}
+        )
     if not result.inserted_id:
         raise HTTPException(status_code=500, detail="Failed to create user account")
 
@@ -36,10 +45,17 @@ async def login_user(
     form_data: LoginUser,
     db=Depends(get_database)
 ):
-    db_user = await db.users.find_one({"email": form_data.email})
-    if not db_user or not verify_password(form_data.password, db_user["password"]):
+    db_user = await db.users.find_one({"email": form_data.email}, {"name": 1, "email": 1, "password": 1, "deletion_requested_at": 1})
+    if not db_user or db_user.get("deletion_requested_at"):
         return {"message": "Invalid Credentials", "status": False}
 
+    valid, new_hash = await verify_password_async(form_data.password, db_user["password"])
+    if not valid:
+        return {"message": "Invalid Credentials", "status": False}
+    if new_hash:
+        # Stored with outdated Argon2 parameters; upgrade now that we have the plain password.
+        await db.users.update_one({"_id": db_user["_id"], "password": db_user["password"]}, {"$set": {"password": new_hash}})
+
     token_data = {
         "sub": str(db_user["_id"]),
         "email": db_user["email"],
@@ -57,4 +73,12 @@ async def login_user(
             "name": db_user["name"],
             "email": db_user["email"]
         }
-    }
\ No newline at end of file
+    }
+
+@router.post("/stream-token")
+async def stream_token(request: StreamTokenSchema, user=Depends(current_user)):
+    """Short-lived token for one interview's or job's EventSource/WebSocket URL (`?stream_token=`)."""
+    if not ObjectId.is_valid(request.scope):
+        raise HTTPException(status_code=400, detail="Invalid stream scope.")
+    token, expires_in = create_stream_token(user, request.scope)
+    return {"status": True, "message": "Stream token issued", "token": token, "expiresIn": expires_in}
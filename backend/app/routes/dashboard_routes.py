@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from fastapi.responses import JSONResponse
 from app.db.db import users_collection, get_database
+from app.auth_handler import current_user
 from datetime import datetime
 from bson import ObjectId
 import json
 
-router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], dependencies=[Depends(current_user)])
 
 def clean_mongo_doc(doc):
     """Recursively convert ObjectIds and datetimes to JSON-safe values."""
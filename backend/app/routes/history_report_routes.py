@@ -1,13 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse, FileResponse
 from app.db.db import users_collection, get_database
+from app.auth_handler import current_user
+from app.services.timer_buffer import timer_buffer
 from datetime import datetime, timedelta
 from bson import ObjectId
 from typing_extensions import List, Dict, Any
 import json
 import os
 
-router = APIRouter(prefix="/history-report", tags=["Interview History & Reports"])
+router = APIRouter(prefix="/history-report", tags=["Interview History & Reports"], dependencies=[Depends(current_user)])
 
 def _is_valid_objectid(oid: str) -> bool:
     try:
@@ -126,7 +128,7 @@ async def get_interview_history(user_id: str, db=Depends(get_database)):
                 "interview_id": str(doc["_id"]),
                 "domain": doc.get("domain"),
                 "interview_type": doc.get("interview_type"),
-                "duration": doc.get("interview_timer"),
+                "duration": timer_buffer.latest(str(doc["_id"]), doc.get("interview_timer")),
                 "question_count": doc.get("question_count"),
                 "completion": doc.get("completion"),
                 "created_at": doc.get("created_at"),
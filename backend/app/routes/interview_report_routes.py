@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from typing import Optional
 from app.db.db import users_collection, get_database
+from app.auth_handler import current_user
 from datetime import datetime, timedelta
-from app.langgraph_agents.interview_report import generate_interview_report
+from app.langgraph_agents.interview_graph import stream_interview
 from app.langgraph_agents.detailed_breakdown import generate_detailed_breakdown
 from app.langgraph_agents.full_report import get_full_report
 from bson import ObjectId
@@ -14,48 +16,247 @@ from reportlab.lib import colors
 import json
 import os
 from app.schemas.schema import GenerateReportSchema
+from app.services.timer_buffer import timer_buffer
+from app.services.interview_cache import interview_cache
+from app.services.conversation_memory import load_report_context, load_question_answer_pairs
+from app.services.job_queue import job_queue, job_id, serialize_job, JOB_SWEEP_LOOKBACK_HOURS
+from app.services.report_pipeline import record_first_view, report_pdf_path, REPORTS_DIR
+from app.services.partial_json import JSONSectionStream, parse_json_array
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+
+router = APIRouter(prefix="/interview-report", tags=["Interview Report"], dependencies=[Depends(current_user)])
+
+REPORT_INTERVIEW_FIELDS = ("interview_timer", "completion", "user_id", "domain", "experience", "interview_type", "difficulty", "question_limit")
+BREAKDOWN_BATCH_SIZE = int(os.getenv("BREAKDOWN_BATCH_SIZE", 10))
+REPORT_STREAM_POLL_INTERVAL = float(os.getenv("REPORT_STREAM_POLL_INTERVAL", 0.5))
+
+
+async def _load_report_interview(db, interview_id: str):
+    """Interview metadata for the report agents, served from the interview cache with the pending timer applied."""
+    interview = await interview_cache.get(db, interview_id)
+    if not interview:
+        return None
+    interview = {key: interview[key] for key in REPORT_INTERVIEW_FIELDS if key in interview}
+    interview["interview_timer"] = timer_buffer.latest(interview_id, interview.get("interview_timer", 0))
+    return interview
+
+
+def _pacing_summary(question_answer_arr: list):
+    """Interview-level pacing aggregates, or None when no answer was measured."""
+    measured = [pair["pacing"] for pair in question_answer_arr if pair.get("pacing")]
+    if not measured:
+        return None
+
+    wpm = [m["wpm"] for m in measured if m.get("wpm")]
+    pause_ratios = [m["pause_ratio"] for m in measured if m.get("pause_ratio") is not None]
+    longest_pauses = [m["longest_pause_s"] for m in measured if m.get("longest_pause_s") is not None]
+    return {
+        "answers_measured": len(measured),
+        "avg_wpm": round(sum(wpm) / len(wpm), 1) if wpm else None,
+        "avg_pause_ratio": round(sum(pause_ratios) / len(pause_ratios), 3) if pause_ratios else None,
+        "longest_pause_s": max(longest_pauses) if longest_pauses else None,
+    }
+
+async def _generate_breakdown(interview: dict, report: str, question_answer_arr: list) -> str:
+    """
+    The breakdown is per question, so long interviews are split into batches of BREAKDOWN_BATCH_SIZE
+    pairs generated concurrently; each prompt stays bounded and the JSON arrays are joined in order.
+    """
+    if len(question_answer_arr) <= BREAKDOWN_BATCH_SIZE:
+        return await generate_detailed_breakdown(interview, report, question_answer_arr)
+
+    batches = [question_answer_arr[i:i + BREAKDOWN_BATCH_SIZE] for i in range(0, len(question_answer_arr), BREAKDOWN_BATCH_SIZE)]
+    parts = await asyncio.gather(*(generate_detailed_breakdown(interview, report, batch) for batch in batches))
+    return json.dumps([item for part in parts for item in parse_json_array(part)])
+
+
+async def _no_progress(stage: str):
+    pass
+
+
+async def build_report(db, interview_id: str, interview: dict, progress=_no_progress):
+    """Run the report step of the interview graph and store the result."""
+    await progress("summarizing")
+    summary, recent_pairs, question_answer_arr, earlier_ai_likelihood = await load_report_context(db, interview_id)
+
+    await progress("scoring")
+
+    # Publish each top-level report section as soon as the model finishes it, for the SSE stream.
+    sections, turn = JSONSectionStream(), None
+    async for kind, item in stream_interview(
+        db, interview_id, "report",
+        report_interview=interview,
+        question_answer_arr=recent_pairs,
+        earlier_ai_likelihood=earlier_ai_likelihood,
+        conversation_summary=summary,
+        pacing_metrics=_pacing_summary(question_answer_arr)
+    ):
+        if kind == "state":
+            turn = item
+            continue
+        finished = {key: value for key, value in sections.feed(item) if key and not key.startswith("$") and "." not in key}
+        if finished:
+            await progress("scoring", partial=finished)
+    report = turn["report"] if turn else None
+
+    if report:
+        # Stops here if the job was cancelled meanwhile (e.g. the account is being deleted).
+        await progress("saving")
+        await db.interview_reports.update_one(
+            {"interview_id": interview_id},
+            {"$set": {"user_id": interview.get("user_id"), "report": report, "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+    return report
+
+
+async def build_breakdown(db, interview_id: str, interview: dict, progress=_no_progress):
+    """Generate and store the per-question breakdown, building the interview report first if needed."""
+    interview_report = await db.interview_reports.find_one({"interview_id": interview_id}, {"_id": 0, "report": 1, "user_id": 1})
+    report = interview_report["report"] if interview_report else await build_report(db, interview_id, interview, progress)
+
+    await progress("breakdown")
+    question_answer_arr = await load_question_answer_pairs(db, interview_id)
+
+    detailed_breakdown = await _generate_breakdown(interview, report, question_answer_arr)
+    if detailed_breakdown:
+        await progress("saving")
+        await db.detailed_breakdown.update_one(
+            {"interview_id": interview_id},
+            {"$set": {
+                "user_id": interview.get("user_id"),
+                "duration": interview.get("interview_timer", 0),
+                "detailed_breakdown": detailed_breakdown,
+                "created_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+    return detailed_breakdown
+
+
+async def build_pdf(interview_id: str, report, progress=_no_progress) -> str:
+    await progress("narrative")
+    report_generated_summary = await get_full_report(report)
+    await progress("rendering")
+    return await run_in_threadpool(generate_pdf, report_generated_summary, interview_id)
+
+
+async def _report_version(db, interview_id: str):
+    """PDFs are built from the stored report, so they are versioned by when it was written."""
+    interview_report = await db.interview_reports.find_one({"interview_id": interview_id}, {"_id": 0, "report": 1, "user_id": 1, "created_at": 1})
+    if not interview_report:
+        return None, None
+    return interview_report, interview_report.get("created_at", datetime.min).isoformat()
+
+
+async def _job_interview(db, job: dict) -> dict:
+    interview = await _load_report_interview(db, job["interview_id"])
+    if not interview:
+        raise ValueError("Interview not found.")
+    return interview
+
+
+async def report_job(db, job: dict, progress):
+    interview = await _job_interview(db, job)
+    await build_report(db, job["interview_id"], interview, progress)
+
+    # Chain the rest of the report pipeline so the breakdown and PDF are ready before they're opened.
+    _, version = await _report_version(db, job["interview_id"])
+    await job_queue.enqueue(db, "breakdown", job["interview_id"], interview.get("user_id"), version=interview.get("interview_timer", 0))
+    await job_queue.enqueue(db, "pdf", job["interview_id"], interview.get("user_id"), version=version)
+
+
+async def breakdown_job(db, job: dict, progress):
+    await build_breakdown(db, job["interview_id"], await _job_interview(db, job), progress)
+
+
+async def pdf_job(db, job: dict, progress):
+    interview_report, version = await _report_version(db, job["interview_id"])
+    if interview_report is None:
+        await build_report(db, job["interview_id"], await _job_interview(db, job), progress)
+        interview_report, version = await _report_version(db, job["interview_id"])
+    await build_pdf(job["interview_id"], interview_report["report"], progress)
+    return {"report_version": version}
+
+
+async def sweep_completed_interviews(db):
+    """Queue reports for recently ended interviews whose completion trigger was missed (e.g. a restart)."""
+    since = (datetime.now() - timedelta(hours=JOB_SWEEP_LOOKBACK_HOURS)).isoformat()
+    completed = await db.interviews.find(
+        {"completion": {"$in": ["completed", "incomplete"]}, "created_at": {"$gte": since}},
+        {"_id": 1, "user_id": 1, "interview_timer": 1}
+    ).to_list(length=500)
+    if not completed:
+        return
+
+    ids = [str(interview["_id"]) for interview in completed]
+    queued = set(await db.jobs.distinct("interview_id", {"kind": "report", "interview_id": {"$in": ids}}))
+    reported = set(await db.interview_reports.distinct("interview_id", {"interview_id": {"$in": ids}}))
+    for interview in completed:
+        interview_id = str(interview["_id"])
+        if interview_id not in queued and interview_id not in reported:
+            await job_queue.enqueue(db, "report", interview_id, interview.get("user_id"), version=timer_buffer.latest(interview_id, interview.get("interview_timer", 0)))
+
+
+job_queue.register("report", report_job)
+job_queue.register("breakdown", breakdown_job)
+job_queue.register("pdf", pdf_job)
+job_queue.register_sweeper(sweep_completed_interviews)
+
+
+def _queued_response(message: str, job: dict) -> JSONResponse:
+    return JSONResponse(status_code=202, content={
+        "message": message,
+        "status": True,
+        "queued": True,
+        "job": serialize_job(job),
+        "status_url": f"/jobs/{job['_id']}",
+        "events_url": f"/jobs/{job['_id']}/events",
+    })
+
+
+def _report_is_current(interview: dict, interview_report, time) -> bool:
+    if not interview_report:
+        return False
+    if not time and interview.get("completion") == "completed":
+        return True
+    return interview.get("completion") in ("completed", "incomplete") and time is not None and int(time) == interview.get("interview_timer", 0)
+
+
+async def _current_report(db, interview_id: str, interview: dict, time):
+    """`(report, job)`: the stored report if it's current, else `(None, job)` for the report job now queued or running."""
+    interview_report = await db.interview_reports.find_one({"interview_id": interview_id}, {"_id": 0, "report": 1, "user_id": 1})
+    if _report_is_current(interview, interview_report, time):
+        await record_first_view(db, interview_id, "report", True)
+        return interview_report["report"], None
+
+    existing = await job_queue.get(db, job_id("report", interview_id))
+    # A job already under way (usually the one started when the interview ended) is joined even if the
+    # timer has moved on since; rerunning it would generate the same report twice.
+    job = await job_queue.enqueue(db, "report", interview_id, interview.get("user_id"), version=interview.get("interview_timer", 0), attach_in_flight=True)
+    if job["status"] == "succeeded":
+        interview_report = await db.interview_reports.find_one({"interview_id": interview_id}, {"_id": 0, "report": 1})
+        if interview_report:
+            await record_first_view(db, interview_id, "report", True)
+            return interview_report["report"], job
+
+    await record_first_view(db, interview_id, "report", False, existing)
+    return None, job
 
-router = APIRouter(prefix="/interview-report", tags=["Interview Report"])
 
 @router.post("/generate-report/{interview_id}")
 async def generate_report(interview_id: str, request: GenerateReportSchema, db=Depends(get_database)):
     try:
-        interview = await db.interviews.find_one({"_id": ObjectId(interview_id)}, {"_id": 0, "interview_timer": 1, "completion": 1, "user_id": 1, "domain": 1, "experience": 1, "interview_type": 1, "difficulty":1})
-        interview_report = await db.interview_reports.find_one({"interview_id": interview_id}, {"_id": 0, "report": 1, "user_id": 1})
-
-        if interview_report and not request.time and interview.get("completion") == "completed":
-            return JSONResponse(status_code=200, content={"message": "Interview report fetched successfully.", "status": True, "report": interview_report['report']})
-        
-        if interview_report and (interview.get("completion") == "completed" or (interview.get("completion") == "incomplete")) and (int(request.time) == interview.get("interview_timer", 0)):
-            return JSONResponse(status_code=200, content={"message": "Interview report fetched successfully.", "status": True, "report": interview_report['report']})
-        
+        interview = await _load_report_interview(db, interview_id)
         if not interview:
             raise HTTPException(status_code=404, detail="Interview not found.")
-        
-        interview_conversation = await db.interview_conversations.find(
-            {"interview_id": interview_id, "is_first_message": False},
-            {"_id": 0, "sender": 1, "text": 1}
-        ).sort("created_at", 1).to_list(length=None)
-
-        interview_conversation = interview_conversation[1:]
-
-        question_answer_arr = [
-            {"question": interview_conversation[i]["text"], "answer": interview_conversation[i + 1]["text"]}
-            for i in range(0, len(interview_conversation) - 1, 2)
-            if interview_conversation[i]["sender"] == "ai" and interview_conversation[i + 1]["sender"] == "user"
-        ]
-
-        report = await generate_interview_report(interview, question_answer_arr)
 
+        report, job = await _current_report(db, interview_id, interview, request.time)
         if report:
-            await db.interview_reports.insert_one({
-                "user_id": interview.get("user_id"),
-                "interview_id": interview_id,
-                "report": report,
-                "created_at": datetime.utcnow()
-            })
+            return JSONResponse(status_code=200, content={"message": "Interview report fetched successfully.", "status": True, "report": report})
 
-        return JSONResponse(status_code=200, content={"message": "Interview report generated successfully.", "status": True, "report": report})
+        return _queued_response("Interview report generation queued.", job)
 
     except HTTPException:
         raise
@@ -63,24 +264,100 @@ async def generate_report(interview_id: str, request: GenerateReportSchema, db=D
         raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
     
 
-@router.get("/download-report/{interview_id}")
-async def download_report(interview_id: str, db=Depends(get_database)):
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _report_sections(report) -> list:
     try:
-        interview_report = await db.interview_reports.find_one(
-            {"interview_id": interview_id},
-            {"_id": 0, "report": 1}
-        )
+        parsed = json.loads(report) if isinstance(report, str) else report
+    except json.JSONDecodeError:
+        return []
+    return list(parsed.items()) if isinstance(parsed, dict) else []
+
 
-        if not interview_report:
-            raise HTTPException(status_code=404, detail="Interview report not found.")
+@router.get("/generate-report/{interview_id}/stream")
+async def stream_report(interview_id: str, request: Request, time: Optional[int] = None, db=Depends(get_database)):
+    """
+    Server-sent events for the report: a `section` event (`{key, value}`) for each top-level report
+    field as soon as the model has finished it, then `done` with the full report, or `error`.
+    """
+    interview = await _load_report_interview(db, interview_id)
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found.")
+    report, job = await _current_report(db, interview_id, interview, time)
+
+    async def stream():
+        sent = {}
+        current_report = report
+        while current_report is None:
+            current = await job_queue.get(db, job["_id"])
+            if current is None:
+                yield _sse("error", {"detail": "Report job not found."})
+                return
+
+            for key, value in (current.get("partial") or {}).items():
+                if sent.get(key) != value:
+                    sent[key] = value
+                    yield _sse("section", {"key": key, "value": value})
+
+            if current["status"] == "failed":
+                yield _sse("error", {"detail": current.get("error") or "Report generation failed."})
+                return
+            if current["status"] == "succeeded":
+                interview_report = await db.interview_reports.find_one({"interview_id": interview_id}, {"_id": 0, "report": 1})
+                current_report = interview_report["report"] if interview_report else ""
+                break
+
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(REPORT_STREAM_POLL_INTERVAL)
+
+        for key, value in _report_sections(current_report):
+            if sent.get(key) != value:
+                yield _sse("section", {"key": key, "value": value})
+        yield _sse("done", {"report": current_report})
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def _pdf_status(db, interview_id: str):
+    """`(ready, job)`: whether the PDF for the current report is on disk, queueing it if not."""
+    interview_report, version = await _report_version(db, interview_id)
+    if interview_report is None:
+        raise HTTPException(status_code=404, detail="Interview report not found.")
+
+    job = await job_queue.enqueue(db, "pdf", interview_id, interview_report.get("user_id"), version=version)
+    ready = job["status"] == "succeeded" and os.path.exists(report_pdf_path(interview_id))
+    if job["status"] == "succeeded" and not ready:
+        # The file is gone (e.g. a fresh container); build it again.
+        await db.jobs.update_one({"_id": job["_id"], "status": "succeeded"}, {"$set": {"status": "failed"}})
+        job = await job_queue.enqueue(db, "pdf", interview_id, interview_report.get("user_id"), version=version)
+    return ready, job
+
+
+@router.get("/download-status/{interview_id}")
+async def download_status(interview_id: str, db=Depends(get_database)):
+    try:
+        ready, job = await _pdf_status(db, interview_id)
+        return JSONResponse(status_code=200, content={"message": "Interview report PDF status.", "status": True, "ready": ready, "job": serialize_job(job)})
 
-        report_generated_summary = await get_full_report(interview_report["report"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
 
-        pdf_path = generate_pdf(report_generated_summary, interview_id)
+
+@router.get("/download-report/{interview_id}")
+async def download_report(interview_id: str, db=Depends(get_database)):
+    try:
+        ready, job = await _pdf_status(db, interview_id)
+        if not ready:
+            return _queued_response("Interview report PDF generation queued.", job)
 
         filename = f"Interview_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         return FileResponse(
-            pdf_path,
+            report_pdf_path(interview_id),
             media_type="application/pdf",
             filename=filename
         )
@@ -95,43 +372,26 @@ async def detailed_breakdown(interview_id: str, request: GenerateReportSchema, d
     try:
         if not interview_id:
             raise HTTPException(status_code=400, detail="Interview ID is required.")
-        interview = await db.interviews.find_one({"_id": ObjectId(interview_id)}, {"_id": 0, "interview_timer": 1, "completion": 1, "user_id": 1, "domain": 1, "experience": 1, "interview_type": 1, "difficulty":1})
-        
-        detailed_breakdown_record = await db.detailed_breakdown.find_one({"interview_id": interview_id}, {"_id": 0, "detailed_breakdown": 1, "duration": 1})
-
-        if detailed_breakdown_record and (interview.get("completion") == "completed" or interview.get("completion") == "incomplete") and (interview.get("interview_timer", 0) == detailed_breakdown_record.get("duration", 0)):
-            return JSONResponse(status_code=200, content={"message": "Interview detailed breakdown fetched successfully.", "status": True, "interview_duration": detailed_breakdown_record["duration"], "detailed_breakdown": detailed_breakdown_record['detailed_breakdown']})
-        
-        interview = await db.interviews.find_one({"_id": ObjectId(interview_id)}, {"_id": 0, "user_id": 1, "interview_timer": 1, "domain": 1, "experience": 1, "interview_type": 1, "difficulty":1})
+        interview = await _load_report_interview(db, interview_id)
         if not interview:
             raise HTTPException(status_code=404, detail="Interview not found.")
 
-        interview_report = await db.interview_reports.find_one({"interview_id": interview_id}, {"_id": 0, "report": 1, "user_id": 1})
-
-        interview_conversation = await db.interview_conversations.find(
-            {"interview_id": interview_id, "is_first_message": False},
-            {"_id": 0, "sender": 1, "text": 1}
-        ).sort("created_at", 1).to_list(length=None)
-
-        interview_conversation = interview_conversation[1:]
+        detailed_breakdown_record = await db.detailed_breakdown.find_one({"interview_id": interview_id}, {"_id": 0, "detailed_breakdown": 1, "duration": 1})
 
-        question_answer_arr = [
-            {"question": interview_conversation[i]["text"], "answer": interview_conversation[i + 1]["text"]}
-            for i in range(0, len(interview_conversation) - 1, 2)
-            if interview_conversation[i]["sender"] == "ai" and interview_conversation[i + 1]["sender"] == "user"
-        ]
+        if detailed_breakdown_record and (interview.get("completion") == "completed" or interview.get("completion") == "incomplete") and (interview.get("interview_timer", 0) == detailed_breakdown_record.get("duration", 0)):
+            await record_first_view(db, interview_id, "breakdown", True)
+            return JSONResponse(status_code=200, content={"message": "Interview detailed breakdown fetched successfully.", "status": True, "interview_duration": detailed_breakdown_record["duration"], "detailed_breakdown": detailed_breakdown_record['detailed_breakdown']})
 
-        detailed_breakdown = await generate_detailed_breakdown(interview, interview_report["report"], question_answer_arr)
-        if detailed_breakdown:
-            await db.detailed_breakdown.insert_one({
-                "user_id": interview.get("user_id"),
-                "interview_id": interview_id,
-                "duration": interview.get("interview_timer", 0),
-                "detailed_breakdown": detailed_breakdown,
-                "created_at": datetime.utcnow()
-            })
+        existing = await job_queue.get(db, job_id("breakdown", interview_id))
+        job = await job_queue.enqueue(db, "breakdown", interview_id, interview.get("user_id"), version=interview.get("interview_timer", 0), attach_in_flight=True)
+        if job["status"] == "succeeded":
+            record = await db.detailed_breakdown.find_one({"interview_id": interview_id}, {"_id": 0, "detailed_breakdown": 1, "duration": 1})
+            if record:
+                await record_first_view(db, interview_id, "breakdown", True)
+                return JSONResponse(status_code=200, content={"message": "Interview detailed breakdown generated successfully.", "status": True, "interview_duration": record.get("duration", 0), "detailed_breakdown": record["detailed_breakdown"]})
 
-        return JSONResponse(status_code=200, content={"message": "Interview detailed breakdown generated successfully.", "status": True, "interview_duration": interview.get("interview_timer", 0), "detailed_breakdown": detailed_breakdown})
+        await record_first_view(db, interview_id, "breakdown", False, existing)
+        return _queued_response("Interview detailed breakdown generation queued.", job)
 
     except HTTPException:
         raise
@@ -203,9 +463,8 @@ def generate_pdf(report_obj, interview_id: str) -> str:
     Returns the absolute path to the generated PDF.
     """
     try:
-        output_dir = os.path.join(os.getcwd(), "generated_reports")
-        os.makedirs(output_dir, exist_ok=True)
-        pdf_path = os.path.join(output_dir, f"interview_report_{interview_id}.pdf")
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        pdf_path = report_pdf_path(interview_id)
 
         report_text = _report_to_text(report_obj)
 
@@ -1,24 +1,38 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Header
 from fastapi.responses import JSONResponse, FileResponse
 from app.db.db import users_collection, get_database
+from app.auth_handler import current_user, ensure_user, ensure_interview_owner
 from app.schemas.schema import SetupInterviewSchema, ReceiveFirstAITextSchema, EmployeeInterviewAnswers, AIRequestSchema, LogInterviewTimerSchema
 from datetime import datetime
-from app.langgraph_agents.first_ai_text import generate_first_text
-from app.langgraph_agents.create_questions import generate_ai_response
-from app.langgraph_agents.last_ai_text import interview_finished_message
-from google import generativeai as genai
+from typing import Optional
+from app.langgraph_agents.interview_graph import advance_interview, commit_turn, load_interview_state
+from app.services.speech import try_generate_speech, transcribe_audio
+from app.services.resilience import turn_deadline
+from app.services.admission import admit
+from app.services.audio_ingest import read_audio_upload
+from app.services.audio_codec import convert_audio, negotiate_audio_format
+from app.services.question_bank import note_interview
+from app.services.audio_preprocess import can_preprocess, preprocess_audio, preprocess_stats, words_per_minute
+from fastapi.concurrency import run_in_threadpool
+from app.services.timer_buffer import timer_buffer
+from app.services.interview_cache import interview_cache
+from app.services.report_pipeline import trigger_report_pipeline
+from app.services.conversation_archive import load_conversation
+from app.services.interview_turns import DEFAULT_QUESTION_LIMIT, MAX_QUESTION_LIMIT, question_limit, save_user_answer, save_ai_turn
 from bson import ObjectId
 import uuid
 import os
-import base64
+import time
 import wave
-import io
-import tempfile
 
 
-router = APIRouter(prefix="/interview", tags=["Interview"])
-API_KEY = os.getenv("API_KEY")
-genai.configure(api_key=API_KEY)
+router = APIRouter(prefix="/interview", tags=["Interview"], dependencies=[Depends(current_user)])
+
+
+def requested_audio_format(x_audio_format: Optional[str] = Header(None)) -> str:
+    """Speech format the client asked for via `X-Audio-Format` (e.g. `mulaw, wav;q=0.5`)."""
+    return negotiate_audio_format(x_audio_format)
+
 
 def serialize_mongo_doc(doc):
     if not doc:
@@ -32,71 +46,26 @@ def serialize_mongo_doc(doc):
     return doc
 
 
-async def generate_speech(text: str):
-    if not text:
-        raise HTTPException(status_code=400, detail="Text is required.")
-
-    model = genai.GenerativeModel("gemini-2.5-flash-preview-tts")
-
-    prompt = f"""You are conducting a professional job interview. 
-        Speak in a warm, friendly, and encouraging tone. 
-        Maintain a calm, conversational pace with clear pronunciation. 
-        Show genuine interest and create a comfortable atmosphere for the candidate.
-
-        Interview question: {text}"""
-
-
-    response = model.generate_content(
-        prompt,
-        generation_config={
-            "response_modalities": ["AUDIO"],
-            "speech_config": {"voice_config": {"prebuilt_voice_config": {"voice_name": "Gacrux"}}},
-        },
-    )
-
-    pcm_data = (
-        response.candidates[0].content.parts[0].inline_data.data
-        if response.candidates and response.candidates[0].content.parts
-        else None
-    )
-
-    if not pcm_data:
-        raise HTTPException(status_code=500, detail="Failed to generate audio.")
-
-    wav_buffer = io.BytesIO()
-    with wave.open(wav_buffer, 'wb') as wav_file:
-        wav_file.setnchannels(1)  
-        wav_file.setsampwidth(2)  
-        wav_file.setframerate(24000)
-        
-        if isinstance(pcm_data, str):
-            pcm_data = base64.b64decode(pcm_data)
-        
-        wav_file.writeframes(pcm_data)
-    
-    wav_buffer.seek(0)
-    wav_base64 = base64.b64encode(wav_buffer.read()).decode('utf-8')
-
-    return {"audio": wav_base64, "format": "wav"}
-
-
-
-
-
-
 @router.post("/setup-interview")
-async def setup_interview(request: SetupInterviewSchema, db=Depends(get_database)):
+async def setup_interview(request: SetupInterviewSchema, db=Depends(get_database), user=Depends(current_user)):
     try:
         if not all([request.user_id, request.domain, request.experience, request.interview_type, request.mode, request.difficulty]):
             raise HTTPException(status_code=400, detail="All fields are required to setup an interview.")
+        ensure_user(user, request.user_id)
         
+        limit = request.question_limit or DEFAULT_QUESTION_LIMIT
+        if not 1 <= limit <= MAX_QUESTION_LIMIT:
+            raise HTTPException(status_code=400, detail=f"Question limit must be between 1 and {MAX_QUESTION_LIMIT}.")
+
         interview = await db.interviews.insert_one({
             **request.model_dump(),
+            "question_limit": limit,
             "completion": "pending",
             "created_at": datetime.now().isoformat()  
         })
+        await note_interview(db, request.model_dump())
 
-        return JSONResponse(status_code=200, content={"message": "Interview setup done.", "status": True, "interview_id": str(interview.inserted_id)})
+        return JSONResponse(status_code=200, content={"message": "Interview setup done.", "status": True, "interview_id": str(interview.inserted_id), "question_limit": limit})
 
     except HTTPException:
         raise
@@ -104,14 +73,19 @@ async def setup_interview(request: SetupInterviewSchema, db=Depends(get_database
         raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
     
 
-@router.post("/receive-first-ai-text")
-async def first_ai_text(request: ReceiveFirstAITextSchema, db=Depends(get_database)):
+@router.post("/receive-first-ai-text", dependencies=[Depends(admit("greeting")), Depends(turn_deadline)])
+async def first_ai_text(request: ReceiveFirstAITextSchema, db=Depends(get_database), audio_format: str = Depends(requested_audio_format), user=Depends(current_user)):
     try:
         if not all([request.interview_id, request.domain, request.interview_type, request.user_name]):
             raise HTTPException(status_code=400, detail="All fields are required.")
+        await ensure_interview_owner(db, user, request.interview_id)
         
-        first_text = await generate_first_text(request.user_name, request.domain, request.interview_type)
-        first_text_audio = await generate_speech(first_text)
+        turn = await advance_interview(db, request.interview_id, "greet", user_name=request.user_name)
+        if turn is None:
+            raise HTTPException(status_code=404, detail="Interview not found.")
+
+        first_text = turn["ai_text"]
+        first_text_audio = await try_generate_speech(first_text)
         
         if not first_text:
             return {"message": "Error occured, could not retrieve the first text from LLM. Please try again."}
@@ -135,9 +109,12 @@ async def first_ai_text(request: ReceiveFirstAITextSchema, db=Depends(get_databa
                 "updated_at": datetime.now()
             })
             updated_doc = await db.interview_conversations.find_one({"_id": insert_result.inserted_id})
+        await commit_turn(request.interview_id, turn)
 
         
         updated_doc = serialize_mongo_doc(updated_doc)
+        first_text_audio = convert_audio(first_text_audio, audio_format)
+        updated_doc["text_audio"] = first_text_audio
 
 
         return JSONResponse(
@@ -163,9 +140,13 @@ async def retrieve_interview(interview_id: str, db=Depends(get_database)):
         if not interview_id:
             raise HTTPException(status_code=400, detail="Interview ID is required.")
         
-        interview = await db.interviews.find_one({"_id": ObjectId(interview_id)})
+        interview = await interview_cache.get(db, interview_id)
+        if not interview:
+            raise HTTPException(status_code=404, detail="Interview not found.")
 
-        interview["_id"] = str(interview["_id"])
+        pending_timer = timer_buffer.latest(interview_id)
+        if pending_timer is not None:
+            interview["interview_timer"] = pending_timer
 
         return JSONResponse(status_code=200, content={"message": "Interview retrieved successfully!", "status": True, "interview": interview})
 
@@ -183,17 +164,7 @@ async def answer_question(request: EmployeeInterviewAnswers, interview_id: str,
         if not all([request.sender, request.text]):
             raise HTTPException(status_code=400, detail="All fields are required.")
         
-        document = {
-            "interview_id": interview_id,
-            "is_first_message": False,
-            "sender": request.sender,
-            "text": request.text,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        }
-
-        result = await db.interview_conversations.insert_one(document)
-        document["_id"] = result.inserted_id
+        document = await save_user_answer(db, interview_id, request.sender, request.text)
         document = serialize_mongo_doc(document)
 
         return JSONResponse(
@@ -210,54 +181,59 @@ async def answer_question(request: EmployeeInterviewAnswers, interview_id: str,
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
     
-@router.post("/answer-audio-interview-question/{interview_id}")
+@router.post("/answer-audio-interview-question/{interview_id}", dependencies=[Depends(admit("interactive")), Depends(turn_deadline)])
 async def answer_interview_voice(
     interview_id: str,
     file: UploadFile = File(...),
     sender: str = Form(...),
-    db=Depends(get_database)
+    advance: bool = Form(False),
+    db=Depends(get_database),
+    audio_format: str = Depends(requested_audio_format)
 ):
+    """
+    Transcribe and save a spoken answer. With `advance` the next AI question is generated in the
+    same request, as in submit-answer, and the response carries the transcript alongside it.
+    """
     try:
         if not interview_id:
             raise HTTPException(status_code=400, detail="Interview ID is required.")
         if not sender:
             raise HTTPException(status_code=400, detail="Sender is required.")
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
-
-        model = genai.GenerativeModel("gemini-2.5-flash")
-
-        response = model.generate_content([
-            {
-                "role": "user",
-                "parts": [
-                    {"mime_type": file.content_type, "data": open(tmp_path, "rb").read()},
-                    {"text": "Transcribe this user's audio response accurately into text."}
-                ],
-            }
-        ])
-
-        transcript = response.text if hasattr(response, "text") else None
-        if not transcript:
-            raise HTTPException(status_code=500, detail="Failed to transcribe audio.")
-
-        document = {
-            "interview_id": interview_id,
-            "is_first_message": False,
-            "sender": sender,
-            "text": transcript,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        }
-
-        result = await db.interview_conversations.insert_one(document)
-        document["_id"] = result.inserted_id
+        audio = await read_audio_upload(file)
+        content_type = file.content_type
+        audio_processing = None
+        acoustic_metrics = None
+        if can_preprocess(content_type):
+            try:
+                processed, audio_processing, acoustic_metrics = await run_in_threadpool(preprocess_audio, audio, content_type)
+                # Decoded PCM drives the metrics; transcription gets whichever upload is smaller,
+                # which for browser recordings is usually the original compressed file.
+                if len(processed) < len(audio):
+                    audio, content_type = processed, "audio/wav"
+                else:
+                    preprocess_stats["transcribed_original"] += 1
+                audio_processing["transcribed_bytes"] = len(audio)
+            except (ValueError, EOFError, wave.Error):
+                preprocess_stats["skipped"] += 1
+
+        started = time.perf_counter()
+        transcript = await transcribe_audio(audio, content_type)
+        if audio_processing is not None:
+            audio_processing["transcription_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        extra = None
+        if audio_processing:
+            acoustic_metrics["words_per_minute"] = words_per_minute(transcript, acoustic_metrics)
+            extra = {"audio_processing": audio_processing, "acoustic_metrics": acoustic_metrics}
+
+        if advance:
+            content = await _submit_turn(db, interview_id, sender, transcript, audio_format, extra)
+            return JSONResponse(status_code=200, content={**content, "transcript": transcript})
+
+        document = await save_user_answer(db, interview_id, sender, transcript, extra)
         document = serialize_mongo_doc(document)
 
-        os.remove(tmp_path)
-
         return JSONResponse(
             status_code=200,
             content={
@@ -268,24 +244,28 @@ async def answer_interview_voice(
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
     
 @router.get("/receive-interview-conversations/{interview_id}")
-async def receive_conversations(interview_id: str, db=Depends(get_database)):
+async def receive_conversations(interview_id: str, db=Depends(get_database), audio_format: str = Depends(requested_audio_format)):
     try:
         if not interview_id:
             raise HTTPException(status_code=400, detail="Interview ID is required.")
         
-        interview = await db.interviews.find_one({"_id": ObjectId(interview_id)})
+        interview = await interview_cache.get(db, interview_id)
         duration = None
         if interview is not None:
-            duration = interview.get("interview_timer", None)
+            duration = timer_buffer.latest(interview_id, interview.get("interview_timer", None))
         
-        cursor = db.interview_conversations.find({"interview_id": interview_id})
-        conversations = await cursor.to_list(length=None)
+        conversations = await load_conversation(db, interview_id)
 
         serialized_conversations = [serialize_mongo_doc(convo) for convo in conversations]
+        for convo in serialized_conversations:
+            if convo.get("text_audio"):
+                convo["text_audio"] = convert_audio(convo["text_audio"], audio_format)
 
         return JSONResponse(
             status_code=200,
@@ -301,47 +281,29 @@ async def receive_conversations(interview_id: str, db=Depends(get_database)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
     
-@router.post("/get-ai-response/{interview_id}")
-async def get_ai_response(interview_id: str, request: AIRequestSchema, db=Depends(get_database)):
+@router.post("/get-ai-response/{interview_id}", dependencies=[Depends(admit("interactive")), Depends(turn_deadline)])
+async def get_ai_response(interview_id: str, request: AIRequestSchema, db=Depends(get_database), audio_format: str = Depends(requested_audio_format)):
     try:
         if not interview_id:
             raise HTTPException(status_code=400, detail="Interview ID is required.")
         
-        interview_info = await db.interviews.find_one({"_id": ObjectId(interview_id)})
-        interview_info['_id'] = str(interview_info['_id'])
+        state = await load_interview_state(db, interview_id)
+        if not state:
+            raise HTTPException(status_code=404, detail="Interview not found.")
+        if state.get("finished"):
+            raise HTTPException(status_code=400, detail="Interview already finished.")
 
-        cursor = db.interview_conversations.find({"interview_id": interview_id})
-        conversations = await cursor.to_list(length=None)
+        turn = await advance_interview(db, interview_id, state=state)
 
-        serialized_conversations = [serialize_mongo_doc(convo) for convo in conversations]
-        all_questions = [c['text'] for c in serialized_conversations if c['sender'] == 'ai'][1:]
-        
-        ai_response = ''
-        finished = False
-        if request.question_count == 10:
-            ai_response = await interview_finished_message()
-            finished = True
-        else:
-            ai_response = await generate_ai_response(interview_info, all_questions)
-            finished = False  
-        
-        audio_ai_response = await generate_speech(ai_response)
-
-        document = {
-            "interview_id": interview_id,
-            "is_first_message": False,
-            "sender": "ai",
-            "text": ai_response,
-            "text_audio": audio_ai_response,
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
-        }
-        result = await db.interview_conversations.insert_one(document)
-        document["_id"] = result.inserted_id
-        document = serialize_mongo_doc(document)
+        ai_response, finished = turn["ai_text"], turn.get("finished", False)
+
+        audio_ai_response = turn.get("ai_audio") or await try_generate_speech(ai_response)
 
-        if finished:
-            await db.interviews.find_one_and_update({"_id": ObjectId(interview_id)}, {"$set": {"completion": "completed"}})
+        document = await save_ai_turn(db, interview_id, ai_response, audio_ai_response, finished)
+        await commit_turn(interview_id, turn)
+        document = serialize_mongo_doc(document)
+        audio_ai_response = convert_audio(audio_ai_response, audio_format)
+        document["text_audio"] = audio_ai_response
 
         return JSONResponse(
             status_code=200,
@@ -360,21 +322,81 @@ async def get_ai_response(interview_id: str, request: AIRequestSchema, db=Depend
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
     
+async def _submit_turn(db, interview_id: str, sender: str, text: str, audio_format: str, extra: Optional[dict] = None) -> dict:
+    """
+    Save the candidate's answer for the current turn and generate the next AI question.
+    The answer is keyed by the checkpointed question count, so a retried turn replaces its answer.
+    """
+    state = await load_interview_state(db, interview_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Interview not found.")
+
+    question_count = state.get("question_count", 0)
+    if state.get("finished") or question_count > question_limit(state["interview_info"]):
+        raise HTTPException(status_code=400, detail="Interview already finished.")
+
+    answer_document = await save_user_answer(db, interview_id, sender, text, extra, turn=question_count)
+
+    turn = await advance_interview(db, interview_id, state=state)
+    ai_response, finished = turn["ai_text"], turn.get("finished", False)
+
+    audio_ai_response = turn.get("ai_audio") or await try_generate_speech(ai_response)
+
+    document = await save_ai_turn(db, interview_id, ai_response, audio_ai_response, finished)
+    await commit_turn(interview_id, turn)
+    document = serialize_mongo_doc(document)
+    audio_ai_response = convert_audio(audio_ai_response, audio_format)
+    document["text_audio"] = audio_ai_response
+
+    return {
+        "message": "Answer saved and AI question generated successfully!",
+        "status": True,
+        "answer_conversation": serialize_mongo_doc(answer_document),
+        "question": ai_response,
+        "interview_conversation": document,
+        "interview_finished": finished,
+        "question_count": question_count if finished else question_count + 1,
+        "question_limit": question_limit(state["interview_info"]),
+        "text_audio": audio_ai_response
+    }
+
+
+@router.post("/submit-answer/{interview_id}", dependencies=[Depends(admit("interactive")), Depends(turn_deadline)])
+async def submit_answer(request: EmployeeInterviewAnswers, interview_id: str, db=Depends(get_database), audio_format: str = Depends(requested_audio_format)):
+    """
+    Save the candidate's answer and return the next AI question in a single request.
+    The question count comes from the interview's checkpointed graph state.
+    """
+    try:
+        if not interview_id:
+            raise HTTPException(status_code=400, detail="Interview ID is required.")
+
+        if not all([request.sender, request.text]):
+            raise HTTPException(status_code=400, detail="All fields are required.")
+
+        content = await _submit_turn(db, interview_id, request.sender, request.text, audio_format)
+        return JSONResponse(status_code=200, content=content)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
+
+
 @router.post("/log-interview-timer")
-async def log_interview_timer(request: LogInterviewTimerSchema, db=Depends(get_database)):
+async def log_interview_timer(request: LogInterviewTimerSchema, db=Depends(get_database), user=Depends(current_user)):
     try:
         if not request.interview_id:
             raise HTTPException(status_code=400, detail="Interview ID is required.")
-        
-        update_data = {"interview_timer": request.timer}
+        await ensure_interview_owner(db, user, request.interview_id)
         
         if request.completion is not None:
-            update_data["completion"] = request.completion
-        
-        await db.interviews.find_one_and_update(
-            {"_id": ObjectId(request.interview_id)},
-            {"$set": update_data}
-        )
+            # Also invalidates the cached interview.
+            await timer_buffer.write_completion(request.interview_id, request.timer, request.completion)
+            await trigger_report_pipeline(db, request.interview_id)
+        else:
+            # Ticks stay in the buffer (read through `timer_buffer.latest`); the cache is kept warm.
+            timer_buffer.record(request.interview_id, request.timer)
 
         return JSONResponse(
             status_code=200,
@@ -396,7 +418,7 @@ async def check_interview_mode(interview_id: str, db=Depends(get_database)):
         if not interview_id:
             raise HTTPException(status_code=400, detail="Interview ID is required.")
         
-        interview = await db.interviews.find_one({"_id": ObjectId(interview_id)}, {"_id": 0, "mode": 1})
+        interview = await interview_cache.get(db, interview_id)
 
         if not interview:
             raise HTTPException(status_code=404, detail="Interview not found.")
@@ -0,0 +1,173 @@
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from app.db.db import get_database
+from app.auth_handler import connection_user, ensure_interview_owner
+from app.routes.interview_routes import serialize_mongo_doc
+from app.services.speech import try_generate_speech
+from app.services.resilience import deadline, INTERVIEW_TURN_DEADLINE
+from app.services.admission import admission, AdmissionRejected
+from app.services.audio_codec import convert_audio, negotiate_audio_format
+from app.services.timer_buffer import timer_buffer
+from app.services.report_pipeline import trigger_report_pipeline
+from app.services.interview_turns import save_user_answer, save_ai_turn
+from app.langgraph_agents.interview_graph import advance_interview, commit_turn
+from app.services.interview_session import open_session, attach, detach
+from typing import Optional
+from bson import ObjectId
+import asyncio
+import json
+
+
+router = APIRouter(prefix="/interview", tags=["Interview Session"])
+
+
+async def _send_snapshot(session, websocket: WebSocket):
+    await websocket.send_json({
+        "type": "snapshot",
+        "seq": session.seq,
+        "interview": serialize_mongo_doc(dict(session.interview_info)),
+        "interview_conversation": [serialize_mongo_doc(dict(c)) for c in session.conversation],
+        "question_count": session.question_count,
+        "question_limit": session.question_limit,
+        "interview_finished": session.finished,
+        "duration": session.timer,
+    })
+
+
+async def _run_turn(session, db, text: str, audio_format: str):
+    """Save the answer, then push the next question as soon as it exists and its audio once synthesised."""
+    async with session.lock:
+        try:
+            async with admission.slot("interactive", f"user:{session.interview_info.get('user_id')}"):
+                with deadline(INTERVIEW_TURN_DEADLINE):
+                    await _turn_steps(session, db, text, audio_format)
+        except AdmissionRejected as e:
+            await session.push({"type": "error", "detail": e.reason, "retry_after": e.retry_after})
+        except Exception as e:
+            await session.push({"type": "error", "detail": f"Error occurred: {str(e)}"})
+
+
+async def _turn_steps(session, db, text: str, audio_format: str):
+    answer = await save_user_answer(db, session.interview_id, "user", text, turn=session.question_count)
+    session.record_message(answer)
+    await session.push({"type": "answer_saved", "interview_conversation": serialize_mongo_doc(dict(answer))})
+
+    turn = await advance_interview(db, session.interview_id, state=session.graph_state())
+    ai_response, finished = turn["ai_text"], turn.get("finished", False)
+    await session.push({"type": "question", "question": ai_response, "interview_finished": finished})
+
+    audio_ai_response = turn.get("ai_audio") or await try_generate_speech(ai_response)
+    document = await save_ai_turn(db, session.interview_id, ai_response, audio_ai_response, finished)
+    await commit_turn(session.interview_id, turn)
+    session.record_message(document, finished)
+
+    await session.push({
+        "type": "audio",
+        "interview_conversation": serialize_mongo_doc({k: v for k, v in document.items() if k != "text_audio"}),
+        "interview_finished": finished,
+        "question_count": session.question_count,
+        "text_audio": convert_audio(audio_ai_response, audio_format)
+    })
+
+
+async def _log_timer(session, timer: int, completion: Optional[str]):
+    session.timer = timer
+    if completion is not None:
+        # write_completion also invalidates the cached interview, as in log-interview-timer.
+        await timer_buffer.write_completion(session.interview_id, timer, completion)
+        session.record_completion(completion)
+        await trigger_report_pipeline(get_database(), session.interview_id)
+    else:
+        timer_buffer.record(session.interview_id, timer)
+
+
+@router.websocket("/ws/{interview_id}")
+async def interview_session(websocket: WebSocket, interview_id: str, last_seq: Optional[int] = None, audio_format: Optional[str] = None, db=Depends(get_database)):
+    """
+    Persistent interview session.
+
+    Client → server: {"type": "answer", "text": ...}, {"type": "timer", "timer": ..., "completion": ...}, {"type": "ping"}
+    Server → client: "snapshot" on connect, then "answer_saved", "question", "audio" and "error" messages, each with a `seq`.
+    Reconnect with `?last_seq=<seq>` to replay missed messages instead of receiving a new snapshot.
+    `?audio_format=mulaw` selects the compact speech encoding.
+    Authenticate with `?stream_token=<token>` from POST /auth/stream-token (browsers can't set headers on WebSockets).
+    """
+    await websocket.accept()
+    audio_format = negotiate_audio_format(audio_format)
+
+    user = await connection_user(websocket)
+    if user is None:
+        await websocket.close(code=4401, reason="Not authenticated.")
+        return
+
+    if not ObjectId.is_valid(interview_id):
+        await websocket.close(code=4400, reason="Invalid interview ID.")
+        return
+
+    try:
+        await ensure_interview_owner(db, user, interview_id)
+    except HTTPException:
+        await websocket.close(code=4403, reason="Not allowed to access this interview.")
+        return
+
+    session = await open_session(db, interview_id)
+    if session is None:
+        await websocket.close(code=4404, reason="Interview not found.")
+        return
+
+    previous = session.websocket
+    attach(session, websocket)
+    if previous is not None and previous is not websocket:
+        try:
+            await previous.close(code=4409, reason="Session resumed on another connection.")
+        except Exception:
+            pass
+
+    if last_seq is None or not await session.replay(last_seq):
+        await _send_snapshot(session, websocket)
+
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except (json.JSONDecodeError, KeyError, TypeError):
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON text."})
+                continue
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects."})
+                continue
+            message_type = message.get("type")
+
+            if message_type == "answer":
+                text = message.get("text")
+                text = text.strip() if isinstance(text, str) else ""
+                if not text:
+                    await websocket.send_json({"type": "error", "detail": "Answer text is required."})
+                elif session.finished:
+                    await websocket.send_json({"type": "error", "detail": "Interview already finished."})
+                elif session.turn_running:
+                    await websocket.send_json({"type": "error", "detail": "Previous answer is still being processed."})
+                else:
+                    # Runs detached from this connection so a dropped socket can still resume the turn.
+                    session.turn_task = asyncio.create_task(_run_turn(session, db, text, audio_format))
+
+            elif message_type == "timer":
+                try:
+                    timer = int(message.get("timer") or 0)
+                except (TypeError, ValueError):
+                    await websocket.send_json({"type": "error", "detail": "Timer must be an integer."})
+                    continue
+                try:
+                    await _log_timer(session, timer, message.get("completion"))
+                except Exception as e:
+                    await websocket.send_json({"type": "error", "detail": f"Error occurred: {str(e)}"})
+
+            elif message_type == "ping":
+                await websocket.send_json({"type": "pong", "seq": session.seq})
+
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {message_type}"})
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        detach(session, websocket)
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.db.db import get_database
+from app.auth_handler import current_user, ensure_user
+from app.services.job_queue import job_queue, serialize_job
+import asyncio
+import json
+import os
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], dependencies=[Depends(current_user)])
+
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", 1))
+JOB_EVENTS_KEEPALIVE = float(os.getenv("JOB_EVENTS_KEEPALIVE", 15))
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, db=Depends(get_database), user=Depends(current_user)):
+    try:
+        job = await job_queue.get(db, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found.")
+        ensure_user(user, job.get("user_id"))
+
+        return JSONResponse(status_code=200, content={"message": "Job fetched successfully.", "status": True, "job": serialize_job(job)})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error occurred: {str(e)}")
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str, request: Request, db=Depends(get_database), user=Depends(current_user)):
+    """Server-sent events: one `progress` event per status/stage change, ending with `done`."""
+    job = await job_queue.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    ensure_user(user, job.get("user_id"))
+
+    async def stream():
+        last, idle = None, 0.0
+        while True:
+            current = serialize_job(await job_queue.get(db, job_id))
+            if current is None:
+                yield "event: error\ndata: {\"detail\": \"Job not found.\"}\n\n"
+                return
+
+            state = (current["status"], current.get("stage"), current.get("attempts"))
+            if state != last:
+                last, idle = state, 0.0
+                event = "done" if current["status"] in TERMINAL_STATUSES else "progress"
+                yield f"event: {event}\ndata: {json.dumps(current)}\n\n"
+                if event == "done":
+                    return
+            elif idle >= JOB_EVENTS_KEEPALIVE:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+            idle += JOB_EVENTS_POLL_INTERVAL
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
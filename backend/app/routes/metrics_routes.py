@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+from app.db.db import get_database
+from app.services.interview_cache import interview_cache
+from app.services.timer_buffer import timer_buffer
+from app.services.audio_preprocess import preprocess_stats
+from app.services.audio_codec import codec_stats
+from app.langgraph_agents.create_questions import prompt_token_stats
+from app.services.question_similarity import similarity_stats
+from app.services.question_bank import bank_stats
+from app.services.conversation_memory import memory_stats
+from app.langgraph_agents.models import route_latency_stats
+from app.services.resilience import resilience_snapshot
+from app.services.admission import admission
+from app.services.job_queue import job_queue
+from app.services.report_pipeline import pipeline_stats
+from app.services.conversation_archive import archive_storage
+from app.auth_handler import password_hash_snapshot, auth_snapshot, metrics_access
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"], dependencies=[Depends(metrics_access)])
+
+
+@router.get("/")
+async def get_metrics(db=Depends(get_database)):
+    return {
+        "status": True,
+        "interview_cache": interview_cache.stats(),
+        "timer_buffer": {**timer_buffer.stats, "pending": len(timer_buffer.pending)},
+        "audio_preprocessing": preprocess_stats,
+        "tts_audio_codec": codec_stats,
+        "question_prompt_tokens": {**prompt_token_stats, "recent": list(prompt_token_stats["recent"])},
+        "duplicate_question_guard": similarity_stats,
+        "question_bank": bank_stats,
+        "conversation_memory": memory_stats,
+        "llm_routes": route_latency_stats(),
+        "provider_resilience": resilience_snapshot(),
+        "admission": admission.snapshot(),
+        "jobs": {**job_queue.stats, "workers": job_queue.workers},
+        "report_pipeline": pipeline_stats,
+        "password_hashing": password_hash_snapshot(),
+        "auth": auth_snapshot(),
+        "conversation_archive": await archive_storage(db),
+    }
@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Request
 from fastapi.responses import JSONResponse
 from app.db.db import users_collection, get_database
+from app.auth_handler import current_user, ensure_user, token_cache
+from app.services.job_queue import job_queue, serialize_job
+import app.services.account_deletion  # registers the delete_account job
 from datetime import datetime
 from bson import ObjectId
 
-router = APIRouter(prefix="/profile", tags=["Profile"])
+router = APIRouter(prefix="/profile", tags=["Profile"], dependencies=[Depends(current_user)])
 
 @router.post("/save-changes")
-async def save_changes(request: Request, db=Depends(get_database)):
+async def save_changes(request: Request, db=Depends(get_database), user=Depends(current_user)):
     data = await request.json()
     user_id = data.get("user_id")
     name = data.get("name")
@@ -15,6 +18,7 @@ async def save_changes(request: Request, db=Depends(get_database)):
 
     if not user_id or not name or not email:
         raise HTTPException(status_code=400, detail="Missing required fields")
+    ensure_user(user, user_id)
 
     existing_user = await db.users.find_one({"_id": ObjectId(user_id)})
     if not existing_user:
@@ -29,6 +33,7 @@ async def save_changes(request: Request, db=Depends(get_database)):
     result = await db.users.update_one({"_id": ObjectId(user_id)}, {"$set": update_data})
     if result.modified_count == 0:
         raise HTTPException(status_code=500, detail="Failed to update user profile")
+    token_cache.invalidate_user(user_id)
 
     return {"status": True, "message": "Profile updated successfully", "user": update_data}
 
@@ -66,29 +71,32 @@ async def get_profile(user_id: str, db=Depends(get_database)):
     return {"status": True, "user": user_data}
 
 @router.post("/delete-account")
-async def delete_account(request: Request, db=Depends(get_database)):
+async def delete_account(request: Request, db=Depends(get_database), user=Depends(current_user)):
     try:
         data = await request.json()
         user_id = data.get("user_id")
 
         if not user_id:
             raise HTTPException(status_code=400, detail="Missing user_id")
+        ensure_user(user, user_id)
 
-        existing_user = await db.users.find_one({"_id": ObjectId(user_id)})
+        existing_user = await db.users.find_one({"_id": ObjectId(user_id)}, {"_id": 1})
         if not existing_user:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        interviews = await db.interviews.find({"user_id": user_id}).to_list(length=100)
-        interview_ids = [str(interview["_id"]) for interview in interviews]
 
-        await db.users.delete_one({"_id": ObjectId(user_id)})
-        await db.interviews.delete_many({"user_id": user_id})
-        await db.interview_reports.delete_many({"user_id": user_id})
-        await db.detailed_breakdown.delete_many({"user_id": user_id})
+        # Block new logins right away; the cascade runs as a background job and removes the user last.
+        await db.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"deletion_requested_at": datetime.utcnow()}})
+        token_cache.invalidate_user(user_id)
+        job = await job_queue.enqueue(db, "delete_account", None, user_id=user_id)
 
-        await db.interview_conversations.delete_many({"interview_id": {"$in": interview_ids}})
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+            "status": True,
+            "message": "Account deletion started.",
+            "job": serialize_job(job),
+            "status_url": f"/jobs/{job['_id']}",
+        })
 
-        return JSONResponse(status_code=status.HTTP_200_OK, content={"status": True, "message": "Account deleted successfully"})
-    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -19,6 +19,7 @@ class SetupInterviewSchema(BaseModel):
     interview_type: str = Field(..., description="Type of the interview to be done (e.g., Technical, Managerial/Leadership, etc.)")
     mode: str = Field(..., description="Mode of interview to be done (Text or Voice)")
     difficulty: str = Field(..., description="Difficulty of the interview")
+    question_limit: Optional[int] = Field(None, description="Number of questions before the interview ends (defaults to 10)")
 
 class ReceiveFirstAITextSchema(BaseModel):
     interview_id: str
@@ -39,5 +40,8 @@ class LogInterviewTimerSchema(BaseModel):
     timer: int
     completion: Optional[str] = None
 
+class StreamTokenSchema(BaseModel):
+    scope: str = Field(..., description="Interview or job ID whose event stream the token opens")
+
 class GenerateReportSchema(BaseModel):
     time: Optional[int] = 0
\ No newline at end of file
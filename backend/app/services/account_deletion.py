@@ -0,0 +1,108 @@
+from app.services.job_queue import job_queue, job_id
+from app.services.interview_cache import interview_cache
+from app.services.report_pipeline import report_pdf_path
+from app.auth_handler import token_cache
+from fastapi.concurrency import run_in_threadpool
+from bson import ObjectId
+from datetime import datetime, timedelta
+import asyncio
+import os
+
+
+ACCOUNT_DELETE_BATCH_SIZE = int(os.getenv("ACCOUNT_DELETE_BATCH_SIZE", 100))
+# A failed (or lost) cascade is restarted by the sweeper after this long; the user stays locked out until it completes.
+ACCOUNT_DELETE_RETRY_MINUTES = float(os.getenv("ACCOUNT_DELETE_RETRY_MINUTES", 15))
+
+# Per-interview data, keyed by the field holding the interview id. Stored answer/question audio
+# lives inline on the conversation documents, so it goes with them.
+INTERVIEW_SCOPED = {
+    "interview_conversations": "interview_id",
+    "interview_archives": "interview_id",
+    "interview_reports": "interview_id",
+    "detailed_breakdown": "interview_id",
+    "interview_memory": "interview_id",
+    "jobs": "interview_id",
+    "interview_checkpoints": "thread_id",
+    "interview_checkpoint_blobs": "thread_id",
+    "interview_checkpoint_writes": "thread_id",
+}
+# Anything keyed only by user that may outlive its interview (e.g. written before it was deleted).
+USER_SCOPED = ("interview_reports", "detailed_breakdown")
+
+
+def _owner_filter(user_id: str) -> dict:
+    # Older interviews stored user_id as an ObjectId.
+    return {"$or": [{"user_id": user_id}, {"user_id": ObjectId(user_id)}]}
+
+
+def _remove_pdfs(interview_ids: list):
+    for interview_id in interview_ids:
+        try:
+            os.remove(report_pdf_path(interview_id))
+        except FileNotFoundError:
+            pass
+
+
+async def delete_interviews(db, interview_ids: list) -> dict:
+    """Delete everything belonging to `interview_ids`, the interviews themselves last. Idempotent."""
+    deleted = await asyncio.gather(*(
+        db[collection].delete_many({field: {"$in": interview_ids}})
+        for collection, field in INTERVIEW_SCOPED.items()
+    ))
+    await run_in_threadpool(_remove_pdfs, interview_ids)
+    result = await db.interviews.delete_many({"_id": {"$in": [ObjectId(i) for i in interview_ids]}})
+    interview_cache.invalidate_many(interview_ids)
+    counts = {collection: r.deleted_count for collection, r in zip(INTERVIEW_SCOPED, deleted)}
+    counts["interviews"] = result.deleted_count
+    return counts
+
+
+async def delete_account_job(db, job: dict, progress):
+    """
+    Cascade-delete a user: walk their interviews in batches of ACCOUNT_DELETE_BATCH_SIZE, deleting
+    each batch's data with one `delete_many` per collection, then the user. An interview is only
+    removed after its data, so a crashed or retried job resumes by simply re-listing what's left;
+    running totals are checkpointed on the job after every batch.
+    """
+    user_id = job["user_id"]
+    totals = dict((job.get("partial") or {}).get("deleted") or {})
+    batches = (job.get("partial") or {}).get("batches", 0)
+
+    # Drop the user's other jobs first: queued ones never start, and running report/PDF handlers
+    # lose their lease and stop at their next step instead of writing after the cascade.
+    await progress("jobs")
+    await db.jobs.delete_many({**_owner_filter(user_id), "kind": {"$ne": "delete_account"}})
+
+    while True:
+        batch = await db.interviews.find(_owner_filter(user_id), {"_id": 1}).sort("_id", 1).limit(ACCOUNT_DELETE_BATCH_SIZE).to_list(length=ACCOUNT_DELETE_BATCH_SIZE)
+        if not batch:
+            break
+        counts = await delete_interviews(db, [str(interview["_id"]) for interview in batch])
+        for collection, count in counts.items():
+            totals[collection] = totals.get(collection, 0) + count
+        batches += 1
+        await progress("interviews", partial={"deleted": totals, "batches": batches, "last_interview_id": str(batch[-1]["_id"])})
+
+    await progress("user")
+    for collection in USER_SCOPED:
+        result = await db[collection].delete_many(_owner_filter(user_id))
+        totals[collection] = totals.get(collection, 0) + result.deleted_count
+    await db.users.delete_one({"_id": ObjectId(user_id)})
+    token_cache.invalidate_user(user_id)
+
+    return {"deleted": totals, "batches": batches, "completed_at": datetime.utcnow().isoformat()}
+
+
+async def sweep_pending_deletions(db):
+    """Restart account deletions whose job failed or went missing, so a flagged user isn't left half-deleted."""
+    retry_before = datetime.now() - timedelta(minutes=ACCOUNT_DELETE_RETRY_MINUTES)
+    flagged = await db.users.find({"deletion_requested_at": {"$exists": True}}, {"_id": 1}).to_list(length=100)
+    for user in flagged:
+        user_id = str(user["_id"])
+        job = await job_queue.get(db, job_id("delete_account", user_id))
+        if job is None or (job["status"] == "failed" and (job.get("finished_at") or datetime.min) < retry_before):
+            await job_queue.enqueue(db, "delete_account", None, user_id=user_id)
+
+
+job_queue.register("delete_account", delete_account_job)
+job_queue.register_sweeper(sweep_pending_deletions)
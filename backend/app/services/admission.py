@@ -0,0 +1,194 @@
+from fastapi import HTTPException, Request
+from app.db.db import get_database
+from app.services.interview_cache import interview_cache
+from contextlib import asynccontextmanager
+from bson import ObjectId
+from collections import defaultdict
+from typing import Optional
+import asyncio
+import heapq
+import itertools
+import math
+import time
+import os
+
+
+# Lower number = served first. Live turns are the most latency-sensitive, reports the least.
+PRIORITIES = {"interactive": 0, "greeting": 1, "report": 2}
+MAX_WAIT = {
+    "interactive": float(os.getenv("ADMISSION_INTERACTIVE_MAX_WAIT", 10)),
+    "greeting": float(os.getenv("ADMISSION_GREETING_MAX_WAIT", 10)),
+    "report": float(os.getenv("ADMISSION_REPORT_MAX_WAIT", 30)),
+}
+
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", 32))
+# Reports may only hold this many slots, so a burst of them never starves live turns.
+ADMISSION_REPORT_CAPACITY = int(os.getenv("ADMISSION_REPORT_CAPACITY", 8))
+ADMISSION_PER_USER = int(os.getenv("ADMISSION_PER_USER", 2))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 100))
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def to_http(self) -> HTTPException:
+        return HTTPException(status_code=429, detail=self.reason, headers={"Retry-After": str(self.retry_after)})
+
+
+class AdmissionController:
+    """
+    Bounds how many expensive AI requests (LLM and speech work) run at once.
+
+    Requests take a slot for their whole duration. When all slots are busy they queue by
+    priority class and are admitted highest priority first; a request that can't be admitted
+    within its class's MAX_WAIT, or arrives to a full queue, is rejected with a Retry-After hint.
+    Each user may hold at most `per_user` slots at a time.
+    """
+
+    def __init__(self, capacity: int, report_capacity: int, per_user: int, max_queue: int):
+        self.capacity = capacity
+        self.report_capacity = report_capacity
+        self.per_user = per_user
+        self.max_queue = max_queue
+        self.in_flight = defaultdict(int)
+        self.user_in_flight = defaultdict(int)
+        self._waiters = []
+        self._order = itertools.count()
+        self.hold_seconds = 1.0
+        self.stats = {"admitted": 0, "queued": 0, "rejected_user_cap": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "wait_seconds": 0.0}
+
+    def _total(self) -> int:
+        return sum(self.in_flight.values())
+
+    def _fits(self, cls: str) -> bool:
+        if self._total() >= self.capacity:
+            return False
+        return cls != "report" or self.in_flight["report"] < self.report_capacity
+
+    def _admit(self, cls: str, user: str):
+        self.in_flight[cls] += 1
+        self.user_in_flight[user] += 1
+        self.stats["admitted"] += 1
+
+    def _retry_after(self) -> int:
+        backlog = len(self._waiters) + self._total()
+        return max(1, math.ceil(self.hold_seconds * backlog / max(self.capacity, 1)))
+
+    def _dispatch(self):
+        """Hand freed slots to the best waiters that fit, skipping reports held back by their cap."""
+        skipped = []
+        while self._waiters and self._total() < self.capacity:
+            entry = heapq.heappop(self._waiters)
+            _, _, cls, user, future = entry
+            if future.done():
+                continue
+            if not self._fits(cls):
+                skipped.append(entry)
+                continue
+            self._admit(cls, user)
+            future.set_result(True)
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+
+    async def acquire(self, cls: str, user: str):
+        if self.user_in_flight[user] >= self.per_user:
+            self.stats["rejected_user_cap"] += 1
+            raise AdmissionRejected("Too many AI requests in progress for this user.", self._retry_after())
+
+        ahead = any(entry[0] <= PRIORITIES[cls] and not entry[4].done() for entry in self._waiters)
+        if self._fits(cls) and not ahead:
+            self._admit(cls, user)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.stats["rejected_queue_full"] += 1
+            raise AdmissionRejected("Server is busy, please retry shortly.", self._retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (PRIORITIES[cls], next(self._order), cls, user, future))
+        self.stats["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), MAX_WAIT[cls])
+        except BaseException as e:
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            if future.done() and not future.cancelled():
+                if timed_out:
+                    # Admitted just as the wait expired; keep the slot.
+                    return
+                # Admitted, but the request went away (e.g. client disconnect); hand the slot on.
+                self.release(cls, user, 0.0)
+                raise
+            future.cancel()
+            self._waiters = [entry for entry in self._waiters if entry[4] is not future]
+            heapq.heapify(self._waiters)
+            if timed_out:
+                self.stats["rejected_timeout"] += 1
+                raise AdmissionRejected("Server is busy, please retry shortly.", self._retry_after())
+            raise
+        finally:
+            self.stats["wait_seconds"] += time.monotonic() - started
+
+    def release(self, cls: str, user: str, held: float):
+        self.in_flight[cls] -= 1
+        self.user_in_flight[user] -= 1
+        if not self.user_in_flight[user]:
+            del self.user_in_flight[user]
+        # Exponential moving average of slot hold time, used for Retry-After estimates.
+        self.hold_seconds = 0.9 * self.hold_seconds + 0.1 * held
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, cls: str, user: Optional[str]):
+        """Hold one admission slot for the body of the block; raises AdmissionRejected when overloaded."""
+        user = user or "anonymous"
+        await self.acquire(cls, user)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(cls, user, time.monotonic() - started)
+
+    def snapshot(self) -> dict:
+        queued = defaultdict(int)
+        for entry in self._waiters:
+            if not entry[4].done():
+                queued[entry[2]] += 1
+        return {
+            **self.stats,
+            "in_flight": dict(self.in_flight),
+            "queue_depth": dict(queued),
+            "capacity": self.capacity,
+            "report_capacity": self.report_capacity,
+            "avg_hold_seconds": round(self.hold_seconds, 2),
+        }
+
+
+admission = AdmissionController(ADMISSION_CAPACITY, ADMISSION_REPORT_CAPACITY, ADMISSION_PER_USER, ADMISSION_MAX_QUEUE)
+
+
+async def request_user_key(request: Request) -> str:
+    """The authenticated user, else the interview owner when the route is scoped to an interview, else the client address."""
+    user = getattr(request.state, "user", None)
+    if user:
+        return f"user:{user['id']}"
+    interview_id = request.path_params.get("interview_id")
+    if interview_id and ObjectId.is_valid(interview_id):
+        interview = await interview_cache.get(get_database(), interview_id)
+        if interview and interview.get("user_id"):
+            return f"user:{interview['user_id']}"
+    return f"client:{request.client.host if request.client else 'unknown'}"
+
+
+def admit(cls: str):
+    """Route dependency holding an admission slot of class `cls` for the whole request."""
+    async def dependency(request: Request):
+        try:
+            async with admission.slot(cls, await request_user_key(request)):
+                yield
+        except AdmissionRejected as e:
+            raise e.to_http()
+    return dependency
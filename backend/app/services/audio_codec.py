@@ -0,0 +1,140 @@
+from typing import Optional, Tuple
+from app.services.audio_preprocess import resample
+import numpy as np
+import struct
+import base64
+import time
+import wave
+import io
+import os
+
+
+SUPPORTED_AUDIO_FORMATS = ("wav", "mulaw")
+TTS_AUDIO_FORMAT = os.getenv("TTS_AUDIO_FORMAT", "wav")
+MULAW_SAMPLE_RATE = int(os.getenv("TTS_MULAW_SAMPLE_RATE", 16000))
+
+MULAW_BIAS = 0x84
+MULAW_CLIP = 32635
+WAVE_FORMAT_MULAW = 7
+
+codec_stats = {fmt: {"encoded": 0, "pcm_bytes": 0, "encoded_bytes": 0, "encode_ms": 0.0} for fmt in SUPPORTED_AUDIO_FORMATS}
+
+
+def mulaw_encode(pcm: np.ndarray) -> np.ndarray:
+    """Vectorised G.711 μ-law compression of int16 samples to one byte per sample."""
+    samples = pcm.astype(np.int32)
+    sign = (samples < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(samples), MULAW_CLIP) + MULAW_BIAS
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 7
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def mulaw_decode(encoded: np.ndarray) -> np.ndarray:
+    value = ~encoded.astype(np.int32) & 0xFF
+    exponent = (value >> 4) & 0x07
+    magnitude = (((value & 0x0F) << 3) + MULAW_BIAS << exponent) - MULAW_BIAS
+    return np.where(value & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def _mulaw_wav(encoded: np.ndarray, sample_rate: int) -> bytes:
+    """WAV container for μ-law data (format tag 7); non-PCM formats need an 18-byte fmt chunk and a fact chunk."""
+    data = encoded.tobytes()
+    fmt_chunk = struct.pack("<HHIIHHH", WAVE_FORMAT_MULAW, 1, sample_rate, sample_rate, 1, 8, 0)
+    fact_chunk = struct.pack("<I", len(encoded))
+    body = (
+        b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt_chunk)) + fmt_chunk
+        + b"fact" + struct.pack("<I", len(fact_chunk)) + fact_chunk
+        + b"data" + struct.pack("<I", len(data)) + data
+    )
+    if len(data) % 2:
+        body += b"\x00"
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _pcm_wav(pcm: np.ndarray, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def encode_pcm16(pcm_data: bytes, sample_rate: int, audio_format: str = TTS_AUDIO_FORMAT) -> dict:
+    """
+    Encode raw mono 16-bit PCM into the response shape used for synthesised speech:
+    `{"audio": <base64>, "format": ...}`, plus `sample_rate` for compact formats.
+    """
+    started = time.perf_counter()
+    pcm = np.frombuffer(pcm_data, dtype="<i2")
+
+    if audio_format == "mulaw":
+        if sample_rate != MULAW_SAMPLE_RATE:
+            resampled = resample(pcm.astype(np.float32) / 32768.0, sample_rate, MULAW_SAMPLE_RATE)
+            pcm = (np.clip(resampled, -1.0, 1.0) * 32767.0).astype(np.int16)
+            sample_rate = MULAW_SAMPLE_RATE
+        encoded = _mulaw_wav(mulaw_encode(pcm), sample_rate)
+        result = {"audio": base64.b64encode(encoded).decode("utf-8"), "format": "mulaw", "container": "wav", "sample_rate": sample_rate}
+    else:
+        encoded = _pcm_wav(pcm, sample_rate)
+        result = {"audio": base64.b64encode(encoded).decode("utf-8"), "format": "wav"}
+
+    stats = codec_stats[result["format"]]
+    stats["encoded"] += 1
+    stats["pcm_bytes"] += len(pcm_data)
+    stats["encoded_bytes"] += len(encoded)
+    stats["encode_ms"] += (time.perf_counter() - started) * 1000
+    return result
+
+
+def decode_to_pcm16(text_audio: dict) -> Tuple[bytes, int]:
+    """Inverse of `encode_pcm16`: returns raw 16-bit PCM and its sample rate."""
+    encoded = base64.b64decode(text_audio["audio"])
+
+    if text_audio.get("format") == "mulaw":
+        data_offset = encoded.index(b"data") + 8
+        data_length = struct.unpack("<I", encoded[data_offset - 4:data_offset])[0]
+        samples = np.frombuffer(encoded, dtype=np.uint8, count=data_length, offset=data_offset)
+        return mulaw_decode(samples).astype("<i2").tobytes(), text_audio.get("sample_rate", MULAW_SAMPLE_RATE)
+
+    with wave.open(io.BytesIO(encoded), "rb") as wav_file:
+        return wav_file.readframes(wav_file.getnframes()), wav_file.getframerate()
+
+
+def convert_audio(text_audio: Optional[dict], audio_format: str) -> Optional[dict]:
+    """Re-encode stored speech into the format a client negotiated; a no-op when they already match."""
+    if not text_audio or not text_audio.get("audio") or text_audio.get("format", "wav") == audio_format:
+        return text_audio
+    pcm, sample_rate = decode_to_pcm16(text_audio)
+    return encode_pcm16(pcm, sample_rate, audio_format)
+
+
+def negotiate_audio_format(requested: Optional[str]) -> str:
+    """
+    Pick the speech format from a client preference list such as `mulaw, wav;q=0.5`.
+    Unknown or missing preferences fall back to the server default (TTS_AUDIO_FORMAT).
+    """
+    if not requested:
+        return TTS_AUDIO_FORMAT
+
+    best, best_q = None, 0.0
+    for part in requested.split(","):
+        pieces = [p.strip() for p in part.split(";")]
+        name = pieces[0].lower()
+        if name == "audio/basic":
+            name = "mulaw"
+        elif name in ("audio/wav", "audio/wave"):
+            name = "wav"
+        q = 1.0
+        for param in pieces[1:]:
+            if param.lower().startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if name in SUPPORTED_AUDIO_FORMATS and q > best_q:
+            best, best_q = name, q
+    return best or TTS_AUDIO_FORMAT
@@ -0,0 +1,38 @@
+from fastapi import HTTPException, UploadFile
+import os
+
+
+MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", 15 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def read_audio_upload(file: UploadFile, max_bytes: int = MAX_AUDIO_UPLOAD_BYTES) -> bytes:
+    """
+    Read an uploaded audio file in fixed-size chunks, enforcing `max_bytes` as it goes.
+
+    By the time a route runs, Starlette has already spooled the multipart body, so this check
+    only bounds what is handed on; oversized requests are stopped earlier by
+    BodySizeLimitMiddleware. Chunks are joined exactly once into the buffer handed to the
+    transcription client. The upload is always closed, including when the size cap is exceeded.
+    """
+    try:
+        if file.size is not None and file.size > max_bytes:
+            raise HTTPException(status_code=413, detail="Audio upload is too large.")
+
+        chunks = []
+        total = 0
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > max_bytes:
+                raise HTTPException(status_code=413, detail="Audio upload is too large.")
+            chunks.append(chunk)
+
+        if not total:
+            raise HTTPException(status_code=400, detail="Audio file is empty.")
+
+        return b"".join(chunks)
+    finally:
+        await file.close()
@@ -0,0 +1,265 @@
+from typing import Optional, Tuple
+import numpy as np
+import subprocess
+import shutil
+import wave
+import io
+import os
+
+
+TARGET_SAMPLE_RATE = 16000
+FRAME_MS = 30
+SPEECH_PADDING_MS = int(os.getenv("VAD_SPEECH_PADDING_MS", 200))
+MAX_INTERNAL_SILENCE_MS = int(os.getenv("VAD_MAX_SILENCE_MS", 700))
+MIN_PAUSE_MS = 250
+NOISE_MARGIN_DB = 10.0
+DYNAMIC_RANGE_DB = 50.0
+
+PREPROCESSABLE_TYPES = ("audio/wav", "audio/wave", "audio/x-wav", "audio/vnd.wave", "audio/pcm", "audio/l16")
+# Container formats browsers record (MediaRecorder gives webm/opus or mp4/aac); decoded through ffmpeg.
+COMPRESSED_TYPES = ("audio/webm", "video/webm", "audio/ogg", "audio/mp4", "audio/mpeg", "audio/aac")
+FFMPEG_BINARY = shutil.which(os.getenv("FFMPEG_BINARY", "ffmpeg"))
+FFMPEG_TIMEOUT = float(os.getenv("FFMPEG_TIMEOUT", 20))
+
+preprocess_stats = {
+    "processed": 0,
+    "skipped": 0,
+    "input_seconds": 0.0,
+    "output_seconds": 0.0,
+    "input_bytes": 0,
+    "output_bytes": 0,
+    "transcribed_original": 0,
+    "ffmpeg_available": FFMPEG_BINARY is not None,
+}
+
+
+def _media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+def can_preprocess(content_type: Optional[str]) -> bool:
+    media_type = _media_type(content_type)
+    return media_type in PREPROCESSABLE_TYPES or (media_type in COMPRESSED_TYPES and FFMPEG_BINARY is not None)
+
+
+def _content_type_params(content_type: str) -> dict:
+    params = {}
+    for part in content_type.split(";")[1:]:
+        if "=" in part:
+            key, value = part.split("=", 1)
+            params[key.strip().lower()] = value.strip()
+    return params
+
+
+def decode_compressed(audio: bytes) -> Tuple[np.ndarray, int]:
+    """Decode webm/ogg/mp4 audio with ffmpeg straight to 16 kHz mono 16-bit PCM."""
+    try:
+        result = subprocess.run(
+            [FFMPEG_BINARY, "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+             "-f", "s16le", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "pipe:1"],
+            input=audio, capture_output=True, timeout=FFMPEG_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise ValueError(f"ffmpeg failed: {str(e)}")
+    if result.returncode != 0:
+        raise ValueError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()[:200]}")
+
+    if not result.stdout:
+        raise ValueError("ffmpeg produced no audio.")
+    samples = np.frombuffer(result.stdout, dtype="<i2")
+    return samples.reshape(-1, 1).astype(np.float32) / 32768.0, TARGET_SAMPLE_RATE
+
+
+def decode_pcm(audio: bytes, content_type: str) -> Tuple[np.ndarray, int]:
+    """
+    Decode a WAV file, raw little-endian 16-bit PCM (`audio/pcm; rate=...; channels=...`)
+    or, through ffmpeg, a compressed recording into a float32 array of shape (frames, channels)
+    scaled to [-1, 1].
+    """
+    media_type = _media_type(content_type)
+    if media_type in COMPRESSED_TYPES:
+        return decode_compressed(audio)
+
+    if media_type in ("audio/pcm", "audio/l16"):
+        params = _content_type_params(content_type)
+        sample_rate = int(params.get("rate", TARGET_SAMPLE_RATE))
+        channels = int(params.get("channels", 1))
+        if sample_rate <= 0 or channels <= 0:
+            raise ValueError("Invalid PCM rate or channel count.")
+        samples = np.frombuffer(audio, dtype="<i2")
+        samples = samples[: len(samples) - len(samples) % channels]
+        return samples.reshape(-1, channels).astype(np.float32) / 32768.0, sample_rate
+
+    with wave.open(io.BytesIO(audio), "rb") as wav_file:
+        channels = wav_file.getnchannels()
+        sample_width = wav_file.getsampwidth()
+        sample_rate = wav_file.getframerate()
+        frames = wav_file.readframes(wav_file.getnframes())
+    if sample_rate <= 0:
+        raise ValueError("Invalid WAV sample rate.")
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width}")
+
+    return samples.reshape(-1, channels), sample_rate
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Resample a mono signal; when downsampling, a windowed-sinc low-pass runs first to avoid aliasing."""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+
+    if source_rate > target_rate:
+        cutoff = 0.5 * target_rate / source_rate
+        taps = np.arange(-32, 33)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+        kernel /= kernel.sum()
+        samples = np.convolve(samples, kernel.astype(np.float32), mode="same")
+
+    duration = len(samples) / source_rate
+    target_positions = np.arange(int(duration * target_rate)) * (source_rate / target_rate)
+    return np.interp(target_positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def frame_energy_db(samples: np.ndarray, sample_rate: int, frame_ms: int = FRAME_MS) -> np.ndarray:
+    frame_length = int(sample_rate * frame_ms / 1000)
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[: frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(rms + 1e-10)
+
+
+def voice_activity_mask(energy_db: np.ndarray, padding_ms: int = SPEECH_PADDING_MS) -> np.ndarray:
+    """
+    Energy-based VAD: a frame is speech when it is NOISE_MARGIN_DB above the noise floor
+    (10th percentile) and within DYNAMIC_RANGE_DB of the loudest frame.
+    The mask is dilated by `padding_ms` on both sides so word edges survive trimming.
+    """
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+
+    threshold = max(np.percentile(energy_db, 10) + NOISE_MARGIN_DB, energy_db.max() - DYNAMIC_RANGE_DB)
+    voiced = energy_db > threshold
+
+    padding = padding_ms // FRAME_MS
+    if padding:
+        voiced = np.convolve(voiced.astype(np.int8), np.ones(2 * padding + 1, dtype=np.int8), mode="same") > 0
+    return voiced
+
+
+def _silence_runs(voiced: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    edges = np.diff(np.concatenate(([1], voiced.astype(np.int8), [1])))
+    return np.flatnonzero(edges == -1), np.flatnonzero(edges == 1)
+
+
+def acoustic_metrics(samples: np.ndarray, sample_rate: int) -> dict:
+    """
+    Pacing measurements on the untrimmed signal: time from first to last speech frame,
+    pauses of at least MIN_PAUSE_MS inside that span, and the longest of them.
+    """
+    voiced = voice_activity_mask(frame_energy_db(samples, sample_rate), padding_ms=0)
+    if not voiced.any():
+        return {"speech_duration": 0.0, "active_duration": 0.0, "pause_ratio": 0.0, "longest_pause": 0.0, "pause_count": 0}
+
+    frame_seconds = FRAME_MS / 1000
+    voiced_frames = np.flatnonzero(voiced)
+    active = voiced[voiced_frames[0]:voiced_frames[-1] + 1]
+
+    starts, ends = _silence_runs(active)
+    lengths = ends - starts
+    pauses = lengths[lengths >= MIN_PAUSE_MS // FRAME_MS]
+
+    active_duration = len(active) * frame_seconds
+    pause_duration = float(pauses.sum()) * frame_seconds
+    return {
+        "speech_duration": round(active_duration - pause_duration, 2),
+        "active_duration": round(active_duration, 2),
+        "pause_ratio": round(pause_duration / active_duration, 3) if active_duration else 0.0,
+        "longest_pause": round(float(pauses.max()) * frame_seconds, 2) if len(pauses) else 0.0,
+        "pause_count": int(len(pauses)),
+    }
+
+
+def words_per_minute(transcript: str, metrics: dict) -> Optional[float]:
+    minutes = metrics.get("active_duration", 0.0) / 60
+    if not transcript or minutes <= 0:
+        return None
+    return round(len(transcript.split()) / minutes, 1)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, float]:
+    """
+    Drop leading and trailing silence and shorten internal pauses to MAX_INTERNAL_SILENCE_MS.
+    Returns the trimmed signal and the amount of detected speech in seconds.
+    """
+    frame_length = int(sample_rate * FRAME_MS / 1000)
+    voiced = voice_activity_mask(frame_energy_db(samples, sample_rate))
+    if not voiced.any():
+        return samples, 0.0
+
+    speech_seconds = float(voiced.sum()) * FRAME_MS / 1000
+
+    keep = voiced.copy()
+    max_silence_frames = MAX_INTERNAL_SILENCE_MS // FRAME_MS
+    starts, ends = _silence_runs(voiced)
+    for start, end in zip(starts, ends):
+        if start == 0 or end == len(voiced):
+            continue
+        keep[start:start + min(end - start, max_silence_frames)] = True
+
+    sample_mask = np.repeat(keep, frame_length)
+    tail = len(samples) - len(sample_mask)
+    if tail > 0:
+        sample_mask = np.concatenate((sample_mask, np.full(tail, keep[-1])))
+    return samples[sample_mask], speech_seconds
+
+
+def preprocess_audio(audio: bytes, content_type: str) -> Tuple[bytes, dict, dict]:
+    """
+    Downmix to mono, resample to 16 kHz and trim silence from a voice answer.
+    Returns the re-encoded 16-bit WAV, before/after measurements and acoustic pacing metrics.
+    """
+    samples, sample_rate = decode_pcm(audio, content_type)
+    original_duration = len(samples) / sample_rate if sample_rate else 0.0
+
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    mono = resample(mono, sample_rate, TARGET_SAMPLE_RATE)
+    metrics = acoustic_metrics(mono, TARGET_SAMPLE_RATE)
+    trimmed, speech_seconds = trim_silence(mono, TARGET_SAMPLE_RATE)
+
+    processed = encode_wav(trimmed, TARGET_SAMPLE_RATE)
+    stats = {
+        "original_duration": round(original_duration, 3),
+        "processed_duration": round(len(trimmed) / TARGET_SAMPLE_RATE, 3),
+        "speech_duration": round(speech_seconds, 3),
+        "original_sample_rate": sample_rate,
+        "original_channels": int(samples.shape[1]),
+        "original_bytes": len(audio),
+        "processed_bytes": len(processed),
+    }
+
+    preprocess_stats["processed"] += 1
+    preprocess_stats["input_seconds"] += stats["original_duration"]
+    preprocess_stats["output_seconds"] += stats["processed_duration"]
+    preprocess_stats["input_bytes"] += stats["original_bytes"]
+    preprocess_stats["output_bytes"] += stats["processed_bytes"]
+    return processed, stats, metrics
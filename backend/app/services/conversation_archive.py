@@ -0,0 +1,266 @@
+from app.services.job_queue import job_queue
+from app.services.interview_cache import interview_cache
+from fastapi.concurrency import run_in_threadpool
+from cachetools import LRUCache
+from bson import Binary
+from datetime import datetime, timedelta
+from typing import Optional
+import asyncio
+import zstandard
+import bson
+import os
+
+
+# Completed interviews older than this many days have their conversation packed into one
+# compressed `interview_archives` document; a negative value disables archiving.
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+ARCHIVE_SWEEP_BATCH = int(os.getenv("ARCHIVE_SWEEP_BATCH", 50))
+ARCHIVE_ZSTD_LEVEL = int(os.getenv("ARCHIVE_ZSTD_LEVEL", 19))
+ARCHIVE_DICT_SIZE = int(os.getenv("ARCHIVE_DICT_SIZE", 16384))
+ARCHIVE_DICT_SAMPLES = int(os.getenv("ARCHIVE_DICT_SAMPLES", 2000))
+ARCHIVE_DICT_MAX_AGE_DAYS = float(os.getenv("ARCHIVE_DICT_MAX_AGE_DAYS", 30))
+# Decoded archives kept in memory, text only; audio is decompressed per read and never cached.
+ARCHIVE_READ_CACHE_SIZE = int(os.getenv("ARCHIVE_READ_CACHE_SIZE", 64))
+# Stay clear of Mongo's 16 MB document limit; bigger conversations are left hot.
+ARCHIVE_MAX_DOCUMENT_BYTES = int(os.getenv("ARCHIVE_MAX_DOCUMENT_BYTES", 15 * 1024 * 1024))
+
+archive_stats = {"archived": 0, "skipped_too_large": 0, "reads": 0, "read_cache_hits": 0, "dictionary_trainings": 0, "dictionary_failures": 0}
+
+_dictionaries = {}
+_active_dictionary = None
+_dictionary_lock = asyncio.Lock()
+_read_cache = LRUCache(maxsize=ARCHIVE_READ_CACHE_SIZE)
+
+
+def _compress(raw: bytes, dictionary: Optional[zstandard.ZstdCompressionDict]) -> bytes:
+    return zstandard.ZstdCompressor(level=ARCHIVE_ZSTD_LEVEL, dict_data=dictionary, write_content_size=True).compress(raw)
+
+
+def _decompress(blob: bytes, dictionary: Optional[zstandard.ZstdCompressionDict]) -> bytes:
+    return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(blob)
+
+
+def _train(samples: list) -> Optional[zstandard.ZstdCompressionDict]:
+    try:
+        return zstandard.train_dictionary(ARCHIVE_DICT_SIZE, samples)
+    except zstandard.ZstdError as e:
+        # Too few or too uniform samples; archive without a dictionary until there are more.
+        archive_stats["dictionary_failures"] += 1
+        print(f"⚠️ Conversation dictionary training failed: {str(e)}")
+        return None
+
+
+async def _load_dictionary(db, dict_id: int) -> Optional[zstandard.ZstdCompressionDict]:
+    if not dict_id:
+        return None
+    if dict_id not in _dictionaries:
+        stored = await db.compression_dictionaries.find_one({"_id": f"conversation:{dict_id}"})
+        if stored is None:
+            raise RuntimeError(f"Compression dictionary {dict_id} is missing.")
+        _dictionaries[dict_id] = zstandard.ZstdCompressionDict(bytes(stored["data"]))
+    return _dictionaries[dict_id]
+
+
+async def current_dictionary(db) -> Optional[zstandard.ZstdCompressionDict]:
+    """
+    The dictionary new archives are compressed with: the newest stored one, retrained from a sample
+    of live conversation text (audio excluded) once it is older than ARCHIVE_DICT_MAX_AGE_DAYS.
+    Old dictionaries are kept, since every archive records the id of the one it needs.
+    """
+    global _active_dictionary
+    async with _dictionary_lock:
+        cutoff = datetime.utcnow() - timedelta(days=ARCHIVE_DICT_MAX_AGE_DAYS)
+        if _active_dictionary and _active_dictionary[1] >= cutoff:
+            return _dictionaries[_active_dictionary[0]]
+
+        stored = await db.compression_dictionaries.find({"kind": "conversation"}).sort("created_at", -1).limit(1).to_list(length=1)
+        if stored and stored[0]["created_at"] >= cutoff:
+            dict_id = stored[0]["dict_id"]
+            _dictionaries[dict_id] = zstandard.ZstdCompressionDict(bytes(stored[0]["data"]))
+            _active_dictionary = (dict_id, stored[0]["created_at"])
+            return _dictionaries[dict_id]
+
+        turns = await db.interview_conversations.find({}, {"text_audio": 0}).limit(ARCHIVE_DICT_SAMPLES).to_list(length=ARCHIVE_DICT_SAMPLES)
+        dictionary = await run_in_threadpool(_train, [bson.encode(turn) for turn in turns])
+        if dictionary is None:
+            return _dictionaries[stored[0]["dict_id"]] if stored and stored[0]["dict_id"] in _dictionaries else None
+
+        dict_id, created_at = dictionary.dict_id(), datetime.utcnow()
+        await db.compression_dictionaries.update_one(
+            {"_id": f"conversation:{dict_id}"},
+            {"$set": {"kind": "conversation", "dict_id": dict_id, "data": Binary(dictionary.as_bytes()), "samples": len(turns), "created_at": created_at}},
+            upsert=True
+        )
+        archive_stats["dictionary_trainings"] += 1
+        _dictionaries[dict_id] = dictionary
+        _active_dictionary = (dict_id, created_at)
+        return dictionary
+
+
+def _pack(turns: list, dictionary) -> dict:
+    """
+    Two zstd frames: the turns without audio (small, repetitive text; compressed with the trained
+    dictionary) and their audio payloads keyed by turn id (no dictionary helps there), so text-only
+    reads never touch the audio.
+    """
+    audio = {str(turn["_id"]): turn["text_audio"] for turn in turns if turn.get("text_audio")}
+    text_turns = [{key: value for key, value in turn.items() if not (key == "text_audio" and value)} for turn in turns]
+    text_raw = bson.encode({"turns": text_turns})
+    audio_raw = bson.encode({"audio": audio}) if audio else b""
+
+    text_blob = _compress(text_raw, dictionary)
+    audio_blob = _compress(audio_raw, None) if audio_raw else b""
+    # Verify before the hot copy is deleted.
+    if _decompress(text_blob, dictionary) != text_raw or (audio_blob and _decompress(audio_blob, None) != audio_raw):
+        raise RuntimeError("Archive round-trip check failed.")
+
+    return {
+        "text_blob": Binary(text_blob),
+        "audio_blob": Binary(audio_blob),
+        "raw_bytes": sum(len(bson.encode(turn)) for turn in turns),
+        "stored_bytes": len(text_blob) + len(audio_blob),
+    }
+
+
+def _merge_turns(archived: list, hot: list) -> list:
+    """Union of already archived and hot turns by `_id` (the hot copy wins), oldest first."""
+    merged = {turn["_id"]: turn for turn in archived}
+    merged.update((turn["_id"], turn) for turn in hot)
+    return sorted(merged.values(), key=lambda turn: turn.get("created_at") or datetime.min)
+
+
+async def archive_interview(db, interview_id: str) -> dict:
+    """Pack an interview's conversation into `interview_archives`, then drop the hot documents."""
+    hot = await db.interview_conversations.find({"interview_id": interview_id}).sort("created_at", 1).to_list(length=None)
+    if not hot:
+        await db.interviews.update_one({"_id": bson.ObjectId(interview_id)}, {"$set": {"archived_at": datetime.utcnow()}})
+        interview_cache.invalidate(interview_id)
+        return {"turns": 0}
+
+    # A previous run may have written the archive and died part-way through deleting the hot turns;
+    # re-pack what it archived together with the leftovers instead of overwriting it.
+    _read_cache.pop(interview_id, None)
+    archived = await read_archive(db, interview_id, with_audio=True) or []
+    turns = _merge_turns(archived, hot)
+
+    dictionary = await current_dictionary(db)
+    packed = await run_in_threadpool(_pack, turns, dictionary)
+    if packed["stored_bytes"] > ARCHIVE_MAX_DOCUMENT_BYTES:
+        archive_stats["skipped_too_large"] += 1
+        await db.interviews.update_one({"_id": bson.ObjectId(interview_id)}, {"$set": {"archive_skipped": "too_large"}})
+        return {"turns": len(turns), "skipped": "too_large", "stored_bytes": packed["stored_bytes"]}
+
+    await db.interview_archives.update_one(
+        {"interview_id": interview_id},
+        {"$set": {
+            **packed,
+            "codec": "zstd",
+            "dict_id": dictionary.dict_id() if dictionary else 0,
+            "turns": len(turns),
+            "archived_at": datetime.utcnow(),
+        }},
+        upsert=True
+    )
+    # The archive is written first: until the hot turns are gone reads keep using them, and a crash
+    # in between leaves archived_at unset, so the next run merges the leftovers into this archive.
+    await db.interview_conversations.delete_many({"interview_id": interview_id, "_id": {"$in": [turn["_id"] for turn in hot]}})
+    await db.interviews.update_one({"_id": bson.ObjectId(interview_id)}, {"$set": {"archived_at": datetime.utcnow()}})
+    interview_cache.invalidate(interview_id)
+    _read_cache.pop(interview_id, None)
+    archive_stats["archived"] += 1
+    return {"turns": len(turns), "raw_bytes": packed["raw_bytes"], "stored_bytes": packed["stored_bytes"]}
+
+
+async def read_archive(db, interview_id: str, with_audio: bool = True) -> Optional[list]:
+    """The archived conversation of an interview, oldest first, or None if it isn't archived."""
+    archive_stats["reads"] += 1
+    turns = _read_cache.get(interview_id)
+    if turns is not None:
+        archive_stats["read_cache_hits"] += 1
+    else:
+        archive = await db.interview_archives.find_one({"interview_id": interview_id}, {"text_blob": 1, "dict_id": 1})
+        if archive is None:
+            return None
+        dictionary = await _load_dictionary(db, archive.get("dict_id", 0))
+        turns = bson.decode(await run_in_threadpool(_decompress, bytes(archive["text_blob"]), dictionary))["turns"]
+        _read_cache[interview_id] = turns
+
+    turns = [dict(turn) for turn in turns]
+    if with_audio:
+        archive = await db.interview_archives.find_one({"interview_id": interview_id}, {"audio_blob": 1})
+        if archive and archive.get("audio_blob"):
+            audio = bson.decode(await run_in_threadpool(_decompress, bytes(archive["audio_blob"]), None))["audio"]
+            for turn in turns:
+                if str(turn["_id"]) in audio:
+                    turn["text_audio"] = audio[str(turn["_id"])]
+    return turns
+
+
+def _matches(turn: dict, query: dict) -> bool:
+    return all(turn.get(key) == value for key, value in query.items())
+
+
+def _project(turn: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return turn
+    if any(value for key, value in projection.items() if key != "_id"):
+        fields = [key for key, value in projection.items() if value]
+        projected = {key: turn[key] for key in fields if key in turn}
+        if projection.get("_id", 1) and "_id" in turn:
+            projected["_id"] = turn["_id"]
+        return projected
+    return {key: value for key, value in turn.items() if key not in projection}
+
+
+async def load_conversation(db, interview_id: str, query: Optional[dict] = None, projection: Optional[dict] = None) -> list:
+    """
+    Conversation turns of an interview, oldest first, wherever they live: the hot
+    `interview_conversations` collection or, once archived, the compressed archive. `query` is
+    a set of extra equality filters and `projection` a plain Mongo projection; both are applied
+    the same way to archived turns. The archive is only consulted for interviews marked `archived_at`.
+    """
+    turns = await db.interview_conversations.find({"interview_id": interview_id, **(query or {})}, projection).sort("created_at", 1).to_list(length=None)
+    if turns or not bson.ObjectId.is_valid(interview_id):
+        return turns
+
+    interview = await interview_cache.get(db, interview_id)
+    if not interview or not interview.get("archived_at"):
+        return turns
+
+    with_audio = not projection or _project({"text_audio": True}, projection).get("text_audio") is not None
+    archived = await read_archive(db, interview_id, with_audio=with_audio)
+    if not archived:
+        return []
+    return [_project(turn, projection) for turn in archived if _matches(turn, query or {})]
+
+
+async def archive_job(db, job: dict, progress):
+    return await archive_interview(db, job["interview_id"])
+
+
+async def sweep_archivable(db):
+    """Queue archive jobs for completed interviews past ARCHIVE_AFTER_DAYS."""
+    if ARCHIVE_AFTER_DAYS < 0:
+        return
+    cutoff = (datetime.now() - timedelta(days=ARCHIVE_AFTER_DAYS)).isoformat()
+    interviews = await db.interviews.find(
+        {"completion": "completed", "created_at": {"$lt": cutoff}, "archived_at": {"$exists": False}, "archive_skipped": {"$exists": False}},
+        {"_id": 1, "user_id": 1}
+    ).limit(ARCHIVE_SWEEP_BATCH).to_list(length=ARCHIVE_SWEEP_BATCH)
+    for interview in interviews:
+        await job_queue.enqueue(db, "archive", str(interview["_id"]), interview.get("user_id"))
+
+
+async def archive_storage(db) -> dict:
+    """Storage saved by the archive tier, across all archived interviews."""
+    totals = await db.interview_archives.aggregate([
+        {"$group": {"_id": None, "interviews": {"$sum": 1}, "turns": {"$sum": "$turns"}, "raw_bytes": {"$sum": "$raw_bytes"}, "stored_bytes": {"$sum": "$stored_bytes"}}}
+    ]).to_list(length=1)
+    totals = totals[0] if totals else {"interviews": 0, "turns": 0, "raw_bytes": 0, "stored_bytes": 0}
+    totals.pop("_id", None)
+    totals["ratio"] = round(totals["stored_bytes"] / totals["raw_bytes"], 3) if totals["raw_bytes"] else None
+    return {**archive_stats, **totals}
+
+
+job_queue.register("archive", archive_job)
+job_queue.register_sweeper(sweep_archivable)
@@ -0,0 +1,134 @@
+from app.langgraph_agents.conversation_summary import summarize_conversation
+from app.langgraph_agents.interview_report import score_ai_likelihood
+from app.services.resilience import clear_deadline
+from app.services.admission import admission, AdmissionRejected
+from app.services.conversation_archive import load_conversation
+from datetime import datetime
+from typing import Tuple
+import asyncio
+import os
+
+
+# Interviews up to SUMMARY_AFTER_TURNS answered pairs (well above the default question limit) go to
+# the report verbatim. Past that, everything but the last SUMMARY_RECENT_TURNS pairs is folded into a
+# running summary, SUMMARY_BATCH_SIZE at a time, so prompt size stays bounded at any interview length.
+# Folded answers are scored for AI-likelihood as they are folded and the scores kept with the summary.
+SUMMARY_AFTER_TURNS = int(os.getenv("CONVERSATION_SUMMARY_AFTER_TURNS", 25))
+SUMMARY_RECENT_TURNS = int(os.getenv("CONVERSATION_SUMMARY_RECENT_TURNS", 10))
+SUMMARY_BATCH_SIZE = int(os.getenv("CONVERSATION_SUMMARY_BATCH_SIZE", 4))
+
+memory_stats = {"folds": 0, "pairs_folded": 0, "failures": 0}
+
+_updates_in_flight = set()
+_background_tasks = set()
+
+
+async def load_question_answer_pairs(db, interview_id: str) -> list:
+    """
+    Pair each AI question with the user's answer. Voice answers carry their measured
+    pacing as a compact `pacing` entry so the agents don't have to infer it from text.
+    """
+    interview_conversation = await load_conversation(
+        db, interview_id,
+        {"is_first_message": False},
+        {"_id": 0, "sender": 1, "text": 1, "acoustic_metrics": 1}
+    )
+
+    interview_conversation = interview_conversation[1:]
+
+    question_answer_arr = []
+    for i in range(0, len(interview_conversation) - 1, 2):
+        question, answer = interview_conversation[i], interview_conversation[i + 1]
+        if question["sender"] != "ai" or answer["sender"] != "user":
+            continue
+        pair = {"question": question["text"], "answer": answer["text"]}
+        metrics = answer.get("acoustic_metrics")
+        if metrics:
+            pair["pacing"] = {
+                "wpm": metrics.get("words_per_minute"),
+                "speech_s": metrics.get("speech_duration"),
+                "pause_ratio": metrics.get("pause_ratio"),
+                "longest_pause_s": metrics.get("longest_pause"),
+            }
+        question_answer_arr.append(pair)
+    return question_answer_arr
+
+
+async def refresh_summary(db, interview_id: str, question_answer_arr: list, min_batch: int = SUMMARY_BATCH_SIZE) -> dict:
+    """
+    Fold every pair older than the last SUMMARY_RECENT_TURNS into the stored summary, once the
+    interview is longer than SUMMARY_AFTER_TURNS and at least `min_batch` pairs are pending, and
+    score the folded answers for AI-likelihood. Returns the memory document
+    `{summary, summarized_count, ai_likelihood}`.
+    """
+    if len(question_answer_arr) <= SUMMARY_AFTER_TURNS:
+        return {"summary": "", "summarized_count": 0, "ai_likelihood": []}
+
+    memory = await db.interview_memory.find_one(
+        {"interview_id": interview_id}, {"_id": 0, "summary": 1, "summarized_count": 1, "ai_likelihood": 1}
+    ) or {}
+    summary, summarized_count = memory.get("summary", ""), memory.get("summarized_count", 0)
+    ai_likelihood = memory.get("ai_likelihood", [])
+
+    fold_until = len(question_answer_arr) - SUMMARY_RECENT_TURNS
+    if fold_until - summarized_count < max(min_batch, 1):
+        fold_until = summarized_count
+    # Summaries written before answers were scored have fewer scores than folded pairs; catch up on those too.
+    unscored = question_answer_arr[len(ai_likelihood):fold_until]
+    if not unscored:
+        return {"summary": summary, "summarized_count": summarized_count, "ai_likelihood": ai_likelihood}
+
+    batches = [unscored[i:i + SUMMARY_RECENT_TURNS] for i in range(0, len(unscored), SUMMARY_RECENT_TURNS)]
+    scoring = asyncio.gather(*(score_ai_likelihood(batch) for batch in batches))
+    if fold_until > summarized_count:
+        summary, scores = await asyncio.gather(summarize_conversation(summary, question_answer_arr[summarized_count:fold_until]), scoring)
+        memory_stats["folds"] += 1
+        memory_stats["pairs_folded"] += fold_until - summarized_count
+    else:
+        scores = await scoring
+    ai_likelihood = ai_likelihood + [score for batch in scores for score in batch]
+
+    await db.interview_memory.update_one(
+        {"interview_id": interview_id},
+        {"$set": {"summary": summary, "summarized_count": fold_until, "ai_likelihood": ai_likelihood, "updated_at": datetime.now()}},
+        upsert=True
+    )
+    return {"summary": summary, "summarized_count": fold_until, "ai_likelihood": ai_likelihood}
+
+
+async def load_report_context(db, interview_id: str) -> Tuple[str, list, list, list]:
+    """
+    Everything the report agents need: `(summary, recent_pairs, all_pairs, earlier_ai_likelihood)`.
+    `recent_pairs` is every pair unless the interview is long enough to be summarised; the
+    background updates are caught up first, so it then never exceeds SUMMARY_RECENT_TURNS.
+    `earlier_ai_likelihood` holds the stored scores of the summarised pairs, in order.
+    """
+    question_answer_arr = await load_question_answer_pairs(db, interview_id)
+    memory = await refresh_summary(db, interview_id, question_answer_arr, min_batch=1)
+    summarized_count = memory["summarized_count"]
+    return memory["summary"], question_answer_arr[summarized_count:], question_answer_arr, memory["ai_likelihood"][:summarized_count]
+
+
+def schedule_summary_update(db, interview_id: str):
+    """Fold older turns into the running summary in the background; at most one update per interview at a time."""
+    if interview_id in _updates_in_flight:
+        return
+
+    async def run():
+        clear_deadline()
+        try:
+            async with admission.slot("report", f"interview:{interview_id}"):
+                await refresh_summary(db, interview_id, await load_question_answer_pairs(db, interview_id))
+        except AdmissionRejected:
+            # Busy; the next answer or the report itself catches up on the fold.
+            pass
+        except Exception as e:
+            memory_stats["failures"] += 1
+            print(f"⚠️ Conversation summary update failed for {interview_id}: {str(e)}")
+        finally:
+            _updates_in_flight.discard(interview_id)
+
+    _updates_in_flight.add(interview_id)
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
@@ -0,0 +1,64 @@
+from typing import Optional
+from cachetools import TTLCache
+from bson import ObjectId
+import os
+
+
+class InterviewCache:
+    """
+    Small TTL + LRU cache of `interviews` documents keyed by interview_id.
+
+    Interview documents are tiny and read on almost every interview and report route,
+    so one session would otherwise fetch the same document many times. Any write to an
+    interview (completion, deletion) must call `invalidate`; frequent timer writes use `update`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, db, interview_id: str) -> Optional[dict]:
+        interview = self._cache.get(interview_id)
+        if interview is not None:
+            self.hits += 1
+            return dict(interview)
+
+        self.misses += 1
+        interview = await db.interviews.find_one({"_id": ObjectId(interview_id)})
+        if interview is None:
+            return None
+
+        interview["_id"] = str(interview["_id"])
+        self._cache[interview_id] = interview
+        return dict(interview)
+
+    def invalidate(self, interview_id: str):
+        self._cache.pop(interview_id, None)
+
+    def update(self, interview_id: str, fields: dict):
+        """Apply a write to the cached copy, if there is one, instead of evicting it."""
+        interview = self._cache.get(interview_id)
+        if interview is not None:
+            interview.update(fields)
+
+    def invalidate_many(self, interview_ids):
+        for interview_id in interview_ids:
+            self._cache.pop(interview_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "ttl": self._cache.ttl,
+        }
+
+
+interview_cache = InterviewCache(
+    maxsize=int(os.getenv("INTERVIEW_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("INTERVIEW_CACHE_TTL", 300))
+)
@@ -0,0 +1,142 @@
+from collections import deque
+from typing import Dict, Optional
+from app.services.interview_cache import interview_cache
+from app.services.interview_turns import question_limit
+from app.services.timer_buffer import timer_buffer
+from app.services.conversation_archive import load_conversation
+import asyncio
+import time
+import os
+
+
+SESSION_IDLE_TTL = int(os.getenv("INTERVIEW_SESSION_IDLE_TTL", 300))
+REPLAY_BUFFER_SIZE = int(os.getenv("INTERVIEW_SESSION_REPLAY_BUFFER", 16))
+
+
+class InterviewSession:
+    """
+    In-memory state of one live interview, loaded from Mongo once and kept for the
+    life of the WebSocket connection (and a short grace period so clients can resume).
+
+    Every outbound message gets a monotonically increasing `seq`; the last
+    REPLAY_BUFFER_SIZE messages are kept so a reconnecting client can replay what it missed.
+    """
+
+    def __init__(self, interview_id: str, interview_info: dict, conversation: list):
+        self.interview_id = interview_id
+        self.interview_info = interview_info
+        self.conversation = conversation
+        self.questions = [
+            c["text"] for c in conversation
+            if c.get("sender") == "ai" and not c.get("is_first_message")
+        ]
+        self.question_count = len(self.questions)
+        self.question_limit = question_limit(interview_info)
+        self.finished = self.question_count > self.question_limit or interview_info.get("completion") == "completed"
+        self.timer = timer_buffer.latest(interview_id, interview_info.get("interview_timer", 0))
+        self.seq = 0
+        self.outbox = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self.lock = asyncio.Lock()
+        self.turn_task = None
+        self.websocket = None
+        self.last_seen = time.monotonic()
+
+    @property
+    def turn_running(self) -> bool:
+        return self.turn_task is not None and not self.turn_task.done()
+
+    def graph_state(self) -> dict:
+        """The interview state `advance_interview` starts a turn from, without reloading the checkpoint."""
+        return {
+            "interview_info": self.interview_info,
+            "questions": list(self.questions),
+            "question_count": self.question_count,
+            "finished": self.finished,
+        }
+
+    def record_completion(self, completion: str):
+        self.interview_info = {**self.interview_info, "completion": completion}
+        if completion == "completed":
+            self.finished = True
+
+    async def push(self, payload: dict):
+        self.seq += 1
+        message = {"seq": self.seq, **payload}
+        self.outbox.append(message)
+        if self.websocket is not None:
+            try:
+                await self.websocket.send_json(message)
+            except Exception:
+                # The client dropped mid-send; the message stays in the outbox for resume.
+                self.websocket = None
+
+    async def replay(self, last_seq: int) -> bool:
+        """
+        Resend every buffered message newer than `last_seq`.
+        Returns False when the gap is older than the buffer and a full snapshot is needed instead.
+        """
+        if last_seq > self.seq:
+            # The client saw a session this process no longer holds (e.g. after a restart).
+            return False
+        if self.outbox and self.outbox[0]["seq"] > last_seq + 1:
+            return False
+        for message in list(self.outbox):
+            if message["seq"] > last_seq:
+                await self.websocket.send_json(message)
+        return True
+
+    def record_message(self, document: dict, finished: bool = False):
+        """Track a newly saved conversation turn; audio is not retained in memory."""
+        entry = {k: v for k, v in document.items() if k != "text_audio"}
+        if self.conversation and "_id" in entry and self.conversation[-1].get("_id") == entry["_id"]:
+            # A retried answer was upserted over the previous attempt.
+            self.conversation[-1] = entry
+            return
+        self.conversation.append(entry)
+        if document.get("sender") != "ai":
+            return
+        if finished:
+            self.finished = True
+        else:
+            self.questions.append(document["text"])
+            self.question_count += 1
+
+
+_sessions: Dict[str, InterviewSession] = {}
+
+
+def _evict_idle_sessions():
+    now = time.monotonic()
+    for interview_id, session in list(_sessions.items()):
+        if session.websocket is None and not session.turn_running and now - session.last_seen > SESSION_IDLE_TTL:
+            del _sessions[interview_id]
+
+
+async def open_session(db, interview_id: str) -> Optional[InterviewSession]:
+    """Return the cached session for this interview, loading it from Mongo only if none is alive."""
+    _evict_idle_sessions()
+
+    session = _sessions.get(interview_id)
+    if session is not None:
+        return session
+
+    interview_info = await interview_cache.get(db, interview_id)
+    if not interview_info:
+        return None
+
+    conversation = await load_conversation(db, interview_id, projection={"text_audio": 0})
+
+    session = InterviewSession(interview_id, interview_info, conversation)
+    _sessions[interview_id] = session
+    return session
+
+
+def attach(session: InterviewSession, websocket):
+    session.websocket = websocket
+    session.last_seen = time.monotonic()
+
+
+def detach(session: InterviewSession, websocket):
+    if session.websocket is websocket:
+        session.websocket = None
+    session.last_seen = time.monotonic()
@@ -0,0 +1,154 @@
+from app.langgraph_agents.create_questions import generate_ai_response
+from app.langgraph_agents.last_ai_text import interview_finished_message
+from app.services.interview_cache import interview_cache
+from app.services.question_similarity import extract_question, QuestionIndex, question_index, similarity_stats
+from app.services.question_bank import draw_question
+from app.services.conversation_memory import schedule_summary_update
+from app.services.conversation_archive import load_conversation
+from app.services.report_pipeline import trigger_report_pipeline
+from bson import ObjectId
+from pymongo import ReturnDocument
+from typing import Optional
+import os
+from datetime import datetime
+
+
+DEFAULT_QUESTION_LIMIT = int(os.getenv("INTERVIEW_QUESTION_LIMIT", 10))
+MAX_QUESTION_LIMIT = int(os.getenv("MAX_INTERVIEW_QUESTION_LIMIT", 50))
+MAX_QUESTION_REGENERATIONS = int(os.getenv("MAX_QUESTION_REGENERATIONS", 2))
+
+# Served only when OpenAI is unavailable and the question bank has nothing left for this interview.
+FALLBACK_QUESTIONS = [
+    "Could you walk me through a recent project you worked on and the part you are most proud of?",
+    "Tell me about a difficult problem you solved recently. How did you approach it?",
+    "How do you keep your skills up to date in your field?",
+    "Describe a time you had to make a decision with incomplete information. What did you do?",
+    "What would you improve about the way your last team worked, and why?",
+    "How do you make sure the quality of your work holds up under a tight deadline?",
+    "Tell me about a time you received critical feedback. How did you respond?",
+    "Which tool or technique has made the biggest difference to your productivity, and why?",
+]
+
+INTERVIEW_INFO_FIELDS = ("_id", "domain", "experience", "interview_type", "difficulty", "mode", "completion", "user_id", "question_limit")
+
+
+def fallback_question(all_questions: list) -> Optional[str]:
+    asked = {extract_question(q) for q in all_questions}
+    for question in FALLBACK_QUESTIONS:
+        if extract_question(question) not in asked:
+            return question
+    return None
+
+
+def question_limit(interview_info: dict) -> int:
+    """Number of questions before the farewell; interviews created before it was configurable use the default."""
+    return interview_info.get("question_limit") or DEFAULT_QUESTION_LIMIT
+
+
+async def load_interview_info(db, interview_id: str):
+    interview = await interview_cache.get(db, interview_id)
+    if not interview:
+        return None
+    return {key: interview[key] for key in INTERVIEW_INFO_FIELDS if key in interview}
+
+
+async def load_asked_questions(db, interview_id: str) -> list:
+    """
+    Read only the text of AI questions asked so far (greeting excluded).
+    Uses a projected query so neither audio payloads nor user answers leave Mongo.
+    """
+    asked = await load_conversation(db, interview_id, {"sender": "ai", "is_first_message": False}, {"_id": 0, "text": 1})
+    return [doc["text"] for doc in asked]
+
+
+async def next_ai_text(interview_info: dict, all_questions: list, question_count: int):
+    """
+    Produce the next AI turn for an interview.
+    Returns `(text, finished, text_audio)`; once `question_count` reaches the interview's question limit
+    the farewell message is returned. `text_audio` is only set when the question came pre-rendered from the
+    question bank; otherwise the caller synthesises speech.
+
+    A generated question that is a near-duplicate of one already asked is rejected and regenerated
+    (up to MAX_QUESTION_REGENERATIONS times) before any TTS work happens. When generation times out
+    or OpenAI's circuit is open, a generic FALLBACK_QUESTIONS entry keeps the interview moving.
+    """
+    if question_count >= question_limit(interview_info):
+        return await interview_finished_message(), True, None
+
+    banked = await draw_question(interview_info, list(all_questions))
+    if banked:
+        return banked[0], False, banked[1]
+
+    interview_id = interview_info.get("_id")
+    index = question_index(interview_id, list(all_questions)) if interview_id else QuestionIndex(list(all_questions))
+
+    history = list(all_questions)
+    for attempt in range(MAX_QUESTION_REGENERATIONS + 1):
+        try:
+            ai_response = await generate_ai_response(interview_info, history)
+        except Exception as e:
+            fallback = fallback_question(all_questions)
+            if fallback is None:
+                raise
+            print(f"⚠️ Question generation unavailable, serving a fallback question: {str(e)}")
+            return fallback, False, None
+        if not index.is_duplicate(ai_response):
+            break
+        if attempt < MAX_QUESTION_REGENERATIONS:
+            similarity_stats["regenerations"] += 1
+            # Show the rejected question as already asked so the retry moves to a new topic.
+            history.append(ai_response)
+    return ai_response, False, None
+
+
+async def save_user_answer(db, interview_id: str, sender: str, text: str, extra: Optional[dict] = None, turn: Optional[int] = None) -> dict:
+    """
+    Store a candidate answer. With `turn` (the number of questions asked before it) the write is an
+    upsert on (interview_id, turn), so retrying a turn whose question generation failed replaces
+    the earlier answer instead of adding a second one.
+    """
+    document = {
+        "interview_id": interview_id,
+        "is_first_message": False,
+        "sender": sender,
+        "text": text,
+        **(extra or {}),
+        "created_at": datetime.now(),
+        "updated_at": datetime.now()
+    }
+    if turn is None:
+        result = await db.interview_conversations.insert_one(document)
+        document["_id"] = result.inserted_id
+    else:
+        created_at = document.pop("created_at")
+        document = await db.interview_conversations.find_one_and_update(
+            {"interview_id": interview_id, "turn": turn},
+            {"$set": {k: v for k, v in document.items() if k != "interview_id"}, "$setOnInsert": {"created_at": created_at}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    schedule_summary_update(db, interview_id)
+    return document
+
+
+async def save_ai_turn(db, interview_id: str, text: str, text_audio: dict, finished: bool) -> dict:
+    document = {
+        "interview_id": interview_id,
+        "is_first_message": False,
+        "sender": "ai",
+        "text": text,
+        "text_audio": text_audio,
+        "created_at": datetime.now(),
+        "updated_at": datetime.now()
+    }
+    result = await db.interview_conversations.insert_one(document)
+    document["_id"] = result.inserted_id
+
+    if finished:
+        await db.interviews.find_one_and_update({"_id": ObjectId(interview_id)}, {"$set": {"completion": "completed"}})
+        interview_cache.invalidate(interview_id)
+        # Start the report now; the job id dedupes this with the trigger in log-interview-timer,
+        # which flags a rerun if the final timer it writes differs from the one used here.
+        await trigger_report_pipeline(db, interview_id)
+
+    return document
@@ -0,0 +1,274 @@
+from pymongo import ReturnDocument
+from app.db.db import get_database
+from app.services.admission import admission, AdmissionRejected
+from app.services.resilience import clear_deadline
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import random
+import socket
+import uuid
+import os
+
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 120))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 4))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", 5))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 2))
+JOB_SWEEP_INTERVAL = float(os.getenv("JOB_SWEEP_INTERVAL", 60))
+JOB_SWEEP_LOOKBACK_HOURS = int(os.getenv("JOB_SWEEP_LOOKBACK_HOURS", 24))
+
+ACTIVE_STATUSES = ("queued", "running")
+JOB_PUBLIC_FIELDS = ("_id", "kind", "interview_id", "status", "stage", "attempts", "error", "result", "partial", "version", "created_at", "updated_at", "finished_at")
+
+
+class LeaseLost(Exception):
+    """The job's lease was taken over (or the job deleted) while its handler ran."""
+
+
+def job_id(kind: str, scope_id: str) -> str:
+    """Idempotent job key: one job of each kind per interview (or per user, for account-level jobs)."""
+    return f"{kind}:{scope_id}"
+
+
+def serialize_job(job: Optional[dict]) -> Optional[dict]:
+    if not job:
+        return None
+    return {
+        key: job[key].isoformat() if isinstance(job.get(key), datetime) else job.get(key)
+        for key in JOB_PUBLIC_FIELDS
+        if key in job
+    }
+
+
+class JobQueue:
+    """
+    Mongo-backed queue (`jobs` collection) drained by an in-process pool of async workers.
+
+    A worker claims a job by atomically moving it to `running` with a lease that it keeps
+    renewing while the handler runs; a job whose lease lapses (e.g. the process died) is
+    claimed again by any worker. Failures are retried with exponential backoff up to
+    JOB_MAX_ATTEMPTS. Job ids are `<kind>:<interview_id>`, so enqueueing twice attaches to
+    the same job, and a job is only reset when its input `version` changes or it failed.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, Callable[..., Awaitable[Optional[dict]]]] = {}
+        self.sweepers = []
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+        self.stats = {"enqueued": 0, "attached": 0, "succeeded": 0, "retried": 0, "failed": 0, "lease_recoveries": 0, "leases_lost": 0}
+
+    def register(self, kind: str, handler: Callable[..., Awaitable[Optional[dict]]]):
+        """
+        `handler(db, job, progress)` does the work. `await progress(stage)` records a stage name;
+        `await progress(stage, partial={...})` also publishes intermediate results on the job.
+        """
+        self.handlers[kind] = handler
+
+    def register_sweeper(self, sweeper: Callable[..., Awaitable[None]]):
+        """`sweeper(db)` runs every JOB_SWEEP_INTERVAL to enqueue work nobody asked for yet."""
+        self.sweepers.append(sweeper)
+
+    async def enqueue(self, db, kind: str, interview_id: Optional[str], user_id: Optional[str] = None, version=None, payload: Optional[dict] = None, attach_in_flight: bool = False) -> dict:
+        """
+        Queue (or attach to) the `kind` job of an interview; with `interview_id=None` the job is scoped to `user_id`.
+        With `attach_in_flight`, a queued or running job is joined whatever its version instead of being flagged to rerun.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        now = datetime.now()
+        fresh = {
+            "status": "queued",
+            "stage": "queued",
+            "version": version,
+            "payload": payload or {},
+            "attempts": 0,
+            "run_after": now,
+            "error": None,
+            "result": None,
+            "partial": {},
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "finished_at": None,
+            "updated_at": now,
+        }
+        key = job_id(kind, interview_id or user_id)
+        inserted = await db.jobs.update_one(
+            {"_id": key},
+            {"$setOnInsert": {"kind": kind, "interview_id": interview_id, "user_id": user_id, "created_at": now, **fresh}},
+            upsert=True,
+        )
+        job = await db.jobs.find_one({"_id": key})
+        in_flight = attach_in_flight and job["status"] in ("queued", "running")
+        if inserted.upserted_id is None and (in_flight or (job.get("version") == version and job["status"] != "failed")):
+            self.stats["attached"] += 1
+            return job
+
+        if inserted.upserted_id is None:
+            # Failed, or built from an older version of the interview: run it again. A job that is
+            # still running is flagged and requeued by its worker when it finishes.
+            job = await db.jobs.find_one_and_update(
+                {"_id": key, "status": "running"},
+                {"$set": {"version": version, "payload": payload or {}, "rerun": True}},
+                return_document=ReturnDocument.AFTER,
+            ) or await db.jobs.find_one_and_update(
+                {"_id": key, "status": {"$ne": "running"}},
+                {"$set": fresh},
+                return_document=ReturnDocument.AFTER,
+            ) or job
+
+        self.stats["enqueued"] += 1
+        self._wakeup.set()
+        return job
+
+    async def get(self, db, key: str) -> Optional[dict]:
+        return await db.jobs.find_one({"_id": key})
+
+    async def _claim(self, db) -> Optional[dict]:
+        now = datetime.now()
+        job = await db.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_after": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "lease_owner": self.owner,
+                    "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                    "updated_at": now,
+                    "rerun": False,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_after", 1)],
+            return_document=ReturnDocument.BEFORE,
+        )
+        if job is None:
+            return None
+        if job["status"] == "running":
+            # The previous holder's lease lapsed without finishing (crash or restart).
+            self.stats["lease_recoveries"] += 1
+        job.update(status="running", lease_owner=self.owner, attempts=job.get("attempts", 0) + 1)
+        return job
+
+    async def _heartbeat(self, db, job: dict, work: asyncio.Task) -> bool:
+        """Renew the lease while `work` runs; if the renewal matches nothing, cancel `work` and return True."""
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            renewed = await db.jobs.update_one(
+                {"_id": job["_id"], "lease_owner": self.owner, "status": "running"},
+                {"$set": {"lease_expires_at": datetime.now() + timedelta(seconds=JOB_LEASE_SECONDS)}}
+            )
+            if not renewed.matched_count:
+                work.cancel()
+                return True
+
+    async def _finish(self, db, job: dict, update: dict):
+        # Only the current lease holder may finish the job. If an enqueue asked for a rerun while
+        # it ran, it goes back to the queue instead of being marked done.
+        current = await db.jobs.find_one({"_id": job["_id"], "lease_owner": self.owner}, {"rerun": 1})
+        if current is None:
+            return
+        if current.get("rerun"):
+            update = {"status": "queued", "stage": "queued", "attempts": 0, "result": None, "partial": {}, "run_after": datetime.now()}
+            self._wakeup.set()
+        await db.jobs.update_one(
+            {"_id": job["_id"], "lease_owner": self.owner},
+            {"$set": {**update, "lease_owner": None, "lease_expires_at": None, "updated_at": datetime.now()}}
+        )
+
+    async def _run(self, db, job: dict):
+        async def progress(stage: str, partial: Optional[dict] = None):
+            update = {"stage": stage, "updated_at": datetime.now()}
+            for key, value in (partial or {}).items():
+                update[f"partial.{key}"] = value
+            updated = await db.jobs.update_one({"_id": job["_id"], "lease_owner": self.owner, "status": "running"}, {"$set": update})
+            if not updated.matched_count:
+                raise LeaseLost(job["_id"])
+
+        async def work():
+            async with admission.slot("report", f"job:{job['_id']}"):
+                return await self.handlers[job["kind"]](db, job, progress)
+
+        # Once the lease is lost another worker owns the job (or it was deleted), so the handler is
+        # stopped rather than left running in duplicate: at its next progress() call or heartbeat.
+        task = asyncio.create_task(work())
+        heartbeat = asyncio.create_task(self._heartbeat(db, job, task))
+        try:
+            result = await task
+        except (LeaseLost, asyncio.CancelledError) as e:
+            lost = isinstance(e, LeaseLost) or (heartbeat.done() and not heartbeat.cancelled() and heartbeat.result())
+            if not lost:
+                raise
+            self.stats["leases_lost"] += 1
+            print(f"⚠️ Job {job['_id']} lost its lease; stopped this run.")
+            return
+        except AdmissionRejected:
+            # Busy with live turns; try again shortly without spending an attempt.
+            await self._finish(db, job, {"status": "queued", "attempts": job["attempts"] - 1, "run_after": datetime.now() + timedelta(seconds=JOB_POLL_INTERVAL)})
+            return
+        except Exception as e:
+            if job["attempts"] < JOB_MAX_ATTEMPTS:
+                delay = JOB_BACKOFF_BASE * 2 ** (job["attempts"] - 1) * random.uniform(0.8, 1.2)
+                self.stats["retried"] += 1
+                await self._finish(db, job, {"status": "queued", "stage": "retrying", "error": str(e), "partial": {}, "run_after": datetime.now() + timedelta(seconds=delay)})
+            else:
+                self.stats["failed"] += 1
+                await self._finish(db, job, {"status": "failed", "stage": "failed", "error": str(e), "finished_at": datetime.now()})
+            print(f"⚠️ Job {job['_id']} attempt {job['attempts']} failed: {str(e)}")
+            return
+        finally:
+            heartbeat.cancel()
+
+        self.stats["succeeded"] += 1
+        await self._finish(db, job, {"status": "succeeded", "stage": "done", "error": None, "result": result, "finished_at": datetime.now()})
+
+    async def _worker(self):
+        clear_deadline()
+        while True:
+            try:
+                db = get_database()
+                job = await self._claim(db)
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run(db, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Job worker error: {str(e)}")
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(JOB_SWEEP_INTERVAL)
+            for sweeper in self.sweepers:
+                try:
+                    await sweeper(get_database())
+                except Exception as e:
+                    print(f"⚠️ Job sweeper error: {str(e)}")
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+job_queue = JobQueue()
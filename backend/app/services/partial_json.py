@@ -0,0 +1,90 @@
+import json
+from typing import List, Tuple
+
+
+class JSONSectionStream:
+    """
+    Incremental parser for a streamed JSON object (e.g. LLM tokens).
+
+    `feed(chunk)` returns the `(key, value)` pairs of the top-level object whose values were
+    completed by that chunk, in order. Anything before the opening `{` (such as a ```json fence)
+    and after the closing `}` is ignored. Only the unconsumed tail of the text is rescanned.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.closed = False
+        self.segment_start = None
+        self.key = None
+        self.value_start = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        self.text += chunk
+        sections = []
+        while self.pos < len(self.text) and not self.closed:
+            char = self.text[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                if self.started:
+                    self.in_string = True
+            elif char in "{[":
+                if not self.started and char == "{":
+                    self.started = True
+                    self.segment_start = self.pos + 1
+                self.depth += 1 if self.started else 0
+            elif char in "}]" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    self._flush(self.pos, sections)
+                    self.closed = True
+            elif self.depth == 1 and char == ":" and self.value_start is None:
+                self.key = self.text[self.segment_start:self.pos].strip().strip('"')
+                self.value_start = self.pos + 1
+            elif self.depth == 1 and char == ",":
+                self._flush(self.pos, sections)
+                self.segment_start = self.pos + 1
+            self.pos += 1
+        return sections
+
+    def _flush(self, end: int, sections: list):
+        if self.value_start is None:
+            return
+        raw = self.text[self.value_start:end].strip()
+        self.value_start = None
+        try:
+            sections.append((self.key, json.loads(raw)))
+        except json.JSONDecodeError:
+            # Malformed section; the full report is still parsed (or rejected) at the end.
+            pass
+
+
+def parse_json_array(text: str) -> list:
+    """The JSON array in a model reply, tolerating fences, surrounding prose or a wrapping object; [] if there is none."""
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("["), text.rfind("]")
+        try:
+            parsed = json.loads(text[start:end + 1]) if 0 <= start < end else None
+        except json.JSONDecodeError:
+            parsed = None
+    if isinstance(parsed, dict):
+        parsed = next((value for value in parsed.values() if isinstance(value, list)), [parsed])
+    if not isinstance(parsed, list):
+        print(f"⚠️ Model reply was not a JSON array; skipped: {text[:200]}")
+        return []
+    return parsed
@@ -0,0 +1,209 @@
+from typing import List, Optional, Tuple
+from app.db.db import get_database
+from app.langgraph_agents.create_questions import generate_ai_response
+from app.services.speech import generate_speech
+from app.services.audio_codec import encode_pcm16, decode_to_pcm16, TTS_AUDIO_FORMAT
+from app.services.resilience import clear_deadline
+from app.services.admission import admission, AdmissionRejected
+from app.services.question_similarity import DUPLICATE_THRESHOLD, QuestionIndex, extract_question, question_index
+from datetime import datetime
+import asyncio
+import random
+import re
+import os
+
+
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "true").lower() in ("1", "true", "yes")
+# A combination gets a bank once this many interviews have used it; rarer ones stay on the live agent.
+QUESTION_BANK_MIN_INTERVIEWS = int(os.getenv("QUESTION_BANK_MIN_INTERVIEWS", 3))
+QUESTION_BANK_TARGET_SIZE = int(os.getenv("QUESTION_BANK_TARGET_SIZE", 40))
+# Refill when fewer than this many banked questions remain unseen by the current interview.
+QUESTION_BANK_LOW_WATER = int(os.getenv("QUESTION_BANK_LOW_WATER", 15))
+QUESTION_BANK_REFILL_BATCH = int(os.getenv("QUESTION_BANK_REFILL_BATCH", 10))
+
+ACKNOWLEDGMENTS = (
+    "Thanks for answering the previous question! Now let's move on to the next one.",
+    "Thank you for that answer. Let's continue with the next question.",
+    "Great, thanks for sharing. Here's the next question.",
+    "Thanks for your response! Let's move ahead.",
+)
+
+bank_stats = {"served": 0, "live_fallbacks": 0, "refills": 0, "questions_added": 0, "rejected": 0}
+
+_acknowledgment_audio = {}
+_refills_in_flight = set()
+_background_tasks = set()
+
+
+def experience_band(experience: str) -> str:
+    match = re.search(r"\d+", str(experience or ""))
+    years = int(match.group()) if match else 0
+    if years <= 1:
+        return "0-1"
+    if years <= 4:
+        return "2-4"
+    if years <= 9:
+        return "5-9"
+    return "10+"
+
+
+def bank_key(interview_info: dict) -> dict:
+    return {
+        "domain": " ".join(str(interview_info.get("domain", "")).lower().split()),
+        "interview_type": str(interview_info.get("interview_type", "")).lower().strip(),
+        "difficulty": str(interview_info.get("difficulty", "")).lower().strip(),
+        "experience": experience_band(interview_info.get("experience")),
+    }
+
+
+def _key_id(key: dict) -> str:
+    return "|".join(key[field] for field in ("domain", "interview_type", "difficulty", "experience"))
+
+
+def _vet(question: str) -> Optional[str]:
+    """Banked questions are stored bare (no acknowledgment) and must read as a single question."""
+    question = extract_question(question).strip().strip("'\"")
+    if not question.endswith("?") or not 20 <= len(question) <= 400:
+        return None
+    return question[0].upper() + question[1:]
+
+
+async def _acknowledgment_audio_for(phrase: str) -> dict:
+    audio = _acknowledgment_audio.get(phrase)
+    if audio is None:
+        audio = await generate_speech(phrase, TTS_AUDIO_FORMAT)
+        _acknowledgment_audio[phrase] = audio
+    return audio
+
+
+def _join_audio(first: dict, second: dict) -> dict:
+    first_pcm, sample_rate = decode_to_pcm16(first)
+    second_pcm, second_rate = decode_to_pcm16(second)
+    if sample_rate != second_rate:
+        raise ValueError("Cannot join audio clips with different sample rates.")
+    gap = bytes(int(sample_rate * 0.15) * 2)
+    return encode_pcm16(first_pcm + gap + second_pcm, sample_rate, TTS_AUDIO_FORMAT)
+
+
+async def note_interview(db, interview_info: dict):
+    """Count interviews per combination so popular ones can be banked."""
+    key = bank_key(interview_info)
+    await db.question_bank_keys.update_one(
+        {"_id": _key_id(key)},
+        {"$set": {"key": key, "last_used": datetime.utcnow()}, "$inc": {"interviews": 1}},
+        upsert=True
+    )
+
+
+async def draw_question(interview_info: dict, all_questions: List[str]) -> Optional[Tuple[str, dict]]:
+    """
+    Sample a banked question this interview hasn't been asked (exact or near-duplicate)
+    and return `(text, text_audio)`, or None to fall back to the live agent.
+    Triggers a background refill when the unseen pool runs low.
+    """
+    if not QUESTION_BANK_ENABLED:
+        return None
+
+    db = get_database()
+    key = bank_key(interview_info)
+    key_id = _key_id(key)
+
+    asked = {extract_question(q) for q in all_questions}
+    candidates = await db.question_bank.find(
+        {"key_id": key_id, "question": {"$nin": list(asked)}},
+        {"_id": 1, "question": 1}
+    ).to_list(length=None)
+
+    interview_id = interview_info.get("_id")
+    index = question_index(interview_id, list(all_questions)) if interview_id else QuestionIndex(list(all_questions))
+    candidates = [c for c in candidates if index.max_similarity(c["question"]) < DUPLICATE_THRESHOLD]
+
+    if len(candidates) < QUESTION_BANK_LOW_WATER:
+        stats = await db.question_bank_keys.find_one({"_id": key_id}, {"interviews": 1})
+        if stats and stats.get("interviews", 0) >= QUESTION_BANK_MIN_INTERVIEWS:
+            schedule_refill(key)
+
+    if not candidates:
+        bank_stats["live_fallbacks"] += 1
+        return None
+
+    chosen = random.choice(candidates)
+    banked = await db.question_bank.find_one_and_update(
+        {"_id": chosen["_id"]},
+        {"$inc": {"served": 1}},
+        projection={"question": 1, "text_audio": 1}
+    )
+    if not banked or not banked.get("text_audio"):
+        bank_stats["live_fallbacks"] += 1
+        return None
+
+    text, text_audio = banked["question"], banked["text_audio"]
+    if all_questions:
+        phrase = random.choice(ACKNOWLEDGMENTS)
+        try:
+            text_audio = _join_audio(await _acknowledgment_audio_for(phrase), text_audio)
+            text = f"{phrase} {text}"
+        except Exception:
+            pass
+
+    bank_stats["served"] += 1
+    return text, text_audio
+
+
+async def refill_bank(key: dict, batch: int = QUESTION_BANK_REFILL_BATCH):
+    """Generate, vet, de-duplicate and pre-render up to `batch` new questions for one combination."""
+    db = get_database()
+    key_id = _key_id(key)
+    existing = await db.question_bank.find({"key_id": key_id}, {"_id": 0, "question": 1}).to_list(length=None)
+    if len(existing) >= QUESTION_BANK_TARGET_SIZE:
+        return
+
+    index = QuestionIndex([doc["question"] for doc in existing])
+    interview_info = {"domain": key["domain"], "experience": key["experience"] + " years", "interview_type": key["interview_type"], "difficulty": key["difficulty"]}
+
+    added = 0
+    for _ in range(batch):
+        generated = await generate_ai_response(interview_info, index.questions[-20:], hedge=False)
+        question = _vet(generated or "")
+        if not question or index.is_duplicate(question):
+            bank_stats["rejected"] += 1
+            continue
+
+        text_audio = await generate_speech(question, TTS_AUDIO_FORMAT)
+        await db.question_bank.insert_one({
+            "key_id": key_id,
+            "key": key,
+            "question": question,
+            "text_audio": text_audio,
+            "served": 0,
+            "created_at": datetime.utcnow()
+        })
+        index.add_many([question])
+        added += 1
+
+    bank_stats["refills"] += 1
+    bank_stats["questions_added"] += added
+
+
+def schedule_refill(key: dict):
+    key_id = _key_id(key)
+    if key_id in _refills_in_flight:
+        return
+
+    async def run():
+        clear_deadline()
+        try:
+            async with admission.slot("report", f"bank:{key_id}"):
+                await refill_bank(key)
+        except AdmissionRejected:
+            # Busy; the next draw that finds the pool low schedules another refill.
+            pass
+        except Exception as e:
+            print(f"⚠️ Question bank refill failed for {key_id}: {str(e)}")
+        finally:
+            _refills_in_flight.discard(key_id)
+
+    _refills_in_flight.add(key_id)
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
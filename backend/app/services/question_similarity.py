@@ -0,0 +1,161 @@
+from typing import List, Optional, Tuple
+from cachetools import TTLCache
+import numpy as np
+import zlib
+import re
+import os
+
+
+# Feature entries preallocated per index (a question has a few dozen); grows by doubling.
+INDEX_INITIAL_CAPACITY = 256
+DUPLICATE_THRESHOLD = float(os.getenv("QUESTION_DUPLICATE_THRESHOLD", 0.6))
+TOPIC_TERMS_PER_QUESTION = 5
+
+STOPWORDS = frozenset("""
+a an and are as at be been being but by can could did do does doing for from had has have having how i if in into is it
+its just let lets like me more most move my now of on one or our out over please previous question questions really
+share so some such tell than thanks thank that the their them then there these they this those through to too us
+very was we were what when where which while who why will with would you your answer answering next great let's
+describe explain walk talk give example examples
+""".split())
+
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+similarity_stats = {"checks": 0, "duplicates": 0, "regenerations": 0}
+
+
+def extract_question(text: str) -> str:
+    """Drop the acknowledgment the agent prepends and keep the question sentence(s)."""
+    sentences = [s for s in SENTENCE_BOUNDARY.split(text.strip()) if s]
+    questions = [s for s in sentences if s.endswith("?")]
+    if questions:
+        text = " ".join(questions)
+    elif sentences:
+        text = sentences[-1]
+    # "Now let's move ahead — can you ...?" keeps only the part after the dash
+    return re.split(r"\s[—–-]\s", text)[-1]
+
+
+def _tokens(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+def hashed_features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse feature vector of a question (content words, word bigrams and character trigrams, hashed
+    to 32 bits) with sublinear term frequency: sorted hashes and their L2-normalised weights, so the
+    dot product of two vectors is their cosine similarity.
+    """
+    words = [w for w in _tokens(extract_question(text)) if w not in STOPWORDS]
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    joined = " ".join(words)
+    features += [f"#{joined[i:i + 3]}" for i in range(len(joined) - 2)]
+    if not features:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    hashes = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.int64, count=len(features))
+    keys, inverse = np.unique(hashes, return_inverse=True)
+    weights = np.log1p(np.bincount(inverse).astype(np.float32))
+    return keys, weights / np.linalg.norm(weights)
+
+
+class QuestionIndex:
+    """
+    Sparse vectors of the questions asked in one interview, as flat (row, hash, weight) arrays that
+    grow by doubling; a check is one vectorised sparse dot product against every stored question.
+    """
+
+    def __init__(self, questions: Optional[List[str]] = None):
+        self.questions: List[str] = []
+        self._size = 0
+        self._rows = np.zeros(INDEX_INITIAL_CAPACITY, dtype=np.int32)
+        self._keys = np.zeros(INDEX_INITIAL_CAPACITY, dtype=np.int64)
+        self._weights = np.zeros(INDEX_INITIAL_CAPACITY, dtype=np.float32)
+        if questions:
+            self.add_many(questions)
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= len(self._keys):
+            return
+        capacity = max(needed, 2 * len(self._keys))
+        for name in ("_rows", "_keys", "_weights"):
+            grown = np.zeros(capacity, dtype=getattr(self, name).dtype)
+            grown[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, grown)
+
+    def add_many(self, questions: List[str]):
+        for question in questions:
+            keys, weights = hashed_features(question)
+            self._reserve(len(keys))
+            end = self._size + len(keys)
+            self._rows[self._size:end] = len(self.questions)
+            self._keys[self._size:end] = keys
+            self._weights[self._size:end] = weights
+            self._size = end
+            self.questions.append(question)
+
+    def max_similarity(self, text: str) -> float:
+        keys, weights = hashed_features(text)
+        if not self.questions or not len(keys):
+            return 0.0
+        stored = self._keys[:self._size]
+        positions = np.minimum(np.searchsorted(keys, stored), len(keys) - 1)
+        shared = keys[positions] == stored
+        scores = np.bincount(
+            self._rows[:self._size][shared],
+            weights=self._weights[:self._size][shared] * weights[positions[shared]],
+            minlength=len(self.questions)
+        )
+        return float(scores.max())
+
+    def is_duplicate(self, text: str, threshold: float = DUPLICATE_THRESHOLD) -> bool:
+        similarity_stats["checks"] += 1
+        duplicate = self.max_similarity(text) >= threshold
+        if duplicate:
+            similarity_stats["duplicates"] += 1
+        return duplicate
+
+
+_indexes = TTLCache(maxsize=int(os.getenv("QUESTION_INDEX_CACHE_SIZE", 1024)), ttl=3600)
+
+
+def question_index(interview_id: str, asked: List[str]) -> QuestionIndex:
+    """
+    Per-interview index kept in memory and synced to the authoritative list of asked questions,
+    so only questions added since the last call are vectorised.
+    """
+    index = _indexes.get(interview_id)
+    if index is None or index.questions != asked[:len(index.questions)]:
+        index = QuestionIndex()
+        _indexes[interview_id] = index
+    index.add_many(asked[len(index.questions):])
+    return index
+
+
+def topic_terms(question: str, limit: int = TOPIC_TERMS_PER_QUESTION) -> List[str]:
+    """
+    A question's most salient content words (by frequency, then length), in their original order.
+    Depends only on the question itself, so a summary built from these is append-only across turns.
+    """
+    words = [w for w in _tokens(extract_question(question)) if w not in STOPWORDS and len(w) > 2]
+    if not words:
+        return []
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1
+    ranked = sorted(counts, key=lambda w: (-counts[w], -len(w)))[:limit]
+    seen, ordered = set(), []
+    for word in words:
+        if word in ranked and word not in seen:
+            seen.add(word)
+            ordered.append(word)
+    return ordered
+
+
+def topic_summary(questions: List[str]) -> str:
+    """One compact line of topic terms per asked question, e.g. `3. virtual dom react reconciliation`."""
+    if not questions:
+        return "None"
+    return "\n".join(f"{i}. {' '.join(topic_terms(q)) or extract_question(q)[:60]}" for i, q in enumerate(questions, 1))
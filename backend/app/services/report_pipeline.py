@@ -0,0 +1,64 @@
+from app.services.interview_cache import interview_cache
+from app.services.timer_buffer import timer_buffer
+from app.services.job_queue import job_queue
+from bson import ObjectId
+from datetime import datetime
+import os
+
+
+REPORTS_DIR = os.path.join(os.getcwd(), "generated_reports")
+
+
+# "Ready on first view": whether the report / breakdown was already computed the first time
+# the user opened it. Misses are split by whether the pipeline had at least started.
+pipeline_stats = {
+    "triggered": 0,
+    "trigger_failures": 0,
+    "report": {"first_view_hits": 0, "first_view_misses": 0, "first_view_in_progress": 0},
+    "breakdown": {"first_view_hits": 0, "first_view_misses": 0, "first_view_in_progress": 0},
+}
+
+
+def report_pdf_path(interview_id: str) -> str:
+    """Where the rendered PDF report of an interview is cached on disk."""
+    return os.path.join(REPORTS_DIR, f"interview_report_{interview_id}.pdf")
+
+
+async def trigger_report_pipeline(db, interview_id: str):
+    """
+    Start the report chain once an interview has ended: the report job, which on success queues
+    the breakdown and the PDF (see `report_job`). Called when the farewell is saved and again when
+    the final timer is logged; the second call only reruns the job if the timer (its version)
+    changed. Never raises; the sweeper catches anything missed here.
+    """
+    try:
+        interview = await interview_cache.get(db, interview_id)
+        if not interview:
+            return
+        version = timer_buffer.latest(interview_id, interview.get("interview_timer", 0))
+        await job_queue.enqueue(db, "report", interview_id, interview.get("user_id"), version=version)
+        pipeline_stats["triggered"] += 1
+    except Exception as e:
+        pipeline_stats["trigger_failures"] += 1
+        print(f"⚠️ Report pipeline trigger failed for {interview_id}: {str(e)}")
+
+
+async def record_first_view(db, interview_id: str, kind: str, ready: bool, job: dict = None):
+    """
+    Count a hit or miss the first time `kind` ("report" or "breakdown") is requested for an
+    interview. `job` is the job as it was before this request enqueued anything.
+    """
+    first = await db.interviews.update_one(
+        {"_id": ObjectId(interview_id), f"first_viewed.{kind}": {"$exists": False}},
+        {"$set": {f"first_viewed.{kind}": {"at": datetime.now().isoformat(), "ready": ready}}}
+    )
+    if not first.modified_count:
+        return
+
+    stats = pipeline_stats[kind]
+    if ready:
+        stats["first_view_hits"] += 1
+    elif job and job.get("status") in ("queued", "running"):
+        stats["first_view_in_progress"] += 1
+    else:
+        stats["first_view_misses"] += 1
@@ -0,0 +1,244 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import deque
+from typing import Awaitable, Callable, Optional
+import asyncio
+import httpx
+import openai
+import time
+import os
+
+
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", 4))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", 0.5))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", 30))
+# A timeout only counts against the provider if the call had at least this long (or its own full
+# `timeout`); running out of a nearly spent request deadline says nothing about the provider.
+BREAKER_MIN_TIMEOUT_BUDGET = float(os.getenv("BREAKER_MIN_TIMEOUT_BUDGET", 5))
+INTERVIEW_TURN_DEADLINE = float(os.getenv("INTERVIEW_TURN_DEADLINE", 25))
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+resilience_stats = {"calls": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "failures": 0, "rejected": 0, "short_circuits": 0, "fallbacks": 0}
+
+_TRANSPORT_ERRORS = (ConnectionError, httpx.TransportError, openai.APIConnectionError)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open and no fallback was given."""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Bound every provider call made inside this block (including tasks it spawns) to finish
+    within `seconds` from now. Nested deadlines can only shorten the outer one.
+    """
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(min(expires, current) if current else expires)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+async def turn_deadline():
+    """Route dependency: bound a live interview turn's provider calls by INTERVIEW_TURN_DEADLINE."""
+    with deadline(INTERVIEW_TURN_DEADLINE):
+        yield
+
+
+def clear_deadline():
+    """Detach a background task from the deadline of the request that spawned it."""
+    _deadline.set(None)
+
+
+def remaining_time() -> Optional[float]:
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and short-circuits calls for
+    `reset_timeout` seconds; then lets one trial call through (half-open) before closing again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_ignored(self):
+        """The call failed for a reason that isn't the provider's (e.g. a rejected request); free the trial slot."""
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+# TTS and transcription are separate Gemini endpoints with separate failure modes, so one
+# being down (or fed bad uploads) must not short-circuit the other.
+breakers = {name: CircuitBreaker(name) for name in ("openai", "gemini_tts", "gemini_transcription")}
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """5xx responses and connection errors are the provider's fault; 4xx (bad input, rate limits) are not."""
+    status = getattr(error, "status_code", None)
+    if status is None and isinstance(getattr(error, "code", None), int):
+        status = error.code
+    if isinstance(status, int):
+        return status >= 500
+    return isinstance(error, _TRANSPORT_ERRORS)
+
+_latencies = {}
+
+
+def hedge_delay(name: str) -> float:
+    """Launch the hedge once the first attempt is slower than this call's recent p95."""
+    samples = _latencies.get(name)
+    if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    ordered = sorted(samples)
+    return max(HEDGE_MIN_DELAY, ordered[int(0.95 * (len(ordered) - 1))])
+
+
+def _discard(task: asyncio.Future):
+    """Cancel an attempt nobody waits for any more and swallow its outcome."""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def _hedged(name: str, make_call: Callable[[], Awaitable]):
+    # Every attempt still running when this returns or is cancelled (e.g. by the deadline's
+    # wait_for) is cancelled, so no orphaned request keeps hitting the provider.
+    attempts = [asyncio.ensure_future(make_call())]
+    first = attempts[0]
+    try:
+        done, _ = await asyncio.wait({first}, timeout=hedge_delay(name))
+        if done:
+            return first.result()
+
+        resilience_stats["hedges"] += 1
+        second = asyncio.ensure_future(make_call())
+        attempts.append(second)
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        resilience_stats["hedge_wins"] += 1
+                    return task.result()
+        # Both attempts failed; surface the original error.
+        return first.result()
+    finally:
+        for task in attempts:
+            if not task.done():
+                _discard(task)
+
+
+async def resilient_call(
+    name: str,
+    make_call: Callable[[], Awaitable],
+    provider: str,
+    hedge: bool = False,
+    timeout: Optional[float] = None,
+    fallback: Optional[Callable[[], Awaitable]] = None,
+):
+    """
+    Run a provider call under the current request deadline (and `timeout`, if tighter) and the
+    provider's circuit breaker (see `breakers`). With `hedge`, a duplicate request is sent once the first one is
+    slower than the recent p95 and whichever succeeds first wins. On timeout, failure or an open
+    breaker, `fallback()` is returned when given; otherwise the error propagates. Only provider-side
+    failures (`is_provider_failure`, or a timeout with a real budget) count towards opening the breaker.
+    """
+    breaker = breakers[provider]
+    resilience_stats["calls"] += 1
+
+    if not breaker.allow():
+        resilience_stats["short_circuits"] += 1
+        if fallback:
+            resilience_stats["fallbacks"] += 1
+            return await fallback()
+        raise CircuitOpenError(f"{provider} is unavailable, please try again shortly.")
+
+    budget = remaining_time()
+    if timeout is not None:
+        budget = timeout if budget is None else min(budget, timeout)
+
+    if budget is not None and budget <= 0:
+        # The request ran out of time before reaching the provider; not the provider's fault.
+        resilience_stats["timeouts"] += 1
+        breaker.record_ignored()
+        if fallback:
+            resilience_stats["fallbacks"] += 1
+            return await fallback()
+        raise asyncio.TimeoutError(f"Deadline exceeded before calling {provider}.")
+
+    full_budget = budget is None or budget >= BREAKER_MIN_TIMEOUT_BUDGET or (timeout is not None and budget >= timeout)
+    started = time.perf_counter()
+    try:
+        call = _hedged(name, make_call) if hedge else make_call()
+        result = await asyncio.wait_for(call, budget)
+    except Exception as e:
+        if isinstance(e, asyncio.TimeoutError):
+            resilience_stats["timeouts"] += 1
+            provider_failure = full_budget
+        else:
+            provider_failure = is_provider_failure(e)
+            resilience_stats["failures" if provider_failure else "rejected"] += 1
+        if provider_failure:
+            breaker.record_failure()
+        else:
+            breaker.record_ignored()
+        if fallback:
+            resilience_stats["fallbacks"] += 1
+            return await fallback()
+        raise
+
+    breaker.record_success()
+    _latencies.setdefault(name, deque(maxlen=200)).append(time.perf_counter() - started)
+    return result
+
+
+def resilience_snapshot() -> dict:
+    return {
+        **resilience_stats,
+        "breakers": {name: breaker.stats() for name, breaker in breakers.items()},
+        "hedge_delay_s": {name: round(hedge_delay(name), 3) for name in _latencies},
+    }
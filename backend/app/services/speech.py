@@ -0,0 +1,153 @@
+from fastapi import HTTPException
+from google import generativeai as genai
+from app.services.audio_codec import encode_pcm16, TTS_AUDIO_FORMAT
+from app.services.resilience import resilient_call
+from typing import List, Optional
+import asyncio
+import os
+import re
+import base64
+
+
+API_KEY = os.getenv("API_KEY")
+genai.configure(api_key=API_KEY)
+
+TTS_SAMPLE_RATE = 24000
+TTS_CHUNKED = os.getenv("TTS_CHUNKED", "false").lower() in ("1", "true", "yes")
+TTS_MAX_PARALLEL = int(os.getenv("TTS_MAX_PARALLEL", 3))
+TTS_CHUNK_MIN_CHARS = int(os.getenv("TTS_CHUNK_MIN_CHARS", 80))
+# 150 ms of 16-bit mono silence between chunks; kept even so frames stay sample-aligned
+TTS_CHUNK_GAP_BYTES = int(TTS_SAMPLE_RATE * 0.15) * 2
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str, min_chars: int = TTS_CHUNK_MIN_CHARS) -> List[str]:
+    """
+    Split text at sentence boundaries, merging short sentences forward so that
+    every chunk (except possibly the last) has at least `min_chars` characters.
+    """
+    chunks, current = [], ""
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        if not sentence:
+            continue
+        current = f"{current} {sentence}" if current else sentence
+        if len(current) >= min_chars:
+            chunks.append(current)
+            current = ""
+    if current:
+        if chunks and len(current) < min_chars // 2:
+            chunks[-1] = f"{chunks[-1]} {current}"
+        else:
+            chunks.append(current)
+    return chunks
+
+
+async def synthesise_pcm(text: str) -> bytes:
+    """Single Gemini TTS request, bounded by the request deadline; returns raw 16-bit mono PCM at TTS_SAMPLE_RATE."""
+    return await resilient_call("tts", lambda: _synthesise_pcm(text), provider="gemini_tts")
+
+
+async def _synthesise_pcm(text: str) -> bytes:
+    model = genai.GenerativeModel("gemini-2.5-flash-preview-tts")
+
+    prompt = f"""You are conducting a professional job interview. 
+        Speak in a warm, friendly, and encouraging tone. 
+        Maintain a calm, conversational pace with clear pronunciation. 
+        Show genuine interest and create a comfortable atmosphere for the candidate.
+
+        Interview question: {text}"""
+
+
+    response = await model.generate_content_async(
+        prompt,
+        generation_config={
+            "response_modalities": ["AUDIO"],
+            "speech_config": {"voice_config": {"prebuilt_voice_config": {"voice_name": "Gacrux"}}},
+        },
+    )
+
+    pcm_data = (
+        response.candidates[0].content.parts[0].inline_data.data
+        if response.candidates and response.candidates[0].content.parts
+        else None
+    )
+
+    if not pcm_data:
+        raise HTTPException(status_code=500, detail="Failed to generate audio.")
+
+    if isinstance(pcm_data, str):
+        pcm_data = base64.b64decode(pcm_data)
+
+    return pcm_data
+
+
+async def synthesise_pcm_chunked(chunks: List[str]) -> bytearray:
+    """
+    Synthesise sentence chunks concurrently (at most TTS_MAX_PARALLEL in flight) and
+    lay them out in one preallocated buffer, each chunk copied exactly once, with a
+    short zero-filled pause between chunks.
+    """
+    semaphore = asyncio.Semaphore(TTS_MAX_PARALLEL)
+
+    async def bounded(chunk: str) -> bytes:
+        async with semaphore:
+            return await synthesise_pcm(chunk)
+
+    parts = await asyncio.gather(*(bounded(chunk) for chunk in chunks))
+
+    gap = TTS_CHUNK_GAP_BYTES
+    pcm = bytearray(sum(len(part) for part in parts) + gap * (len(parts) - 1))
+    view = memoryview(pcm)
+    offset = 0
+    for part in parts:
+        view[offset:offset + len(part)] = part
+        offset += len(part) + gap
+    return pcm
+
+
+async def generate_speech(text: str, audio_format: Optional[str] = None, chunked: Optional[bool] = None):
+    if not text:
+        raise HTTPException(status_code=400, detail="Text is required.")
+
+    chunked = TTS_CHUNKED if chunked is None else chunked
+    chunks = split_sentences(text) if chunked else [text]
+
+    if len(chunks) > 1:
+        pcm_data = await synthesise_pcm_chunked(chunks)
+    else:
+        pcm_data = await synthesise_pcm(text)
+
+    return encode_pcm16(pcm_data, TTS_SAMPLE_RATE, audio_format or TTS_AUDIO_FORMAT)
+
+
+async def try_generate_speech(text: str, audio_format: Optional[str] = None):
+    """
+    Speech for an interview turn, or None when Gemini is slow or unavailable, so the
+    turn is still saved and delivered as text instead of failing after the question exists.
+    """
+    try:
+        return await generate_speech(text, audio_format)
+    except Exception as e:
+        print(f"⚠️ Speech synthesis unavailable, sending text only: {str(e)}")
+        return None
+
+
+async def transcribe_audio(audio: bytes, mime_type: str) -> str:
+    """Transcribe an in-memory audio answer with Gemini; the bytes are passed through without re-buffering."""
+    model = genai.GenerativeModel("gemini-2.5-flash")
+
+    response = await resilient_call("transcription", lambda: model.generate_content_async([
+        {
+            "role": "user",
+            "parts": [
+                {"mime_type": mime_type, "data": audio},
+                {"text": "Transcribe this user's audio response accurately into text."}
+            ],
+        }
+    ]), provider="gemini_transcription")
+
+    transcript = response.text if hasattr(response, "text") else None
+    if not transcript:
+        raise HTTPException(status_code=500, detail="Failed to transcribe audio.")
+    return transcript
@@ -0,0 +1,101 @@
+from typing import Dict, Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.db.db import get_database
+from app.services.interview_cache import interview_cache
+import asyncio
+import os
+
+
+class TimerWriteBehind:
+    """
+    Write-behind buffer for `interviews.interview_timer`.
+
+    Timer ticks only replace the latest value held for an interview; a background task
+    flushes all pending values with one unordered `bulk_write` every `flush_interval` seconds.
+    Completion changes bypass the buffer and are written immediately together with
+    whatever timer value is pending for that interview. They share the flush lock, so a flush
+    in progress can never land its older timer after the final one.
+    """
+
+    def __init__(self, flush_interval: float = 5.0):
+        self.flush_interval = flush_interval
+        self.pending: Dict[str, int] = {}
+        self.stats = {"recorded": 0, "coalesced": 0, "flushes": 0, "written": 0, "errors": 0}
+        self._task = None
+        self._flush_lock = asyncio.Lock()
+
+    def record(self, interview_id: str, timer: int):
+        if not ObjectId.is_valid(interview_id):
+            raise ValueError("Invalid interview ID.")
+        if interview_id in self.pending:
+            self.stats["coalesced"] += 1
+        self.pending[interview_id] = timer
+        self.stats["recorded"] += 1
+
+    def latest(self, interview_id: str, default: Optional[int] = None) -> Optional[int]:
+        """Read-your-writes view: the buffered timer if one is pending, else `default`."""
+        return self.pending.get(interview_id, default)
+
+    async def write_completion(self, interview_id: str, timer: Optional[int], completion: str):
+        async with self._flush_lock:
+            update_data = {"completion": completion}
+            pending_timer = self.pending.pop(interview_id, None)
+            if timer is not None:
+                update_data["interview_timer"] = timer
+            elif pending_timer is not None:
+                update_data["interview_timer"] = pending_timer
+
+            await get_database().interviews.update_one({"_id": ObjectId(interview_id)}, {"$set": update_data})
+            interview_cache.invalidate(interview_id)
+            self.stats["written"] += 1
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self.pending:
+                return
+
+            batch, self.pending = self.pending, {}
+            try:
+                operations = [
+                    UpdateOne({"_id": ObjectId(interview_id)}, {"$set": {"interview_timer": timer}})
+                    for interview_id, timer in batch.items()
+                ]
+                await get_database().interviews.bulk_write(operations, ordered=False)
+                for interview_id, timer in batch.items():
+                    interview_cache.update(interview_id, {"interview_timer": timer})
+                self.stats["flushes"] += 1
+                self.stats["written"] += len(operations)
+            except Exception as e:
+                self.stats["errors"] += 1
+                # Put failed values back unless a newer tick arrived meanwhile; completions wait for
+                # the lock, so none can have been written in between.
+                for interview_id, timer in batch.items():
+                    if ObjectId.is_valid(interview_id):
+                        self.pending.setdefault(interview_id, timer)
+                print(f"⚠️ Timer flush failed: {str(e)}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Timer flush loop error: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+timer_buffer = TimerWriteBehind(flush_interval=float(os.getenv("TIMER_FLUSH_INTERVAL", 5)))
@@ -0,0 +1,52 @@
+from typing import Optional
+from cachetools import TLRUCache
+import hashlib
+import time
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of access tokens that already passed signature and expiry checks, keyed by the
+    token's SHA-256 (raw tokens are never kept). Each entry holds the decoded claims and the
+    user record, and expires at the token's `exp` or after `user_ttl` seconds, whichever is
+    first, so renamed or deleted users are picked up without a restart. Account changes should
+    also call `invalidate_user`.
+    """
+
+    def __init__(self, maxsize: int = 4096, user_ttl: float = 300):
+        self.user_ttl = user_ttl
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._expires_at, timer=time.time)
+        self.hits = 0
+        self.misses = 0
+
+    def _expires_at(self, _key, entry, now):
+        return min(entry["exp"], now + self.user_ttl)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._cache.get(self._key(token))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, token: str, claims: dict, user: dict):
+        self._cache[self._key(token)] = {"claims": claims, "user": user, "exp": claims.get("exp", time.time() + self.user_ttl)}
+
+    def invalidate_user(self, user_id: str):
+        for key, entry in list(self._cache.items()):
+            if entry["user"]["id"] == user_id:
+                self._cache.pop(key, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
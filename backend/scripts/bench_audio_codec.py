@@ -0,0 +1,35 @@
+"""
+Size and encode/decode latency of each speech format on a synthetic 10 s speech-like signal.
+
+Run from backend/: python -m scripts.bench_audio_codec
+"""
+from app.services.audio_codec import SUPPORTED_AUDIO_FORMATS, encode_pcm16, decode_to_pcm16
+import numpy as np
+import time
+
+
+def synthetic_speech(source_rate: int = 24000, seconds: int = 10) -> bytes:
+    t = np.arange(source_rate * seconds) / source_rate
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+    signal = envelope * (0.4 * np.sin(2 * np.pi * 180 * t) + 0.2 * np.sin(2 * np.pi * 720 * t) + 0.05 * np.random.randn(len(t)))
+    return (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def main(source_rate: int = 24000, runs: int = 20):
+    pcm_bytes = synthetic_speech(source_rate)
+    baseline = None
+    for fmt in SUPPORTED_AUDIO_FORMATS:
+        started = time.perf_counter()
+        for _ in range(runs):
+            result = encode_pcm16(pcm_bytes, source_rate, fmt)
+        encode_ms = (time.perf_counter() - started) * 1000 / runs
+        started = time.perf_counter()
+        for _ in range(runs):
+            decode_to_pcm16(result)
+        decode_ms = (time.perf_counter() - started) * 1000 / runs
+        baseline = baseline or len(result["audio"])
+        print(f"{fmt:6s} base64={len(result['audio']):>8d} B  size={len(result['audio']) / baseline:.2f}x  encode={encode_ms:.1f} ms  decode={decode_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Login throughput under concurrency and how long the event loop stalls meanwhile, then the
+per-request cost of token verification with and without the cache.
+
+Run from backend/: python -m scripts.bench_auth [concurrent_logins]
+"""
+from app.auth_handler import (
+    ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM, PASSWORD_HASH_WORKERS,
+    hash_password, verify_password, verify_password_async, create_access_token, decode_access_token, token_cache
+)
+import asyncio
+import time
+import sys
+import os
+
+PASSWORD = "correct horse battery staple"
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - started - 0.01)
+
+
+async def run(label: str, login, logins: int):
+    stop, lags = asyncio.Event(), []
+    tick = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    print(f"{label:10s} {logins} logins in {elapsed:.2f} s  {logins / elapsed:.1f}/s  max loop stall={1000 * max(lags):.0f} ms")
+
+
+async def login_throughput(logins: int):
+    stored = hash_password(PASSWORD)
+
+    async def on_loop():
+        verify_password(PASSWORD, stored)
+
+    async def offloaded():
+        await verify_password_async(PASSWORD, stored)
+
+    await run("on-loop", on_loop, logins)
+    await run("offloaded", offloaded, logins)
+
+
+def token_overhead(runs: int = 20000):
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    token, _ = create_access_token({"sub": "0" * 24, "email": "bench@example.com"})
+    started = time.perf_counter()
+    for _ in range(runs):
+        decode_access_token(token)
+    verify_us = 1e6 * (time.perf_counter() - started) / runs
+    token_cache.put(token, decode_access_token(token), {"id": "0" * 24, "email": "bench@example.com", "name": "Bench"})
+    started = time.perf_counter()
+    for _ in range(runs):
+        token_cache.get(token)
+    cached_us = 1e6 * (time.perf_counter() - started) / runs
+    print(f"token check: jwt verify={verify_us:.1f} us (+ a users lookup per request)  cached={cached_us:.1f} us")
+
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    print(f"argon2 t={ARGON2_TIME_COST} m={ARGON2_MEMORY_COST} KiB p={ARGON2_PARALLELISM}, {PASSWORD_HASH_WORKERS} hash workers")
+    asyncio.run(login_throughput(logins))
+    token_overhead()
@@ -0,0 +1,37 @@
+"""
+Text-only compression of synthetic interview turns: per-interview frames, with and without a trained dictionary.
+
+Run from backend/: python -m scripts.bench_conversation_archive
+"""
+from app.services.conversation_archive import _train, _pack
+from bson import ObjectId
+from datetime import datetime
+import random
+import bson
+
+QUESTIONS = ["Tell me about a time you handled conflict in a team.", "How would you design a rate limiter for an API?", "Describe a difficult bug you fixed recently."]
+WORDS = ["we", "used", "a", "queue", "retry", "team", "deadline", "redis", "customer", "latency", "migrated", "service"]
+
+
+def synthetic_interview(turns: int = 10) -> list:
+    interview_id = str(ObjectId())
+    return [
+        {"_id": ObjectId(), "interview_id": interview_id, "sender": sender, "is_first_message": False, "created_at": datetime.utcnow(),
+         "text": random.choice(QUESTIONS) if sender == "ai" else " ".join(random.choice(WORDS) for _ in range(60))}
+        for _ in range(turns) for sender in ("ai", "user")
+    ]
+
+
+def main():
+    interviews = [synthetic_interview() for _ in range(200)]
+    dictionary = _train([bson.encode(turn) for turns in interviews[:100] for turn in turns])
+    for label, used in (("no dictionary", None), ("trained dictionary", dictionary)):
+        raw = stored = 0
+        for turns in interviews[100:]:
+            packed = _pack(turns, used)
+            raw, stored = raw + packed["raw_bytes"], stored + packed["stored_bytes"]
+        print(f"{label}: {raw} -> {stored} bytes ({stored / raw:.1%})")
+
+
+if __name__ == "__main__":
+    main()
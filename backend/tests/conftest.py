@@ -0,0 +1,104 @@
+import asyncio
+import os
+import pytest
+from pymongo import ReturnDocument
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int = 0, upserted_id=None):
+        self.matched_count = matched_count
+        self.upserted_id = upserted_id
+
+
+def _matches_value(value, condition) -> bool:
+    if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+        for op, operand in condition.items():
+            if op == "$lt" and not (value is not None and value < operand):
+                return False
+            if op == "$lte" and not (value is not None and value <= operand):
+                return False
+            if op == "$ne" and value == operand:
+                return False
+            if op == "$in" and value not in operand:
+                return False
+        return True
+    return value == condition
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, branch) for branch in condition):
+                return False
+        elif not _matches_value(document.get(key), condition):
+            return False
+    return True
+
+
+def _apply(document: dict, update: dict):
+    for key, value in update.get("$set", {}).items():
+        document[key] = value
+    for key, value in update.get("$inc", {}).items():
+        document[key] = document.get(key, 0) + value
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for the job queue: equality, $or, $lt/$lte/$ne/$in, $set/$inc/$setOnInsert."""
+
+    def __init__(self):
+        self.docs = []
+
+    async def find_one(self, query, projection=None):
+        for document in self.docs:
+            if matches(document, query):
+                return dict(document)
+        return None
+
+    async def update_one(self, query, update, upsert=False):
+        for document in self.docs:
+            if matches(document, query):
+                _apply(document, update)
+                return UpdateResult(matched_count=1)
+        if upsert:
+            document = {**query, **update.get("$setOnInsert", {})}
+            _apply(document, update)
+            self.docs.append(document)
+            return UpdateResult(upserted_id=document.get("_id"))
+        return UpdateResult()
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=ReturnDocument.BEFORE):
+        candidates = [document for document in self.docs if matches(document, query)]
+        for key, direction in reversed(sort or []):
+            candidates.sort(key=lambda document: document.get(key), reverse=direction < 0)
+        if not candidates:
+            return None
+        document = candidates[0]
+        before = dict(document)
+        _apply(document, update)
+        return dict(document) if return_document == ReturnDocument.AFTER else before
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+async def eventually(predicate, timeout: float = 2.0, interval: float = 0.01):
+    """Poll `predicate()` until it is truthy; fail the test after `timeout` seconds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise AssertionError("condition not reached in time")
+        await asyncio.sleep(interval)
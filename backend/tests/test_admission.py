@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from app.services import admission as admission_module
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+def controller(capacity=1, report_capacity=1, per_user=2, max_queue=10):
+    return AdmissionController(capacity, report_capacity, per_user, max_queue)
+
+
+def test_freed_slot_goes_to_highest_priority_waiter():
+    async def scenario():
+        admission = controller(capacity=1)
+        await admission.acquire("interactive", "holder")
+        order = []
+
+        async def wait(cls, user):
+            await admission.acquire(cls, user)
+            order.append(cls)
+
+        waiters = [asyncio.create_task(wait("report", "a")), asyncio.create_task(wait("greeting", "b"))]
+        await asyncio.sleep(0)
+        waiters.append(asyncio.create_task(wait("interactive", "c")))
+        await asyncio.sleep(0)
+        assert admission.snapshot()["queue_depth"] == {"report": 1, "greeting": 1, "interactive": 1}
+
+        for cls, user in (("interactive", "holder"), ("interactive", "c"), ("greeting", "b")):
+            admission.release(cls, user, 0.1)
+            await asyncio.sleep(0)
+        await asyncio.gather(*waiters)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "greeting", "report"]
+
+
+def test_new_request_does_not_jump_queued_higher_priority():
+    async def scenario():
+        admission = controller(capacity=1)
+        await admission.acquire("report", "holder")
+        queued = asyncio.create_task(admission.acquire("interactive", "a"))
+        await asyncio.sleep(0)
+        admission.release("report", "holder", 0.1)
+        # The slot went to the queued interactive request, so a new greeting has to wait.
+        late = asyncio.create_task(admission.acquire("greeting", "b"))
+        await asyncio.sleep(0)
+        await queued
+        assert not late.done()
+        admission.release("interactive", "a", 0.1)
+        await late
+
+    asyncio.run(scenario())
+
+
+def test_report_cap_leaves_room_for_live_turns():
+    async def scenario():
+        admission = controller(capacity=3, report_capacity=1)
+        await admission.acquire("report", "r1")
+        second_report = asyncio.create_task(admission.acquire("report", "r2"))
+        await asyncio.sleep(0)
+        assert not second_report.done()
+
+        # Live turns are still admitted straight away while the report waits on its cap.
+        await admission.acquire("interactive", "a")
+        await admission.acquire("interactive", "b")
+        admission.release("interactive", "a", 0.1)
+        await asyncio.sleep(0)
+        assert not second_report.done()
+        assert admission.in_flight["report"] == 1
+
+        admission.release("report", "r1", 0.1)
+        await second_report
+        assert admission.in_flight["report"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_per_user_cap_rejects_immediately():
+    async def scenario():
+        admission = controller(capacity=5, per_user=1)
+        await admission.acquire("interactive", "a")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("interactive", "a")
+        assert rejected.value.retry_after >= 1
+        assert admission.stats["rejected_user_cap"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects():
+    async def scenario():
+        admission = controller(capacity=1, max_queue=0)
+        await admission.acquire("interactive", "a")
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire("interactive", "b")
+        assert admission.stats["rejected_queue_full"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_wait_timeout_rejects_and_leaves_queue(monkeypatch):
+    monkeypatch.setitem(admission_module.MAX_WAIT, "interactive", 0.02)
+
+    async def scenario():
+        admission = controller(capacity=1)
+        await admission.acquire("interactive", "a")
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire("interactive", "b")
+        assert admission.stats["rejected_timeout"] == 1
+        assert admission.snapshot()["queue_depth"] == {}
+
+        # The timed-out waiter must not be handed the freed slot.
+        admission.release("interactive", "a", 0.1)
+        assert admission._total() == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_released_when_body_raises():
+    async def scenario():
+        admission = controller(capacity=1)
+        with pytest.raises(RuntimeError):
+            async with admission.slot("interactive", "a"):
+                raise RuntimeError("boom")
+        assert admission._total() == 0
+        assert "a" not in admission.user_in_flight
+
+    asyncio.run(scenario())
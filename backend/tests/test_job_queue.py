@@ -0,0 +1,196 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.services import job_queue as job_queue_module
+from app.services.job_queue import JobQueue, job_id
+from tests.conftest import eventually
+
+
+@pytest.fixture
+def queue(db, monkeypatch):
+    monkeypatch.setattr(job_queue_module, "get_database", lambda: db)
+    monkeypatch.setattr(job_queue_module, "JOB_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(job_queue_module, "JOB_BACKOFF_BASE", 0)
+    monkeypatch.setattr(job_queue_module, "JOB_MAX_ATTEMPTS", 2)
+    return JobQueue(workers=2)
+
+
+def job(db, kind="report", interview_id="i1"):
+    return next((doc for doc in db.jobs.docs if doc["_id"] == job_id(kind, interview_id)), None)
+
+
+def test_enqueued_job_runs_to_success(db, queue):
+    async def handler(db, job, progress):
+        await progress("working")
+        return {"version": job["version"]}
+
+    async def scenario():
+        queue.register("report", handler)
+        queue.start()
+        await queue.enqueue(db, "report", "i1", version=1)
+        await eventually(lambda: job(db)["status"] == "succeeded")
+        await queue.stop()
+
+    asyncio.run(scenario())
+    done = job(db)
+    assert done["result"] == {"version": 1}
+    assert done["stage"] == "done"
+    assert done["lease_owner"] is None and done["attempts"] == 1
+
+
+def test_enqueue_same_version_attaches(db, queue):
+    async def handler(db, job, progress):
+        return {}
+
+    async def scenario():
+        queue.register("report", handler)
+        await queue.enqueue(db, "report", "i1", version=1)
+        await queue.enqueue(db, "report", "i1", version=1)
+
+    asyncio.run(scenario())
+    assert len(db.jobs.docs) == 1
+    assert queue.stats["attached"] == 1
+
+
+def test_expired_lease_is_recovered(db, queue):
+    runs = []
+
+    async def handler(db, job, progress):
+        runs.append(job["attempts"])
+        return {"ok": True}
+
+    async def scenario():
+        queue.register("report", handler)
+        await queue.enqueue(db, "report", "i1", version=1)
+        # A worker in another process claimed the job and died without finishing it.
+        job(db).update(status="running", attempts=1, lease_owner="dead-worker", lease_expires_at=datetime.now() - timedelta(seconds=1))
+        queue.start()
+        await eventually(lambda: job(db)["status"] == "succeeded")
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert runs == [2]
+    assert queue.stats["lease_recoveries"] == 1
+
+
+def test_live_lease_is_not_taken(db, queue):
+    async def handler(db, job, progress):
+        return {}
+
+    async def scenario():
+        queue.register("report", handler)
+        await queue.enqueue(db, "report", "i1", version=1)
+        job(db).update(status="running", lease_owner="other-worker", lease_expires_at=datetime.now() + timedelta(minutes=1))
+        queue.start()
+        await asyncio.sleep(0.1)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert job(db)["lease_owner"] == "other-worker"
+
+
+def test_new_version_while_running_reruns(db, queue):
+    seen = []
+    release = None
+
+    async def handler(db, job, progress):
+        current = await db.jobs.find_one({"_id": job["_id"]})
+        seen.append(current["version"])
+        if len(seen) == 1:
+            await release.wait()
+        return {"version": current["version"]}
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        queue.register("report", handler)
+        queue.start()
+        await queue.enqueue(db, "report", "i1", version=1)
+        await eventually(lambda: seen == [1])
+        await queue.enqueue(db, "report", "i1", version=2)
+        assert job(db)["rerun"] is True
+        release.set()
+        await eventually(lambda: job(db)["status"] == "succeeded" and len(seen) == 2)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert seen == [1, 2]
+    assert job(db)["result"] == {"version": 2}
+
+
+def test_failures_retry_then_fail(db, queue):
+    attempts = []
+
+    async def handler(db, job, progress):
+        attempts.append(job["attempts"])
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        queue.register("report", handler)
+        queue.start()
+        await queue.enqueue(db, "report", "i1", version=1)
+        await eventually(lambda: job(db)["status"] == "failed")
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert attempts == [1, 2]
+    assert job(db)["error"] == "provider down"
+    assert queue.stats["retried"] == 1 and queue.stats["failed"] == 1
+
+
+def test_failed_job_is_reset_on_enqueue(db, queue):
+    async def handler(db, job, progress):
+        return {}
+
+    async def scenario():
+        queue.register("report", handler)
+        await queue.enqueue(db, "report", "i1", version=1)
+        job(db).update(status="failed", attempts=2, error="boom")
+        await queue.enqueue(db, "report", "i1", version=1)
+
+    asyncio.run(scenario())
+    assert job(db)["status"] == "queued" and job(db)["attempts"] == 0 and job(db)["error"] is None
+
+
+def test_lost_lease_stops_handler(db, queue, monkeypatch):
+    monkeypatch.setattr(job_queue_module, "JOB_LEASE_SECONDS", 0.15)
+    log = []
+
+    async def handler(db, job, progress):
+        log.append("started")
+        await asyncio.sleep(1)
+        log.append("finished")
+
+    async def scenario():
+        queue.register("report", handler)
+        queue.start()
+        await queue.enqueue(db, "report", "i1", version=1)
+        await eventually(lambda: log == ["started"])
+        # Another worker took the job over; the next heartbeat must stop this run.
+        job(db).update(lease_owner="other-worker", lease_expires_at=datetime.now() + timedelta(minutes=1))
+        await eventually(lambda: queue.stats["leases_lost"] == 1)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert log == ["started"]
+    assert job(db)["status"] == "running" and job(db)["lease_owner"] == "other-worker"
+
+
+def test_progress_after_deletion_stops_handler(db, queue):
+    log = []
+
+    async def handler(db, job, progress):
+        await progress("first")
+        db.jobs.docs.clear()
+        await progress("second")
+        log.append("kept going")
+
+    async def scenario():
+        queue.register("report", handler)
+        queue.start()
+        await queue.enqueue(db, "report", "i1", version=1)
+        await eventually(lambda: queue.stats["leases_lost"] == 1)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert log == []
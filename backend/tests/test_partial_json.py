@@ -0,0 +1,59 @@
+import json
+import random
+from app.services.partial_json import JSONSectionStream
+
+
+REPORT = {
+    "overall_score": 7.5,
+    "summary": "Clear answers, {braces}, [brackets], commas, and \"quotes\" inside strings.",
+    "strengths": ["communication", "system design"],
+    "scores": {"technical": 8, "nested": {"depth": [1, 2, {"x": "}"}]}},
+    "passed": True,
+    "notes": None,
+}
+
+
+def feed_all(chunks):
+    stream = JSONSectionStream()
+    sections = []
+    for chunk in chunks:
+        sections.extend(stream.feed(chunk))
+    return sections
+
+
+def test_whole_object_in_one_chunk():
+    assert feed_all([json.dumps(REPORT)]) == list(REPORT.items())
+
+
+def test_character_by_character():
+    assert feed_all(list(json.dumps(REPORT, indent=2))) == list(REPORT.items())
+
+
+def test_random_chunk_boundaries():
+    text = json.dumps(REPORT)
+    rng = random.Random(7)
+    for _ in range(50):
+        cuts = sorted(rng.sample(range(1, len(text)), 12))
+        chunks = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+        assert feed_all(chunks) == list(REPORT.items())
+
+
+def test_sections_are_emitted_as_soon_as_complete():
+    stream = JSONSectionStream()
+    assert stream.feed('{"a": 1') == []
+    assert stream.feed(', "b": [1, 2') == [("a", 1)]
+    assert stream.feed("]}") == [("b", [1, 2])]
+
+
+def test_code_fence_and_trailing_text_ignored():
+    text = "```json\n" + json.dumps({"a": 1, "b": "x"}) + "\n```\nextra {\"c\": 3}"
+    assert feed_all([text[:5], text[5:20], text[20:]]) == [("a", 1), ("b", "x")]
+
+
+def test_malformed_section_is_skipped():
+    assert feed_all(['{"a": 1, "b": nope, "c": "ok"}']) == [("a", 1), ("c", "ok")]
+
+
+def test_escaped_backslash_before_quote():
+    value = {"path": "C:\\temp\\", "next": 2}
+    assert feed_all(list(json.dumps(value))) == list(value.items())
@@ -0,0 +1,212 @@
+import asyncio
+import time
+import pytest
+from app.services import resilience
+from app.services.resilience import CircuitBreaker, CircuitOpenError, deadline, resilient_call
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("openai", failure_threshold=2, reset_timeout=30)
+    monkeypatch.setitem(resilience.breakers, "openai", breaker)
+    return breaker
+
+
+def failing(error):
+    async def call():
+        raise error
+    return call
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    breaker.opened_at = time.monotonic() - 30
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow(), "only one trial call while half-open"
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_ignored_failure_frees_trial_slot():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 30
+    assert breaker.allow()
+    breaker.record_ignored()
+    assert breaker.state == "half_open" and breaker.allow()
+
+
+def test_server_errors_open_breaker_and_short_circuit(breaker):
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(ProviderError):
+                await resilient_call("test", failing(ProviderError(503)), provider="openai")
+        assert breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            await resilient_call("test", failing(ProviderError(503)), provider="openai")
+
+        async def fallback():
+            return "fallback"
+        assert await resilient_call("test", failing(ProviderError(503)), provider="openai", fallback=fallback) == "fallback"
+
+    asyncio.run(scenario())
+
+
+def test_client_errors_do_not_count(breaker):
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(ProviderError):
+                await resilient_call("test", failing(ProviderError(400)), provider="openai")
+        assert breaker.state == "closed" and breaker.failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_connection_errors_count(breaker):
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await resilient_call("test", failing(ConnectionError("reset")), provider="openai")
+        assert breaker.state == "open"
+
+    asyncio.run(scenario())
+
+
+async def slow_call():
+    await asyncio.sleep(1)
+
+
+def test_timeout_on_clipped_deadline_does_not_count(breaker):
+    async def scenario():
+        with deadline(0.02):
+            for _ in range(2):
+                with pytest.raises(asyncio.TimeoutError):
+                    await resilient_call("test", slow_call, provider="openai", timeout=10)
+        assert breaker.failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_timeout_with_full_budget_counts(breaker):
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(asyncio.TimeoutError):
+                await resilient_call("test", slow_call, provider="openai", timeout=0.02)
+        assert breaker.state == "open"
+
+    asyncio.run(scenario())
+
+
+def test_success_resets_failure_count(breaker):
+    async def scenario():
+        with pytest.raises(ProviderError):
+            await resilient_call("test", failing(ProviderError(500)), provider="openai")
+
+        async def ok():
+            return "ok"
+        assert await resilient_call("test", ok, provider="openai") == "ok"
+        assert breaker.failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_hedge_wins_when_first_attempt_is_slow(breaker, monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_DEFAULT_DELAY", 0.02)
+    attempts = []
+
+    async def call():
+        attempt = len(attempts)
+        attempts.append(asyncio.current_task())
+        if attempt == 0:
+            await asyncio.sleep(1)
+            return "first"
+        return "second"
+
+    async def scenario():
+        hedges, wins = resilience.resilience_stats["hedges"], resilience.resilience_stats["hedge_wins"]
+        assert await resilient_call("hedge-slow", call, provider="openai", hedge=True) == "second"
+        await asyncio.sleep(0)
+        assert attempts[0].cancelled(), "the losing attempt is cancelled"
+        assert resilience.resilience_stats["hedges"] == hedges + 1
+        assert resilience.resilience_stats["hedge_wins"] == wins + 1
+
+    asyncio.run(scenario())
+
+
+def test_no_hedge_when_first_attempt_is_fast(breaker, monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_DEFAULT_DELAY", 0.5)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return "fast"
+
+    async def scenario():
+        assert await resilient_call("hedge-fast", call, provider="openai", hedge=True) == "fast"
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_hedge_falls_back_to_first_error_when_both_fail(breaker, monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_DEFAULT_DELAY", 0.01)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise ProviderError(502)
+        raise ProviderError(503)
+
+    async def scenario():
+        with pytest.raises(ProviderError) as error:
+            await resilient_call("hedge-fail", call, provider="openai", hedge=True)
+        assert error.value.status_code == 502
+
+    asyncio.run(scenario())
+
+
+def test_deadline_cancels_every_hedged_attempt(breaker, monkeypatch):
+    attempts = []
+
+    async def call():
+        attempts.append(asyncio.current_task())
+        await asyncio.sleep(1)
+
+    async def scenario(hedge_delay, expected_attempts):
+        monkeypatch.setattr(resilience, "HEDGE_DEFAULT_DELAY", hedge_delay)
+        attempts.clear()
+        with pytest.raises(asyncio.TimeoutError):
+            await resilient_call("hedge-deadline", call, provider="openai", hedge=True, timeout=0.05)
+        await asyncio.sleep(0)
+        assert len(attempts) == expected_attempts
+        assert all(task.cancelled() for task in attempts)
+
+    # Deadline before the hedge is launched, then after it.
+    asyncio.run(scenario(0.5, 1))
+    asyncio.run(scenario(0.01, 2))
@@ -1,9 +1,13 @@
 import { setLoading } from "./redux/loaderSlice";
 import { store } from "./redux/store";
+import Cookies from "js-cookie";
 
 export const API_BASE_URL =
   process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+export const getAuthToken = () =>
+  store.getState()?.user?.token || Cookies.get("auth_token") || null;
+
 const request = async (
   url,
   method,
@@ -18,6 +22,7 @@ const request = async (
     headers["Content-Type"] = "application/json";
   }
 
+  token = token || getAuthToken();
   if (token) {
     headers["Authorization"] = `Bearer ${token}`;
   }
@@ -77,3 +82,32 @@ export const apiService = {
     request(url, "DELETE", null, token, responseType, showLoader),
 };
 
+
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_POLL_MAX_INTERVAL_MS = 10000;
+const JOB_WAIT_TIMEOUT_MS = 5 * 60 * 1000;
+
+// Report, breakdown and PDF generation run as background jobs; the endpoints answer
+// 202 with a `job` handle. Resolves with the job once it has finished; polls back off
+// to JOB_POLL_MAX_INTERVAL_MS and give up after JOB_WAIT_TIMEOUT_MS.
+export const waitForJob = async (jobId, token = null, timeoutMs = JOB_WAIT_TIMEOUT_MS) => {
+  store.dispatch(setLoading(true));
+  const deadline = Date.now() + timeoutMs;
+  let interval = JOB_POLL_INTERVAL_MS;
+  try {
+    while (true) {
+      const { job } = await apiService.get(`/jobs/${jobId}`, token, "json", false);
+      if (job.status === "succeeded") return job;
+      if (job.status === "failed") {
+        throw new Error(job.error || "Report generation failed.");
+      }
+      if (Date.now() + interval > deadline) {
+        throw new Error("Report generation is taking too long. Please try again later.");
+      }
+      await new Promise((resolve) => setTimeout(resolve, interval));
+      interval = Math.min(interval * 1.5, JOB_POLL_MAX_INTERVAL_MS);
+    }
+  } finally {
+    store.dispatch(setLoading(false));
+  }
+};
@@ -212,27 +212,14 @@ export default function VoiceModeInterview(props) {
     const formData = new FormData();
     formData.append("file", audioBlob, "user_response.webm");
     formData.append("sender", "user");
+    // Transcribes the answer and generates the next question in one request, like submit-answer.
+    formData.append("advance", "true");
     try {
       const response = await apiService.post(
         `/interview/answer-audio-interview-question/${props?.interview_id}`,
         formData,
         false
       );
-      if (response?.status) {
-        await getAIResponse();
-      }
-    } catch (err) {
-      console.error("Error sending audio to backend:", err);
-    }
-  }
-
-  const getAIResponse = async () => {
-    try {
-      const response = await apiService.post(
-        `/interview/get-ai-response/${props?.interview_id}`,
-        { question_count: questionCount },
-        false
-      );
       if (response?.status) {
         const wavUrl = props.pcmToWav(response?.text_audio?.audio);
         setAIQuestionAudio(wavUrl);
@@ -249,6 +236,7 @@ export default function VoiceModeInterview(props) {
             .post("/interview/log-interview-timer", {
               interview_id: props?.interview_id,
               timer: currentTimer,
+              completion: "completed",
             })
             .then(() => setInterviewTimer(currentTimer))
             .catch((err) => console.error("Failed to log timer:", err));
@@ -257,11 +245,11 @@ export default function VoiceModeInterview(props) {
         }
       }
     } catch (err) {
-      console.error(err);
+      console.error("Error sending audio to backend:", err);
     } finally {
       setIsAISpeaking(false);
     }
-  };
+  }
 
   const formatTime = (s) => {
     const m = String(Math.floor(s / 60)).padStart(2, "0");
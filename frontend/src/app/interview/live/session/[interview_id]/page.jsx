@@ -271,42 +271,28 @@ export default function Page() {
   };
 
   const handleSendMessage = async () => {
-    if (!input.trim()) return;
+    const text = input.trim();
+    if (!text) return;
 
-    try {
-      const payload = {
-        sender: "user",
-        text: input.trim(),
-      };
+    setMessages((prev) => [...prev, { sender: "user", text, pending: true }]);
+    setInput("");
+    setHidePartialReport(true);
+    setAiTyping(true);
+    setRunning(true);
 
-      const response = await apiService.post(
-        `/interview/answer-interview-question/${interview_id}`,
-        payload , false
-      );
-      if (response?.status) {
-        const conversation = response?.interview_conversation;
-        setMessages((prev) => [...prev, conversation]);
-        setInput("");
-        setHidePartialReport(true);
-      }
-    } catch (err) {
-      console.error("Error: ", err);
-    } finally {
-      setAiTyping(true);
-      setRunning(true);
-      getAIResponse(input.trim());
-    }
-  };
-
-  const getAIResponse = async () => {
     try {
+      // Saves the answer and generates the next question in one request; a retry replaces the answer.
       const response = await apiService.post(
-        `/interview/get-ai-response/${interview_id}`,
-        { question_count: questionCount },false
+        `/interview/submit-answer/${interview_id}`,
+        { sender: "user", text },
+        false
       );
       if (response?.status) {
-        const conversation = response?.interview_conversation;
-        setMessages((prev) => [...prev, conversation]);
+        setMessages((prev) => [
+          ...prev.filter((m) => !m?.pending),
+          response?.answer_conversation,
+          response?.interview_conversation,
+        ]);
         if (questionCount !== 10) {
           setQuestionCount((q) => q + 1);
         }
@@ -319,15 +305,21 @@ export default function Page() {
             .post("/interview/log-interview-timer", {
               interview_id,
               timer: currentTimer,
+              completion: "completed",
             })
             .then(() => setInterviewTimer(currentTimer))
             .catch((err) => console.error("Failed to log timer:", err));
           setTimer(0);
           setRunning(false);
         }
+      } else {
+        setMessages((prev) => prev.filter((m) => !m?.pending));
+        setInput(text);
       }
     } catch (err) {
-      console.error(err);
+      console.error("Error: ", err);
+      setMessages((prev) => prev.filter((m) => !m?.pending));
+      setInput(text);
     } finally {
       setAiTyping(false);
     }
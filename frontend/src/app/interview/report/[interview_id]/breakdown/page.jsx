@@ -13,7 +13,7 @@ import {
 } from "lucide-react";
 import Sidebar from "@/app/components/Sidebar";
 import { useParams } from "next/navigation";
-import { apiService } from "@/app/api_service";
+import { apiService, waitForJob } from "@/app/api_service";
 
 export default function DetailedBreakdown() {
   const params = useParams();
@@ -31,11 +31,19 @@ export default function DetailedBreakdown() {
 
   const getDetailedBreakdown = async () => {
     try {
-      const response = await apiService.post(
+      const payload = {"time": localStorage.getItem("interviewTiming")};
+      let response = await apiService.post(
         `/interview-report/detailed-breakdown/${interview_id}`,
-        {"time": localStorage.getItem("interviewTiming")}
+        payload
       );
-      if (response?.status) {
+      if (response?.job && !response?.detailed_breakdown) {
+        await waitForJob(response.job._id);
+        response = await apiService.post(
+          `/interview-report/detailed-breakdown/${interview_id}`,
+          payload
+        );
+      }
+      if (response?.detailed_breakdown) {
         const parsedBreakdown = JSON.parse(response?.detailed_breakdown);
         const getFormattedDuration = (totalSeconds) => {
           const minutes = Math.floor(totalSeconds / 60);
@@ -14,7 +14,7 @@ import {
 } from "lucide-react";
 import Sidebar from "@/app/components/Sidebar";
 import { useParams } from "next/navigation";
-import { apiService } from "@/app/api_service";
+import { API_BASE_URL, apiService, waitForJob } from "@/app/api_service";
 import Link from "next/link";
 
 const StatCard = ({ title, score, icon: Icon }) => (
@@ -66,17 +66,67 @@ export default function Page() {
     }
   };
 
+  // Sections arrive over SSE as the report is generated, so the score cards render early.
+  const streamInterviewReport = async (query) => {
+    // EventSource can't send an Authorization header, so a short-lived token scoped to this
+    // interview goes in the query instead of the access token.
+    const streamToken = await apiService.post(
+      "/auth/stream-token",
+      { scope: interview_id },
+      false
+    );
+    if (!streamToken?.token) throw new Error("Could not open the report stream.");
+
+    return new Promise((resolve, reject) => {
+      const params = new URLSearchParams(query);
+      params.set("stream_token", streamToken.token);
+      const source = new EventSource(
+        `${API_BASE_URL}/interview-report/generate-report/${interview_id}/stream?${params}`
+      );
+      source.addEventListener("section", (e) => {
+        const { key, value } = JSON.parse(e.data);
+        setReport((prev) => ({ ...prev, [key]: value }));
+      });
+      source.addEventListener("done", (e) => {
+        source.close();
+        resolve(JSON.parse(e.data).report);
+      });
+      source.addEventListener("error", (e) => {
+        source.close();
+        reject(
+          new Error(e.data ? JSON.parse(e.data).detail : "Report stream failed.")
+        );
+      });
+    });
+  };
+
   const getInterviewReport = async () => {
+    const interviewTime = localStorage.getItem("interviewTiming");
+    const checkMode = await checkInterviewMode();
+    const payload = checkMode === "Voice" ? {} : { time: interviewTime };
+
     try {
-      const interviewTime = localStorage.getItem("interviewTiming");
-      const checkMode = await checkInterviewMode();
+      const query = payload.time ? { time: payload.time } : {};
+      const streamedReport = await streamInterviewReport(query);
+      setReport(JSON.parse(streamedReport));
+      return;
+    } catch (err) {
+      console.error("Report stream failed, falling back:", err);
+    }
 
-      const payload = checkMode === "Voice" ? {} : { time: interviewTime };
-      const response = await apiService.post(
+    try {
+      let response = await apiService.post(
         `/interview-report/generate-report/${interview_id}`,
         payload
       );
-      if (response?.status) {
+      if (response?.job && !response?.report) {
+        await waitForJob(response.job._id);
+        response = await apiService.post(
+          `/interview-report/generate-report/${interview_id}`,
+          payload
+        );
+      }
+      if (response?.report) {
         const parsedReport = JSON.parse(response?.report);
         setReport(parsedReport);
       }
@@ -89,6 +139,13 @@ export default function Page() {
     e.preventDefault();
     setLoading(true);
     try {
+      const pdfStatus = await apiService.get(
+        `/interview-report/download-status/${interview_id}`
+      );
+      if (!pdfStatus?.ready) {
+        await waitForJob(pdfStatus.job._id);
+      }
+
       const blob = await apiService.get(
         `/interview-report/download-report/${interview_id}`,
         null,